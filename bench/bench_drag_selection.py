@@ -0,0 +1,52 @@
+import sys
+import time
+from types import SimpleNamespace
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(path)), "tests"))
+
+from obswsgui.ui.defaultgui import SHIFT_MASK
+
+from fakegui import center, make_gui, scene_item
+
+scene_size : int = 500
+events : int = 200
+
+def event(x : float, y : float, shift : bool = False) -> SimpleNamespace:
+  return SimpleNamespace(x = x, y = y, state = SHIFT_MASK if shift else 0)
+
+def bench(selected : int) -> None:
+  gui = make_gui()
+  gui.apply_scene_items([scene_item(n + 1, n, (n * 37) % 1800, (n * 53) % 1000, 100.0, 60.0, 'color_source_v3') for n in range(scene_size)], {})
+  # only interactable items can be grabbed, plain sources are not by default
+  for item in gui.get_current_scene_items():
+    item.set_interactable(True)
+  gui.canvas.run_scheduled()
+  
+  items = gui.get_current_scene_items()
+  grabbed = items[-1]
+  for item in items[:selected - 1]:
+    gui.select_item(item)
+    
+  # shift-click the last item into the selection, then drag the whole group
+  start = center(grabbed)
+  gui.mouseDown(event(start.x, start.y, shift = True))
+  assert len(gui.selection) == selected and gui.dragging
+  
+  calls = gui.canvas.calls
+  begin = time.perf_counter()
+  for n in range(1, events + 1):
+    gui.mouseMove(event(start.x + n, start.y + n / 2))
+    # Tk runs the idle redraw between motion events
+    gui.canvas.run_scheduled()
+  elapsed = time.perf_counter() - begin
+  gui.mouseUp(event(start.x + events, start.y))
+  
+  print(f"{selected:4d} selected of {scene_size}  {1000.0 * elapsed / events:6.3f}ms per motion event  {(gui.canvas.calls - calls) / events:6.1f} canvas calls per event")
+
+if __name__ == "__main__":
+  for selected in (1, 10, 100):
+    bench(selected)
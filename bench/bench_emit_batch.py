@@ -0,0 +1,71 @@
+import asyncio
+import sys
+import time
+import types
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+
+import simpleobsws
+
+from obswsgui import Message, ProxiedClientConnection
+from obswsgui.networking import proxiedconn
+
+RTT = 0.080
+
+class DelayedRelay:
+  # acknowledges every frame with a status response one round trip later
+  def __init__(self):
+    self.incoming = asyncio.Queue()
+    self.frames = 0
+    
+  async def send(self, data) -> None:
+    self.frames += 1
+    msg = Message(data)
+    asyncio.get_running_loop().call_later(RTT, self.ack, msg)
+    
+  def ack(self, msg : Message) -> None:
+    reply = Message()
+    reply.code = msg.code
+    reply.id = msg.id
+    reply.msg_type = "status_response"
+    reply.has_data = True
+    reply.data = { 'status_code': 200, 'message': "Emitted." }
+    self.incoming.put_nowait(reply.to_data())
+    
+  def __aiter__(self):
+    return self
+  
+  async def __anext__(self):
+    return await self.incoming.get()
+
+async def flush_time(count : int, batching : bool) -> tuple:
+  relay = DelayedRelay()
+  async def connect(url):
+    return relay
+  proxiedconn.client = types.SimpleNamespace(connect = connect)
+  
+  conn = ProxiedClientConnection("ws://relay", "bench", lambda resp: None)
+  await conn.open_proxy(conn.url)
+  conn.connected = True
+  conn.batching = batching
+  
+  for i in range(count):
+    conn.queue_request(simpleobsws.Request("SetSceneItemTransform", { 'sceneName': "Scene", 'sceneItemId': i, 'sceneItemTransform': { 'positionX': float(i) } }))
+    
+  start = time.perf_counter()
+  await conn.update()
+  elapsed = time.perf_counter() - start
+  
+  conn.reader_task.cancel()
+  return elapsed, relay.frames
+
+if __name__ == '__main__':
+  print(f"simulated RTT {RTT * 1e3:.0f}ms")
+  print(f"{'requests':>9} {'emit_request ms':>16} {'frames':>7} {'emit_batch ms':>14} {'frames':>7}")
+  for count in (1, 10, 50, 200):
+    single, single_frames = asyncio.run(flush_time(count, False))
+    batch, batch_frames = asyncio.run(flush_time(count, True))
+    print(f"{count:>9} {single * 1e3:>16.0f} {single_frames:>7} {batch * 1e3:>14.0f} {batch_frames:>7}")
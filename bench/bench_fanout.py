@@ -0,0 +1,65 @@
+import asyncio
+import sys
+import time
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+
+from obswsgui import Message, backend
+
+class FakeSocket:
+  remote_address = ("127.0.0.1", 0)
+  
+  def __init__(self, delay : float, expected : int, done : asyncio.Event = None):
+    self.delay = delay
+    self.expected = expected
+    self.received = 0
+    self.done = done
+    
+  async def send(self, data) -> None:
+    if self.delay:
+      await asyncio.sleep(self.delay)
+    self.received += 1
+    if self.done and self.received == self.expected:
+      self.done.set()
+
+def response(code : str, id : int) -> Message:
+  msg = Message()
+  msg.code = code
+  msg.id = id
+  msg.msg_type = "await_response"
+  msg.has_data = True
+  msg.data = { 'requestType': "GetSceneItemList", 'responseData': { 'sceneItems': [{ 'sceneItemId': i } for i in range(50)] } }
+  return msg
+
+async def bench(clients_per_room : int, messages : int = 100) -> tuple:
+  backend.outboxes.clear()
+  
+  # one client in every room sleeps 50ms per send; the others must not wait on it
+  slow = FakeSocket(0.05, messages)
+  events = [asyncio.Event() for _ in range(clients_per_room - 1)]
+  fast = [FakeSocket(0, messages, event) for event in events]
+  clients = [slow, *fast]
+  
+  msgs = [response("bench", i) for i in range(messages)]
+  
+  start = time.perf_counter()
+  for msg in msgs:
+    backend.broadcast(clients, msg)
+  enqueue = time.perf_counter() - start
+  
+  await asyncio.gather(*(event.wait() for event in events))
+  delivered = time.perf_counter() - start
+  
+  for outbox in list(backend.outboxes.values()):
+    outbox.close()
+  backend.outboxes.clear()
+  return enqueue, delivered
+
+if __name__ == '__main__':
+  print(f"{'clients':>8} {'enqueue ms':>11} {'fast clients done ms':>21}")
+  for count in (1, 10, 500):
+    enqueue, delivered = asyncio.run(bench(count))
+    print(f"{count:>8} {enqueue * 1e3:>11.2f} {delivered * 1e3:>21.2f}")
@@ -0,0 +1,115 @@
+import asyncio
+import logging
+import sys
+import time
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+
+import msgpack
+import simpleobsws
+from websockets import server
+
+from obswsgui import backend, DirectConnection, ProxiedClientConnection, ProxiedServerConnection
+
+# obs-websocket hands every message to the UI thread, each websocket message costs about this much before its requests run
+MESSAGE_COST = 0.001
+
+class MockOBS:
+  # speaks enough of obs-websocket v5 (msgpack) for simpleobsws, and counts applied requests
+  def __init__(self):
+    self.applied = 0
+    self.target = 0
+    self.done = asyncio.Event()
+  
+  def expect(self, count : int) -> None:
+    self.applied = 0
+    self.target = count
+    self.done.clear()
+  
+  def apply(self, count : int) -> None:
+    self.applied += count
+    if self.applied >= self.target:
+      self.done.set()
+  
+  async def handler(self, websocket : server.WebSocketServerProtocol) -> None:
+    await websocket.send(msgpack.packb({ 'op': 0, 'd': { 'obsWebSocketVersion': "5.0.0", 'rpcVersion': 1 } }))
+    async for raw in websocket:
+      payload = msgpack.unpackb(raw)
+      op, data = payload['op'], payload['d']
+      if op == 1:
+        await websocket.send(msgpack.packb({ 'op': 2, 'd': { 'negotiatedRpcVersion': 1 } }))
+      elif op == 6:
+        await asyncio.sleep(MESSAGE_COST)
+        self.apply(1)
+        await websocket.send(msgpack.packb({ 'op': 7, 'd': { 'requestType': data['requestType'], 'requestId': data['requestId'], 'requestStatus': { 'result': True, 'code': 100 } } }))
+      elif op == 8:
+        await asyncio.sleep(MESSAGE_COST)
+        self.apply(len(data['requests']))
+        results = [{ 'requestType': req['requestType'], 'requestStatus': { 'result': True, 'code': 100 } } for req in data['requests']]
+        await websocket.send(msgpack.packb({ 'op': 9, 'd': { 'requestId': data['requestId'], 'results': results } }))
+
+def queue(conn, count : int) -> None:
+  for i in range(count):
+    conn.queue_request(simpleobsws.Request("SetSceneItemTransform", { 'sceneName': "Scene", 'sceneItemId': i, 'sceneItemTransform': { 'positionX': float(i) } }))
+
+async def flush(obs : MockOBS, conn, count : int) -> tuple:
+  obs.expect(count)
+  queue(conn, count)
+  
+  start = time.perf_counter()
+  await conn.update()
+  sent = time.perf_counter() - start
+  await asyncio.wait_for(obs.done.wait(), 30)
+  return sent, time.perf_counter() - start
+
+async def serve_host(host : ProxiedServerConnection) -> None:
+  while True:
+    await host.update()
+
+async def run(counts : tuple) -> dict:
+  obs = MockOBS()
+  obs_server = await server.serve(obs.handler, "127.0.0.1", 0, subprotocols = ["obswebsocket.msgpack"])
+  relay_server = await server.serve(backend.handler, "127.0.0.1", 0)
+  obs_url = f"ws://127.0.0.1:{obs_server.sockets[0].getsockname()[1]}"
+  relay_url = f"ws://127.0.0.1:{relay_server.sockets[0].getsockname()[1]}"
+  
+  direct = DirectConnection(obs_url, "", lambda resp: None)
+  await direct.connect()
+  
+  host = ProxiedServerConnection(obs_url, "", relay_url, "bench", lambda resp: None)
+  await host.connect()
+  host_task = asyncio.create_task(serve_host(host))
+  
+  results = {}
+  for batching in (False, True):
+    client = ProxiedClientConnection(relay_url, "bench", lambda resp: None)
+    await client.connect()
+    client.batching = batching
+    for count in counts:
+      results[('proxied', batching, count)] = await flush(obs, client, count)
+    client.reader_task.cancel()
+  
+  for count in counts:
+    results[('direct', True, count)] = await flush(obs, direct, count)
+  
+  host_task.cancel()
+  obs_server.close()
+  relay_server.close()
+  return results
+
+if __name__ == '__main__':
+  # backend configures INFO logging, connection chatter would bury the table
+  logging.getLogger().setLevel(logging.WARNING)
+  counts = (1, 10, 50, 200, 500, 1000)
+  results = asyncio.run(run(counts))
+  
+  print(f"mock OBS costs {MESSAGE_COST * 1e3:.1f}ms per websocket message, times are until OBS applied the last request")
+  print(f"{'requests':>9} {'emit_request ms':>16} {'emit_batch ms':>14} {'(sent ms)':>10} {'direct batch ms':>16}")
+  for count in counts:
+    single = results[('proxied', False, count)][1]
+    sent, batch = results[('proxied', True, count)]
+    direct = results[('direct', True, count)][1]
+    print(f"{count:>9} {single * 1e3:>16.1f} {batch * 1e3:>14.1f} {sent * 1e3:>10.1f} {direct * 1e3:>16.1f}")
@@ -0,0 +1,131 @@
+import asyncio
+import heapq
+import itertools
+import sys
+import threading
+import time
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(path)), "tests"))
+
+import simpleobsws
+
+from obswsgui.networking.conn import Connection
+from obswsgui.util.uiqueue import UIQueue
+
+from fakegui import make_gui, scene_item
+
+LATENCY : float = 0.200 # seconds before the mock OBS answers anything
+duration : float = 5.0
+
+class SlowConnection(Connection):
+  def __init__(self, items : int):
+    super().__init__(None)
+    self.connected = True
+    self.items = [scene_item(n, n, 30.0 * n, kind = 'color_source') for n in range(items)]
+  
+  async def request(self, req : simpleobsws.Request) -> simpleobsws.RequestResponse:
+    await asyncio.sleep(LATENCY)
+    data = {
+      'GetCurrentProgramScene': { 'currentProgramSceneName': "Scene" },
+      'GetVideoSettings': { 'baseWidth': 1920, 'baseHeight': 1080 },
+      'GetSceneItemList': { 'sceneItems': self.items }
+    }[req.requestType]
+    return simpleobsws.RequestResponse(req.requestType, simpleobsws.RequestStatus(True, 100), data)
+  
+  async def update(self) -> None:
+    self.take_requests()
+    await asyncio.sleep(LATENCY)
+
+class RealtimeRoot:
+  # a Tk mainloop stand-in, runs after() callbacks on this thread when they fall due
+  def __init__(self):
+    self.timers = []
+    self.cancelled = set()
+    self.ids = itertools.count()
+  
+  def after(self, ms : int, func) -> str:
+    n = next(self.ids)
+    heapq.heappush(self.timers, (time.perf_counter() + ms / 1000.0, n, func))
+    return f"after#{n}"
+  
+  def after_cancel(self, id : str) -> None:
+    self.cancelled.add(int(id.split("#")[1]))
+  
+  def run(self, seconds : float) -> None:
+    end = time.perf_counter() + seconds
+    while self.timers and self.timers[0][0] < end:
+      due, n, func = heapq.heappop(self.timers)
+      time.sleep(max(due - time.perf_counter(), 0))
+      if n not in self.cancelled:
+        func()
+
+class InlineUI:
+  # before the split the network code ran on the Tk thread and touched the canvas directly
+  async def run(self, func, *args):
+    return func(*args)
+  
+  def call(self, func, *args) -> None:
+    func(*args)
+
+def make_busy_gui(root : RealtimeRoot):
+  gui = make_gui()
+  gui.root = root
+  gui.connected = True
+  gui.events_enabled = False
+  gui.connection = SlowConnection(50)
+  gui.modifyframe = None
+  gui.active_linger = float('inf') # stay at the active rate, as during a long drag
+  gui.last_interaction = time.time()
+  gui.last_histogram_log = float('inf')
+  gui.frame_histogram = {}
+  
+  # one item moves every frame so each tick queues a request
+  frame_update = gui.frame_update
+  moved = itertools.cycle(range(50))
+  def busy_frame_update() -> None:
+    items = gui.get_current_scene_items()
+    if items:
+      items[next(moved) % len(items)].trans_changed = True
+    frame_update()
+  gui.frame_update = busy_frame_update
+  return gui
+
+def measure(separate_loop : bool) -> dict:
+  root = RealtimeRoot()
+  gui = make_busy_gui(root)
+  
+  if separate_loop:
+    gui.ui_queue = UIQueue(root)
+    threading.Thread(target = lambda: asyncio.run(gui.run_async_tasks()), daemon = True).start()
+    gui.frame_after_id = root.after(0, gui.frame_tick)
+  else:
+    # the old shape, every tick ran the network update to completion before the next frame
+    gui.ui_queue = InlineUI()
+    loop = asyncio.new_event_loop()
+    async def network_update() -> None:
+      await asyncio.gather(gui.flush_requests(), gui.sync_update())
+    def coupled_tick() -> None:
+      gui.frame_update()
+      loop.run_until_complete(network_update())
+      root.after(int(1000.0 / gui.choose_framerate()), coupled_tick)
+    root.after(0, coupled_tick)
+  
+  root.run(duration)
+  return gui.frame_histogram
+
+def report(label : str, histogram : dict) -> None:
+  frames = sum(histogram.values())
+  worst = max(histogram) if histogram else 0
+  within = sum(count for bucket, count in histogram.items() if bucket < 30)
+  print(f"{label}: {frames} frames, {100.0 * within / max(frames, 1):.0f}% under 30ms, worst bucket {worst}ms{'+' if worst == 500 else ''}")
+  # record_frame_time puts everything from 500ms up in the last bucket
+  print("  " + ", ".join(f"{bucket}ms{'+' if bucket == 500 else ''}: {histogram[bucket]}" for bucket in sorted(histogram)))
+
+if __name__ == "__main__":
+  print(f"mock OBS answers after {LATENCY * 1e3:.0f}ms, 50 items, one item moved per frame, {duration:.0f}s each")
+  report("network on the frame tick", measure(False))
+  report("network on its own loop", measure(True))
@@ -0,0 +1,51 @@
+import math
+import random
+import sys
+import timeit
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(path)), "tests"))
+
+from obswsgui.obstypes.obs_object import OBS_Object
+from obswsgui.util.geometryutil import Coords, distance_from_segment, distance_sq_from_segment
+
+import geometryref
+from fakegui import make_gui
+
+number : int = 20000
+
+def per_call_ns(func) -> float:
+  # best of seven runs, the machine may be busy
+  return min(timeit.repeat(func, number = number, repeat = 7)) / number * 1e9
+
+def edge_checks(old : bool, polygon : list, p : Coords, zone : float):
+  # the four edge tests move_or_resize makes for every candidate under the cursor
+  if old:
+    return [geometryref.distance_from_segment(polygon[a], polygon[b], p) < zone for a, b in ((0, 3), (1, 2), (0, 1), (2, 3))]
+  zone_sq = zone * zone
+  return [distance_sq_from_segment(polygon[a], polygon[b], p) < zone_sq for a, b in ((0, 3), (1, 2), (0, 1), (2, 3))]
+
+if __name__ == "__main__":
+  rng = random.Random(0)
+  l0, l1, p = Coords(100, 100), Coords(400, 250), Coords(250, 190)
+  angle = rng.uniform(0, 2 * math.pi)
+  
+  gui = make_gui()
+  item = OBS_Object(1, 0, gui.canvas, gui.screen, 300.0, 200.0, 400.0, 300.0, angle, 400.0, 300.0, 'OBS_BOUNDS_NONE', "item")
+  polygon = item.polygon.points()
+  
+  rows = [
+    ("distance_from_segment", lambda: geometryref.distance_from_segment(l0, l1, p), lambda: distance_from_segment(l0, l1, p)),
+    ("squared segment distance", lambda: geometryref.distance_from_segment(l0, l1, p), lambda: distance_sq_from_segment(l0, l1, p)),
+    ("four edge checks", lambda: edge_checks(True, polygon, p, 8.0), lambda: edge_checks(False, polygon, p, 8.0)),
+    ("Coords.rotate", lambda: geometryref.rotate(Coords(30.0, 40.0), angle), lambda: Coords(30.0, 40.0).rotate(angle)),
+    ("calculate_canvas_pos", lambda: geometryref.calculate_canvas_pos(item), item.calculate_canvas_pos)
+  ]
+  
+  print(f"{'':26s} {'before ns':>10} {'after ns':>10} {'speedup':>8}")
+  for label, old, new in rows:
+    before, after = per_call_ns(old), per_call_ns(new)
+    print(f"{label:26s} {before:>10.0f} {after:>10.0f} {before / after:>7.2f}x")
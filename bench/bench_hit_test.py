@@ -0,0 +1,55 @@
+import random
+import sys
+import time
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(path)), "tests"))
+
+from obswsgui.obstypes.obs_object import ModifyType
+from obswsgui.util.geometryutil import Coords
+
+from fakegui import make_gui, scene_item
+
+queries : int = 1000
+
+def linear_hits(gui, coords : Coords) -> list:
+  # the scan get_items_under_mouse ran before the grid, move_or_resize on every item in the scene
+  items_under = []
+  for item in gui.get_current_scene_items():
+    manip_mode = item.move_or_resize(coords)
+    if manip_mode != ModifyType.NONE:
+      items_under.append((item, manip_mode))
+  return items_under
+
+def measure(count : int) -> None:
+  rng = random.Random(count)
+  gui = make_gui()
+  gui.apply_scene_items([scene_item(n, n, rng.uniform(0, 1800), rng.uniform(0, 1000), rng.uniform(40, 300), rng.uniform(40, 300), kind = 'color_source') for n in range(count)], {})
+  # only interactable items can be grabbed, plain sources are not by default
+  for item in gui.get_current_scene_items():
+    item.set_interactable(True)
+  
+  # canvas coordinates inside the output
+  left, top, scale = gui.screen.polygon.point(0).x, gui.screen.polygon.point(0).y, gui.screen.scale
+  points = [Coords(left + rng.uniform(0, gui.screen.width) * scale, top + rng.uniform(0, gui.screen.height) * scale) for _ in range(queries)]
+  
+  start = time.perf_counter()
+  grid = [gui.get_items_under_mouse(p) for p in points]
+  grid_time = time.perf_counter() - start
+  
+  start = time.perf_counter()
+  linear = [linear_hits(gui, p) for p in points]
+  linear_time = time.perf_counter() - start
+  
+  same = all({item for item, _ in a} == {item for item, _ in b} for a, b in zip(grid, linear))
+  hits = sum(len(h) for h in grid) / queries
+  print(f"{count:>6} {grid_time / queries * 1e6:>10.1f} {linear_time / queries * 1e6:>10.1f} {linear_time / grid_time:>8.1f}x {hits:>6.1f} {'yes' if same else 'NO':>5}")
+
+if __name__ == "__main__":
+  print(f"{queries} random hit tests per scene, times are per test")
+  print(f"{'items':>6} {'grid us':>10} {'linear us':>10} {'speedup':>9} {'hits':>6} {'same':>5}")
+  for count in (10, 100, 1000):
+    measure(count)
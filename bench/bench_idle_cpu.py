@@ -0,0 +1,138 @@
+import asyncio
+import sys
+import time
+import types
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(path)), "tests"))
+
+import simpleobsws
+
+from obswsgui.networking.conn import Connection
+from obswsgui.ui import defaultgui
+from obswsgui.util.uiqueue import UIQueue
+
+from fakegui import make_gui, scene_item
+
+duration : float = 3.0
+
+class IdleConnection(Connection):
+  flushes : int = 0
+  
+  async def update(self) -> None:
+    self.flushes += 1
+    self.take_requests()
+    
+class RealtimeRoot:
+  # runs the pump's self-scheduling after() chain in real time, like an otherwise idle Tk mainloop
+  def __init__(self):
+    self.pending = None
+    self.wakeups = 0
+    
+  def after(self, ms : int, func) -> None:
+    self.pending = (time.perf_counter() + ms / 1000.0, func)
+    
+  def run(self, seconds : float) -> None:
+    end = time.perf_counter() + seconds
+    while self.pending and self.pending[0] < end:
+      due, func = self.pending
+      time.sleep(max(due - time.perf_counter(), 0))
+      func()
+      self.wakeups += 1
+
+class CountingConnection(Connection):
+  # an idle OBS with one scene of image inputs, counts every request a sync makes
+  def __init__(self, items : int):
+    super().__init__(None)
+    self.connected = True
+    self.requests = 0
+    self.items = [scene_item(n, n, 10.0 * n) for n in range(items)]
+    
+  async def request(self, req : simpleobsws.Request) -> simpleobsws.RequestResponse:
+    self.requests += 1
+    data = {
+      'GetCurrentProgramScene': { 'currentProgramSceneName': "Scene" },
+      'GetVideoSettings': { 'baseWidth': 1920, 'baseHeight': 1080 },
+      'GetSceneItemList': { 'sceneItems': self.items },
+      'GetInputSettings': { 'inputSettings': { 'file': "" } }
+    }[req.requestType]
+    return simpleobsws.RequestResponse(req.requestType, simpleobsws.RequestStatus(True, 100), data)
+  
+class SkippedUI:
+  # requests don't depend on what the sync does to the canvas, so none of it runs
+  async def run(self, func, *args) -> None:
+    pass
+
+def measure_sync_requests(events : bool, event_every : float = None) -> None:
+  gui = make_gui()
+  gui.connected = True
+  gui.events_enabled = events
+  gui.video_settings_dirty = False
+  gui.last_reconcile = 0.0
+  gui.connection = CountingConnection(50)
+  gui.ui_queue = SkippedUI()
+  
+  # a simulated minute of sync_update ticks, on a clock the GUI reads instead of the wall clock
+  clock = [0.0]
+  defaultgui.time = types.SimpleNamespace(time = lambda: clock[0], perf_counter = time.perf_counter)
+  
+  async def run() -> None:
+    next_event = event_every
+    while clock[0] < 60.0:
+      if event_every and clock[0] >= next_event:
+        next_event += event_every
+        await gui.on_obs_event('SceneItemCreated', { 'sceneName': "Scene" })
+      await gui.sync_update()
+      clock[0] += 1.0 / gui.sync_rate
+  try:
+    asyncio.run(run())
+  finally:
+    defaultgui.time = time
+    
+  label = ("sync, events" if events else "sync, polling") + (f" + 1 per {event_every:.0f}s" if event_every else "")
+  print(f"{label:26s} {gui.connection.requests:6d} requests/min for 50 items")
+
+def measure_flusher(polling : bool) -> None:
+  gui = make_gui()
+  gui.connected = True
+  gui.connection = IdleConnection(None)
+  
+  async def run() -> None:
+    if polling:
+      # the fixed rate loop flush_requests used to run in
+      task = gui.run_periodically(lambda: gui.flush_rate, gui.flush_requests)
+    else:
+      task = gui.run_flushes()
+    try:
+      await asyncio.wait_for(task, duration)
+    except asyncio.TimeoutError:
+      pass
+    
+  cpu = time.process_time()
+  asyncio.run(run())
+  cpu = time.process_time() - cpu
+  label = "flusher, fixed 30Hz" if polling else "flusher, wait for work"
+  print(f"{label:26s} {gui.connection.flushes / duration:6.1f} flushes/s   {1000.0 * cpu / duration:6.2f}ms cpu/s")
+
+def measure_pump(backoff : bool) -> None:
+  root = RealtimeRoot()
+  UIQueue(root) if backoff else UIQueue(root, idle_interval_ms = 5)
+  
+  cpu = time.process_time()
+  root.run(duration)
+  cpu = time.process_time() - cpu
+  label = "ui pump, backoff" if backoff else "ui pump, fixed 5ms"
+  print(f"{label:26s} {root.wakeups / duration:6.1f} wakeups/s  {1000.0 * cpu / duration:6.2f}ms cpu/s")
+
+if __name__ == "__main__":
+  # nothing is queued for the whole run, so every wakeup is overhead
+  measure_flusher(True)
+  measure_flusher(False)
+  measure_pump(False)
+  measure_pump(True)
+  measure_sync_requests(False)
+  measure_sync_requests(True)
+  measure_sync_requests(True, 1.0)
@@ -0,0 +1,93 @@
+import io
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+
+from PIL import Image
+
+from obswsgui.obstypes import imageinput
+from obswsgui.util.diskcache import DiskCache
+
+delay : float = 0.2 # seconds of simulated server and network latency per request
+
+def png_bytes(width : int, height : int) -> bytes:
+  buf = io.BytesIO()
+  Image.effect_noise((width, height), 64).convert('RGB').save(buf, 'PNG')
+  return buf.getvalue()
+
+class SlowHandler(BaseHTTPRequestHandler):
+  body = png_bytes(1920, 1080)
+  cache_control = None
+  
+  def do_GET(self) -> None:
+    time.sleep(delay)
+    if self.headers.get('If-None-Match') == '"v1"':
+      self.send_response(304)
+      self.send_header('ETag', '"v1"')
+      self.end_headers()
+      return
+    self.send_response(200)
+    self.send_header('ETag', '"v1"')
+    if self.cache_control:
+      self.send_header('Cache-Control', self.cache_control)
+    self.send_header('Content-Length', str(len(self.body)))
+    self.end_headers()
+    self.wfile.write(self.body)
+    
+  def log_message(self, *args) -> None:
+    pass
+
+def timed(func) -> float:
+  start = time.perf_counter()
+  func()
+  return 1000.0 * (time.perf_counter() - start)
+
+def run(url : str, directory : Path, cache_control : str) -> None:
+  SlowHandler.cache_control = cache_control
+  imageinput.download_cache = DiskCache(directory, 256 * 1024 * 1024)
+  
+  cold = timed(lambda: imageinput.fetch_image(url))
+  # a new cache object reads the index back from disk, like the next launch would
+  imageinput.download_cache = DiskCache(directory, 256 * 1024 * 1024)
+  warm = timed(lambda: imageinput.fetch_image(url))
+  
+  label = cache_control or "no Cache-Control"
+  print(f"{label:18s} cold {cold:7.1f}ms  warm {warm:7.1f}ms")
+  
+def index_writes(directory : Path, reads : int) -> None:
+  cache = DiskCache(directory, 256 * 1024 * 1024)
+  cache.store("key", b"x" * 1024)
+  
+  writes = 0
+  save_index = cache.save_index
+  def counting_save() -> None:
+    nonlocal writes
+    writes += 1
+    save_index()
+  cache.save_index = counting_save
+  
+  elapsed = timed(lambda: [cache.read("key") for _ in range(reads)])
+  cache.flush()
+  print(f"{reads} cache hits: {writes} index writes including the flush, {elapsed:.1f}ms")
+  
+if __name__ == "__main__":
+  httpd = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+  threading.Thread(target = httpd.serve_forever, daemon = True).start()
+  base = f"http://127.0.0.1:{httpd.server_address[1]}"
+  
+  with tempfile.TemporaryDirectory() as tmp:
+    # within the freshness window the warm load never contacts the server
+    run(f"{base}/fresh.png", Path(tmp) / "fresh", None)
+    # max-age=0 forces a conditional request, the 304 still skips the body
+    run(f"{base}/revalidated.png", Path(tmp) / "revalidated", "max-age=0")
+    index_writes(Path(tmp) / "writes", 1000)
+    
+  httpd.shutdown()
@@ -0,0 +1,106 @@
+import math
+import sys
+import time
+import types
+from types import SimpleNamespace
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(path)), "tests"))
+
+from PIL import Image
+
+from obswsgui.obstypes import imageinput
+from obswsgui.obstypes.imageinput import ImageInput, build_mip_levels
+from obswsgui.obstypes.obs_object import ModifyType
+from obswsgui.ui.defaultgui import SHIFT_MASK
+from obswsgui.util.geometryutil import Coords
+from obswsgui.util.lrucache import LRUCache
+
+from fakecanvas import FakePhotoImage
+from fakegui import center, make_gui
+
+scene_size : int = 20
+events : int = 100
+target_ms : float = 8.0
+
+# PhotoImage needs a display, the bench times everything up to handing the PIL image to Tk
+imageinput.ImageTk = types.SimpleNamespace(PhotoImage = FakePhotoImage)
+
+def event(x : float, y : float, shift : bool = False) -> SimpleNamespace:
+  return SimpleNamespace(x = x, y = y, state = SHIFT_MASK if shift else 0)
+
+def make_scene(preview : bool):
+  gui = make_gui()
+  imageinput.render_cache = LRUCache(64 * 1024 * 1024, lambda img: img.width() * img.height() * 4)
+  mips = build_mip_levels(Image.new('RGB', (1920, 1080), (200, 40, 40)))
+  for n in range(scene_size):
+    # a 5x4 grid, so every handle is clear of the neighbouring items
+    item = ImageInput(n + 1, n, gui.canvas, gui.screen, 12.0 + 384.0 * (n % 5), 35.0 + 270.0 * (n // 5), 360.0, 200.0, 0.0, 1920.0, 1080.0, 'OBS_BOUNDS_NONE', f"image{n}")
+    item.img_url = f"http://example/{n}.png"
+    item.mip_levels = mips
+    item.invalidate_drawn()
+    item.schedule_redraw()
+    gui.add_scene_item(item)
+  gui.canvas.run_scheduled()
+  
+  if not preview:
+    # full quality renders on every motion event, as before previews
+    gui.screen.set_interacting = lambda interacting: None
+  return gui
+
+def drag(gui, grab : Coords, path) -> tuple:
+  # shift-click selects without building the modify panel, which needs real Tk widgets
+  gui.mouseDown(event(grab.x, grab.y, shift = True))
+  mode = gui.manip_mode
+  
+  times = []
+  for n in range(1, events + 1):
+    x, y = path(n)
+    start = time.perf_counter()
+    gui.mouseMove(event(x, y))
+    # Tk runs the idle redraw before the next motion event
+    gui.canvas.run_scheduled()
+    times.append(time.perf_counter() - start)
+  
+  start = time.perf_counter()
+  gui.mouseUp(event(*path(events)))
+  gui.canvas.run_scheduled()
+  release = time.perf_counter() - start
+  return mode, times, release
+
+def move(gui) -> tuple:
+  grab = center(gui.get_current_scene_items()[-1])
+  return drag(gui, grab, lambda n: (grab.x + n, grab.y + n / 2))
+
+def resize(gui) -> tuple:
+  # a copy, the polygon's own points move with the item
+  corner = gui.get_current_scene_items()[-1].polygon.point(2).__copy__()
+  return drag(gui, corner, lambda n: (corner.x - n, corner.y - n / 2))
+
+def rotate(gui) -> tuple:
+  item = gui.get_current_scene_items()[-1]
+  middle = item.polygon.centroid()
+  grab = item.rotator_grabber_pos.__copy__()
+  radius = (grab - middle).magnitude()
+  # sweep the handle around the middle of the item
+  return drag(gui, grab, lambda n: (middle.x + radius * math.sin(n * 0.03), middle.y - radius * math.cos(n * 0.03)))
+
+def measure(label : str, scenario, preview : bool) -> None:
+  gui = make_scene(preview)
+  mode, times, release = scenario(gui)
+  assert mode != ModifyType.NONE and gui.selection
+  
+  times.sort()
+  mean = sum(times) / len(times)
+  p95 = times[int(len(times) * 0.95) - 1]
+  print(f"{label:10s} {'preview' if preview else 'full':8s} {mean * 1e3:8.2f} {p95 * 1e3:8.2f} {times[-1] * 1e3:8.2f} {release * 1e3:9.2f}  {'ok' if p95 * 1e3 < target_ms else 'over'}")
+
+if __name__ == "__main__":
+  print(f"{scene_size} 360x200 images from a 1920x1080 source, {events} motion events, target {target_ms:.0f}ms per event")
+  print(f"{'':10s} {'':8s} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8} {'release':>9}")
+  for label, scenario in (("move", move), ("resize", resize), ("rotate", rotate)):
+    measure(label, scenario, False)
+    measure(label, scenario, True)
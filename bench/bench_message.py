@@ -0,0 +1,54 @@
+import sys
+import timeit
+import uuid
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+
+from obswsgui import Message
+
+def transform(n : int) -> dict:
+  return {
+    'requestType': "SetSceneItemTransform",
+    'requestData': { 'sceneName': "Scene", 'sceneItemId': n, 'sceneItemTransform': { 'positionX': 100.5 + n, 'positionY': 200.25, 'rotation': 0.0, 'scaleX': 1.0, 'scaleY': 1.0 } }
+  }
+
+def scene_items(count : int) -> dict:
+  return {
+    'requestType': "GetSceneItemList",
+    'requestStatus': { 'result': True, 'code': 100, 'comment': None },
+    'responseData': { 'sceneItems': [{ 'sceneItemId': n, 'sceneItemIndex': n, 'sourceName': f"source{n}", 'inputKind': "image_source", 'sceneItemTransform': transform(n)['requestData']['sceneItemTransform'] } for n in range(count)] }
+  }
+
+def make(msg_type : str, data : dict) -> Message:
+  msg = Message()
+  msg.code = "abcdef"
+  msg.id = uuid.uuid4().int
+  msg.msg_type = msg_type
+  msg.has_data = True
+  msg.data = data
+  return msg
+
+cases = [
+  ("status_response", make("status_response", { 'status_code': 200, 'message': "Emitted." })),
+  ("one transform", make("emit_request", transform(1))),
+  ("batch of 50", make("emit_batch", { 'requests': [transform(n) for n in range(50)] })),
+  ("200 item list", make("await_response", scene_items(200)))
+]
+
+def measure(msg : Message, binary : bool) -> tuple:
+  frame = msg.encode(binary)
+  size = len(frame.encode() if isinstance(frame, str) else frame)
+  number = max(20, 20000 // max(size // 100, 1))
+  encode = min(timeit.repeat(lambda: msg.encode(binary), number = number, repeat = 5)) / number
+  decode = min(timeit.repeat(lambda: Message(frame), number = number, repeat = 5)) / number
+  return size, encode, decode
+
+if __name__ == "__main__":
+  print(f"{'':16s} {'json bytes':>10s} {'binary':>8s}  {'json enc':>9s} {'binary':>9s}  {'json dec':>9s} {'binary':>9s}")
+  for name, msg in cases:
+    jsize, jenc, jdec = measure(msg, False)
+    bsize, benc, bdec = measure(msg, True)
+    print(f"{name:16s} {jsize:10d} {bsize:8d}  {1e6 * jenc:7.1f}us {1e6 * benc:7.1f}us  {1e6 * jdec:7.1f}us {1e6 * bdec:7.1f}us")
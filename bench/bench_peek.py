@@ -0,0 +1,35 @@
+import sys
+import timeit
+import uuid
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+
+from obswsgui import Message
+
+def make(item_count : int) -> Message:
+  msg = Message()
+  msg.code = "abcdef"
+  msg.id = uuid.uuid4().int
+  msg.msg_type = "await_response"
+  msg.has_data = True
+  msg.data = { 'responseData': { 'sceneItems': [{ 'sceneItemId': n, 'sourceName': f"source{n}", 'sceneItemTransform': { 'positionX': 1.5 * n, 'positionY': 2.5 * n } } for n in range(item_count)] } }
+  return msg
+
+def per_call(func, number : int) -> float:
+  return min(timeit.repeat(func, number = number, repeat = 5)) / number
+
+if __name__ == "__main__":
+  # what the relay does per frame: read code, id and type to route it, the payload is forwarded untouched
+  print(f"{'payload':>14s} {'framing':>7s} {'bytes':>7s}  {'full parse':>10s} {'peek':>8s}  speedup")
+  for items in (0, 10, 200):
+    msg = make(items)
+    for binary in (False, True):
+      frame = msg.encode(binary)
+      size = len(frame.encode() if isinstance(frame, str) else frame)
+      number = 20000 if items < 200 else 500
+      full = per_call(lambda: Message(frame), number)
+      peek = per_call(lambda: Message.peek(frame), number)
+      print(f"{items:8d} items {'binary' if binary else 'json':>7s} {size:7d}  {1e6 * full:8.1f}us {1e6 * peek:6.2f}us  {full / peek:6.1f}x")
@@ -0,0 +1,61 @@
+import sys
+import time
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(path)), "tests"))
+
+from fakegui import make_gui, scene_item
+
+scene_size : int = 500
+frames : int = 20
+changes_per_frame : int = 3 # transform updates per item that land in one Tk idle pass
+
+def make_scene():
+  gui = make_gui()
+  gui.apply_scene_items([scene_item(n + 1, n, (n * 37) % 1800, (n * 53) % 1000, 100.0, 60.0, 'color_source_v3') for n in range(scene_size)], {})
+  # interactable items carry grabbers and the rotator handle, the most canvas items per object
+  for item in gui.get_current_scene_items():
+    item.set_interactable(True)
+    item.schedule_redraw()
+  # the first pass draws every shape, measurements start from a settled canvas
+  gui.canvas.run_scheduled()
+  return gui
+
+def pan(gui, frame : int, immediate : bool) -> None:
+  for change in range(changes_per_frame):
+    for item in gui.get_current_scene_items():
+      item.set_transform(item.x + 1.0, item.y, local = False)
+      if immediate:
+        # every change redrawn in full on the spot, the way set_transform worked before redraws were queued
+        item.invalidate_drawn()
+        gui.screen.flush_redraws()
+
+def resize(gui, frame : int, immediate : bool) -> None:
+  # a window resize changes the output scale, so every item redraws its whole shape
+  gui.canvas.width = 1280 + (frame % 2 + 1) * 100
+  gui.canvas.height = 720 + (frame % 2 + 1) * 60
+  gui.canvas_configure()
+
+def measure(label : str, scenario, immediate : bool = False) -> None:
+  gui = make_scene()
+  
+  calls = gui.canvas.calls
+  start = time.perf_counter()
+  for frame in range(frames):
+    scenario(gui, frame, immediate)
+    # Tk's idle pass, where queued redraws run
+    gui.canvas.run_scheduled()
+  elapsed = time.perf_counter() - start
+  
+  per_frame = (gui.canvas.calls - calls) / frames
+  print(f"{label:34s} {per_frame:8.0f} {per_frame / scene_size:8.1f} {1000.0 * elapsed / frames:8.2f}")
+
+if __name__ == "__main__":
+  print(f"{scene_size} items, {changes_per_frame} transform updates per item in each pan frame, {frames} frames")
+  print(f"{'':34s} {'calls':>8} {'per item':>8} {'ms':>8}")
+  measure("pan, redraw on every change", pan, immediate = True)
+  measure("pan, queued redraws", pan)
+  measure("full redraw (resize)", resize)
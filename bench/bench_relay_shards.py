@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+
+from websockets.asyncio.client import connect
+
+from obswsgui import Message
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "obswsgui", "backend.py")
+
+def message(code : str, id : int, msg_type : str, data : dict) -> str:
+  msg = Message()
+  msg.code = code
+  msg.id = id
+  msg.msg_type = msg_type
+  msg.has_data = True
+  msg.data = data
+  return msg.to_data()
+
+async def drain(ws) -> int:
+  count = 0
+  try:
+    async for _ in ws:
+      count += 1
+  except Exception:
+    pass
+  return count
+
+async def run_room(port : int, code : str, duration : float) -> int:
+  host = await connect(f"ws://127.0.0.1:{port}", max_size = None)
+  await host.send(message(code, 1, "server_subscribe", { 'protocols': ["json"], 'version': 1 }))
+  await host.recv()
+  client = await connect(f"ws://127.0.0.1:{port}", max_size = None)
+  await client.send(message(code, 2, "client_subscribe", { 'protocols': ["json"], 'version': 1 }))
+  await client.recv()
+  
+  received = asyncio.create_task(drain(host))
+  acks = asyncio.create_task(drain(client))
+  
+  frame = message(code, 3, "emit_request", { 'requestType': "SetSceneItemTransform", 'requestData': { 'sceneName': "Scene", 'sceneItemId': 1, 'sceneItemTransform': { 'positionX': 1.0, 'positionY': 2.0 } } })
+  deadline = time.monotonic() + duration
+  while time.monotonic() < deadline:
+    for _ in range(50):
+      await client.send(frame)
+    await asyncio.sleep(0)
+  
+  await asyncio.sleep(0.5)
+  await client.close()
+  await host.close()
+  acks.cancel()
+  return await received
+
+def generator(port : int, codes : list, duration : float, results : multiprocessing.Queue) -> None:
+  async def run():
+    return sum(await asyncio.gather(*(run_room(port, code, duration) for code in codes)))
+  results.put(asyncio.run(run()))
+
+def bench(workers : int, rooms : int, generators : int, duration : float) -> float:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    
+  relay = subprocess.Popen([sys.executable, BACKEND, "--port", str(port), "--workers", str(workers)], stderr = subprocess.DEVNULL)
+  try:
+    time.sleep(1.0 + 0.5 * workers)
+    
+    codes = [f"room-{i}" for i in range(rooms)]
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target = generator, args = (port, codes[i::generators], duration, results)) for i in range(generators)]
+    for proc in procs:
+      proc.start()
+    total = sum(results.get() for _ in procs)
+    for proc in procs:
+      proc.join()
+    return total / duration
+  finally:
+    relay.terminate()
+    relay.wait(5)
+
+if __name__ == '__main__':
+  parser = argparse.ArgumentParser()
+  parser.add_argument('--workers', type = int, nargs = "+", default = [1, 2, 4])
+  parser.add_argument('--rooms', type = int, default = 64)
+  parser.add_argument('--generators', type = int, default = os.cpu_count())
+  parser.add_argument('--duration', type = float, default = 5.0)
+  args = parser.parse_args()
+  
+  print(f"{os.cpu_count()} cpus, {args.rooms} rooms, {args.generators} load generator processes")
+  print(f"{'workers':>8} {'frames/s':>10}")
+  for workers in args.workers:
+    print(f"{workers:>8} {bench(workers, args.rooms, args.generators, args.duration):>10.0f}")
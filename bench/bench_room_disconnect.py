@@ -0,0 +1,44 @@
+import sys
+import time
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+
+from obswsgui import backend
+
+class FakeSocket:
+  remote_address = ("127.0.0.1", 0)
+
+def populate(room_count : int, clients_per_room : int) -> list:
+  backend.rooms.clear()
+  backend.memberships.clear()
+  
+  sockets = []
+  for i in range(room_count):
+    code = f"room{i}"
+    room = backend.Room()
+    room.room_host = FakeSocket()
+    backend.join_room(room.room_host, code)
+    for _ in range(clients_per_room):
+      ws = FakeSocket()
+      room.clients.add(ws)
+      backend.join_room(ws, code)
+      sockets.append(ws)
+    backend.rooms[code] = room
+  return sockets
+
+def bench(room_count : int, clients_per_room : int = 2, samples : int = 1000) -> float:
+  sockets = populate(room_count, clients_per_room)
+  victims = sockets[::max(1, len(sockets) // samples)][:samples]
+  
+  start = time.perf_counter()
+  for ws in victims:
+    backend.remove_conn_from_rooms(ws)
+  return (time.perf_counter() - start) / len(victims)
+
+if __name__ == '__main__':
+  print(f"{'rooms':>8} {'us/disconnect':>14}")
+  for count in (10, 100, 1000, 10000, 50000):
+    print(f"{count:>8} {bench(count) * 1e6:>14.2f}")
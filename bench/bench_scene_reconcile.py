@@ -0,0 +1,58 @@
+import random
+import sys
+import time
+
+if __package__ is None:
+  import os.path
+  path = os.path.realpath(os.path.abspath(__file__))
+  sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
+  sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(path)), "tests"))
+
+from obswsgui import Default_GUI
+
+from fakegui import make_gui, scene_item
+
+# text sources need a Tk font, so the scene is made of images and plain sources
+kinds = ['image_source', 'color_source_v3']
+
+def bench_item(n : int, count : int, x : float = None) -> dict:
+  return scene_item(n + 1, count - 1 - n, (n * 37) % 1800 if x is None else x, (n * 53) % 1000, 120.0, 80.0, kinds[n % len(kinds)])
+
+def measure(gui : Default_GUI, item_list : list, rounds : int) -> tuple:
+  calls = gui.canvas.calls
+  start = time.perf_counter()
+  for _ in range(rounds):
+    gui.apply_scene_items(item_list, {})
+    gui.canvas.run_scheduled()
+  elapsed = (time.perf_counter() - start) / rounds
+  return elapsed, (gui.canvas.calls - calls) / rounds
+
+def bench(count : int, rounds : int) -> None:
+  gui = make_gui()
+  item_list = [bench_item(n, count) for n in range(count)]
+  
+  initial, initial_calls = measure(gui, item_list, 1)
+  unchanged, unchanged_calls = measure(gui, item_list, rounds)
+  
+  # one item moved in OBS, the common case while someone else is editing
+  moved = list(item_list)
+  moved[count // 2] = bench_item(count // 2, count, x = 5.0)
+  one_moved, one_moved_calls = measure(gui, moved, 1)
+  
+  # the whole list reordered, forces a restack
+  shuffled = [dict(i) for i in item_list]
+  order = list(range(count))
+  random.Random(count).shuffle(order)
+  for i, index in zip(shuffled, order):
+    i['sceneItemIndex'] = index
+  reordered, reordered_calls = measure(gui, shuffled, 1)
+  
+  print(f"{count:5d} items  initial {1000.0 * initial:8.2f}ms {initial_calls:7.0f} calls"
+        f"  unchanged {1000.0 * unchanged:7.2f}ms {unchanged_calls:6.0f} calls"
+        f"  one moved {1000.0 * one_moved:7.2f}ms {one_moved_calls:6.0f} calls"
+        f"  reordered {1000.0 * reordered:7.2f}ms {reordered_calls:6.0f} calls")
+
+if __name__ == "__main__":
+  # canvas calls are counted rather than timed, a real Tk canvas costs a Tcl round trip for each
+  for count in (10, 200, 2000):
+    bench(count, 20 if count < 2000 else 5)
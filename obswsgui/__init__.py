@@ -4,12 +4,16 @@ from .ui.proxiedservergui import ProxiedServer_GUI
 
 from .networking.conn import (
   RequestResponseHandler,
+  EventHandler,
+  FlushHandler,
   Connection
 )
 
 from .networking.proxiedconn import (
   Message,
-  ProxiedConnection
+  ProxiedConnection,
+  choose_protocol,
+  PROTOCOL_VERSION
 )
 
 from .networking.directconn import (
@@ -6,11 +6,19 @@ logging.basicConfig(level = logging.INFO)
 
 import asyncio
 import argparse
+import functools
+import multiprocessing
+import socket
+import zlib
 from websockets import server
+from websockets.frames import Opcode
+from websockets.server import ServerProtocol
 from websockets import typing as wstypes
 from websockets import exceptions as wsexceptions
 import typing
 import ssl
+import time
+import collections
 import pathlib
 import sys
 
@@ -20,24 +28,178 @@ if __package__ is None and not getattr(sys, 'frozen', False):
     path = os.path.realpath(os.path.abspath(__file__))
     sys.path.insert(0, os.path.dirname(os.path.dirname(path)))
     
-from obswsgui import Message
+from obswsgui import Message, choose_protocol, PROTOCOL_VERSION
 
 class Room:
-  room_host : server.WebSocketServerProtocol = []
-  clients : typing.List[server.WebSocketServerProtocol] = []
+  room_host : server.WebSocketServerProtocol = None
+  clients : typing.Set[server.WebSocketServerProtocol] = None
+  host_batching : bool = False # the host said in server_subscribe that it runs emit_batch
+  
+  routed_responses : int = 0
+  broadcast_responses : int = 0
+  frames_out : int = 0
+  
+  def __init__(self):
+    self.room_host = None
+    self.clients = set()
+    self.host_batching = False
+    self.routed_responses = 0
+    self.broadcast_responses = 0
+    self.frames_out = 0
+    
+  def is_empty(self) -> bool:
+    return self.room_host is None and not self.clients
+
+class Outbox:
+  websocket : server.WebSocketServerProtocol = None
+  queue : asyncio.Queue = None
+  task : asyncio.Task = None
+  
+  def __init__(self, websocket : server.WebSocketServerProtocol, maxsize : int):
+    self.websocket = websocket
+    self.queue = asyncio.Queue(maxsize)
+    self.task = asyncio.create_task(self.run())
+    
+  async def run(self) -> None:
+    while True:
+      data = await self.queue.get()
+      try:
+        await self.websocket.send(data)
+      except wsexceptions.ConnectionClosed:
+        remove_conn_from_rooms(self.websocket)
+        break
+      
+  def put(self, data : wstypes.Data) -> bool:
+    try:
+      self.queue.put_nowait(data)
+      return True
+    except asyncio.QueueFull:
+      return False
+    
+  def close(self) -> None:
+    self.task.cancel()
 
 rooms : typing.Dict[str, Room] = {}
+memberships : typing.Dict[server.WebSocketServerProtocol, typing.Set[str]] = {}
+outboxes : typing.Dict[server.WebSocketServerProtocol, Outbox] = {}
+binary_conns : typing.Set[server.WebSocketServerProtocol] = set()
+
+pending_requests : typing.OrderedDict[typing.Tuple[str, int], typing.Tuple[server.WebSocketServerProtocol, float]] = collections.OrderedDict()
+
+request_ttl : float = 30.0
+outbox_size : int = 256
+slow_consumer_policy : str = "drop"
+
+# sharded mode
+worker_start_timeout : float = 10.0
+worker_restart_delay : float = 1.0
+handoff_timeout : float = 10.0
+max_request_size : int = 16 * 1024
+max_first_frame : int = 64 * 1024
+peek_retry_delay : float = 0.005
 
 ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
 
+def join_room(websocket : server.WebSocketServerProtocol, code : str) -> None:
+  memberships.setdefault(websocket, set()).add(code)
+  
+def leave_room(websocket : server.WebSocketServerProtocol, code : str) -> None:
+  room = rooms.get(code)
+  if room:
+    if room.room_host == websocket:
+      room.room_host = None
+    room.clients.discard(websocket)
+    if room.is_empty():
+      logging.info(f"Closing room \"{code}\": {room.routed_responses} routed, {room.broadcast_responses} broadcast, {room.frames_out} frames sent.")
+      del rooms[code]
+      
+  codes = memberships.get(websocket)
+  if codes is not None:
+    codes.discard(code)
+    if not codes:
+      del memberships[websocket]
+
 def remove_conn_from_rooms(websocket : server.WebSocketServerProtocol):
-  for room in rooms:
-    if rooms[room].room_host == websocket:
-      rooms[room].room_host = None
-    if websocket in rooms[room].clients:
-      rooms[room].clients.remove(websocket)
+  for code in list(memberships.get(websocket, ())):
+    leave_room(websocket, code)
+    
+  outbox = outboxes.pop(websocket, None)
+  if outbox:
+    outbox.close()
+    
+  binary_conns.discard(websocket)
+  
+def negotiate(websocket : server.WebSocketServerProtocol, msg : Message) -> str:
+  data = msg.data or {}
+  # binary frames carry the framing version, peers on another version are answered in JSON
+  offered = data.get('protocols', []) if data.get('version') == PROTOCOL_VERSION else []
+  protocol = choose_protocol(offered)
+  if protocol == "binary":
+    binary_conns.add(websocket)
+  else:
+    binary_conns.discard(websocket)
+  return protocol
+
+def encode_for(websocket : server.WebSocketServerProtocol, msg : Message) -> wstypes.Data:
+  return msg.encode(websocket in binary_conns)
+    
+def get_outbox(websocket : server.WebSocketServerProtocol) -> Outbox:
+  outbox = outboxes.get(websocket)
+  if not outbox:
+    outbox = Outbox(websocket, outbox_size)
+    outboxes[websocket] = outbox
+  return outbox
+    
+def broadcast(clients : typing.Iterable[server.WebSocketServerProtocol], msg : Message) -> None:
+  encoded : typing.Dict[bool, wstypes.Data] = {}
+  for client in list(clients):
+    binary = client in binary_conns
+    if binary not in encoded:
+      encoded[binary] = msg.encode(binary)
+      
+    if get_outbox(client).put(encoded[binary]):
+      continue
+    
+    if slow_consumer_policy == "disconnect":
+      logging.warning(f"Disconnecting slow client {client.remote_address}.")
+      remove_conn_from_rooms(client)
+      asyncio.create_task(client.close(1008, "Client too slow."))
+    else:
+      logging.warning(f"Outbound queue full, dropped message for {client.remote_address}.")
+    
+def remember_request(websocket : server.WebSocketServerProtocol, code : str, id : int) -> None:
+  now = time.monotonic()
+  while pending_requests:
+    key, (_, expiry) = next(iter(pending_requests.items()))
+    if expiry > now:
+      break
+    del pending_requests[key]
+    
+  pending_requests[(code, id)] = (websocket, now + request_ttl)
+  
+def pop_requester(code : str, id : int) -> server.WebSocketServerProtocol:
+  entry = pending_requests.pop((code, id), None)
+  if not entry:
+    return None
+  
+  websocket, expiry = entry
+  if expiry < time.monotonic():
+    return None
+  return websocket
     
-async def send_status_response(websocket : server.WebSocketServerProtocol, code : str, id : int, status_code : int, message : str) -> None:
+def split_batch(batch : Message) -> typing.List[Message]:
+  singles = []
+  for req in (batch.data or {}).get('requests', []):
+    msg = Message()
+    msg.code = batch.code
+    msg.id = batch.id
+    msg.msg_type = "emit_request"
+    msg.has_data = True
+    msg.data = req
+    singles.append(msg)
+  return singles
+    
+async def send_status_response(websocket : server.WebSocketServerProtocol, code : str, id : int, status_code : int, message : str, extra : dict = None) -> None:
   try:
     msg = Message()
     msg.code = code
@@ -45,12 +207,16 @@ async def send_status_response(websocket : server.WebSocketServerProtocol, code
     msg.msg_type = "status_response"
     msg.has_data = True
     msg.data = { 'status_code': status_code, 'message': message }
-    await websocket.send(msg.to_data())
+    if extra:
+      msg.data.update(extra)
+    await websocket.send(encode_for(websocket, msg))
   except wsexceptions.ConnectionClosed as e:
     remove_conn_from_rooms(websocket)
     
 async def process_message(websocket : server.WebSocketServerProtocol, rawmsg : wstypes.Data) -> bool:
-  msg : Message = Message(rawmsg)
+  msg : Message = Message.peek(rawmsg)
+  if msg.msg_type in ("server_subscribe", "client_subscribe"):
+    msg = Message(rawmsg)
   
   if not msg.code:
     await send_status_response(websocket, 400, f"Improperly formatted message.\n\n{rawmsg}")
@@ -60,7 +226,10 @@ async def process_message(websocket : server.WebSocketServerProtocol, rawmsg : w
       rooms[msg.code] = Room()
     if not rooms[msg.code].room_host:
       rooms[msg.code].room_host = websocket
-      await send_status_response(websocket, msg.code, msg.id, 200, f"Joined room \"{msg.code}\" as host.")
+      rooms[msg.code].host_batching = bool(msg.data and msg.data.get('emit_batch'))
+      join_room(websocket, msg.code)
+      protocol = negotiate(websocket, msg)
+      await send_status_response(websocket, msg.code, msg.id, 200, f"Joined room \"{msg.code}\" as host.", { 'protocol': protocol })
       return True
     else:
       await send_status_response(websocket, "", msg.id, 400, "Room already has a host.")
@@ -70,8 +239,13 @@ async def process_message(websocket : server.WebSocketServerProtocol, rawmsg : w
       await send_status_response(websocket, "", msg.id, 401, "Invalid room code.")
       return False
     if websocket not in rooms[msg.code].clients:
-      rooms[msg.code].clients.append(websocket)
-      await send_status_response(websocket, msg.code, msg.id, 200, f"Joined room \"{msg.code}\" as client.")
+      rooms[msg.code].clients.add(websocket)
+      join_room(websocket, msg.code)
+      protocol = negotiate(websocket, msg)
+      extra = { 'protocol': protocol }
+      if rooms[msg.code].host_batching:
+        extra['emit_batch'] = True
+      await send_status_response(websocket, msg.code, msg.id, 200, f"Joined room \"{msg.code}\" as client.", extra)
       return True
     else:
       await send_status_response(websocket, msg.code, msg.id, 409, f"Already in room \"{msg.code}\" as client.")
@@ -84,7 +258,8 @@ async def process_message(websocket : server.WebSocketServerProtocol, rawmsg : w
       await send_status_response(websocket, "", msg.id, 401, f"Invalid room code.")
       return False
     else:
-      await rooms[msg.code].room_host.send(msg.to_data())
+      remember_request(websocket, msg.code, msg.id)
+      await rooms[msg.code].room_host.send(encode_for(rooms[msg.code].room_host, msg))
       await send_status_response(websocket, msg.code, msg.id, 200, f"Sent, wait for response.")
   elif msg.msg_type == "await_response":
     if msg.code not in rooms:
@@ -94,11 +269,21 @@ async def process_message(websocket : server.WebSocketServerProtocol, rawmsg : w
       await send_status_response(websocket, "", msg.id, 401, "Invalid room code.")
       return False
     else:
-      for client in rooms[msg.code].clients:
-        await client.send(msg.to_data())
-      await send_status_response(websocket, msg.code, msg.id, 200, "Broadcasted.")
+      room = rooms[msg.code]
+      requester = pop_requester(msg.code, msg.id)
+      if requester:
+        if requester in room.clients:
+          broadcast((requester,), msg)
+          room.routed_responses += 1
+          room.frames_out += 1
+        await send_status_response(websocket, msg.code, msg.id, 200, "Routed.")
+      else:
+        broadcast(room.clients, msg)
+        room.broadcast_responses += 1
+        room.frames_out += len(room.clients)
+        await send_status_response(websocket, msg.code, msg.id, 200, "Broadcasted.")
       return True
-  elif msg.msg_type == "emit_request":
+  elif msg.msg_type in ("emit_request", "emit_batch"):
     if msg.code not in rooms:
       await send_status_response(websocket, "", msg.id, 401, 401, "Invalid room code.")
       return False
@@ -106,7 +291,13 @@ async def process_message(websocket : server.WebSocketServerProtocol, rawmsg : w
       await send_status_response(websocket, "", msg.id, 401, 401, f"Invalid room code.")
       return False
     else:
-      await rooms[msg.code].room_host.send(msg.to_data())
+      room = rooms[msg.code]
+      if msg.msg_type == "emit_batch" and not room.host_batching:
+        # the host changed since the client subscribed and this one would ignore the batch
+        for single in split_batch(Message(rawmsg)):
+          await room.room_host.send(encode_for(room.room_host, single))
+      else:
+        await room.room_host.send(encode_for(room.room_host, msg))
       await send_status_response(websocket, msg.code, msg.id, 200, "Emitted.")
       return True
       
@@ -122,6 +313,236 @@ async def handler(websocket : server.WebSocketServerProtocol):
       break
       
       
+def shard_for(code : str, workers : int) -> int:
+  return zlib.crc32(code.encode()) % workers
+
+async def wait_fd(fd : int, writable : bool = False) -> None:
+  loop = asyncio.get_running_loop()
+  ready = loop.create_future()
+  add, remove = (loop.add_writer, loop.remove_writer) if writable else (loop.add_reader, loop.remove_reader)
+  
+  add(fd, lambda: ready.done() or ready.set_result(None))
+  try:
+    await ready
+  finally:
+    remove(fd)
+
+class HandedOffProtocol(server.WebSocketServerProtocol):
+  # the front listener already answered the opening handshake before passing the socket over
+  async def handshake(self, *args, **kwargs) -> str:
+    self.connection_open()
+    return "/"
+
+class Shard:
+  index : int = 0
+  channel : socket.socket = None
+  ready : asyncio.Event = None
+  send_lock : asyncio.Lock = None
+  
+  def __init__(self, index : int):
+    self.index = index
+    self.ready = asyncio.Event()
+    self.send_lock = asyncio.Lock()
+    
+  async def send_socket(self, conn : socket.socket) -> bool:
+    async with self.send_lock:
+      while self.channel:
+        try:
+          socket.send_fds(self.channel, [b"c"], [conn.fileno()])
+          return True
+        except BlockingIOError:
+          await wait_fd(self.channel.fileno(), writable = True)
+        except OSError as e:
+          logging.error(f"Failed to hand a connection to worker {self.index}. {e}")
+          return False
+      return False
+    
+  async def supervise(self) -> None:
+    context = multiprocessing.get_context("spawn")
+    while True:
+      channel, child_channel = socket.socketpair()
+      process = context.Process(target = run_worker, args = (child_channel, request_ttl, outbox_size, slow_consumer_policy), daemon = True)
+      process.start()
+      child_channel.close()
+      channel.setblocking(False)
+      
+      try:
+        async with asyncio.timeout(worker_start_timeout):
+          await wait_fd(channel.fileno())
+        if channel.recv(16) == b"ready":
+          self.channel = channel
+          self.ready.set()
+          logging.info(f"Worker {self.index} ready (pid {process.pid}).")
+      except (TimeoutError, OSError) as e:
+        logging.error(f"Worker {self.index} did not start. {e}")
+        
+      if self.ready.is_set():
+        await wait_fd(process.sentinel)
+      else:
+        process.kill()
+        
+      self.ready.clear()
+      self.channel = None
+      channel.close()
+      process.join()
+      logging.error(f"Worker {self.index} exited with code {process.exitcode}, restarting. Its rooms are lost and their members must reconnect.")
+      await asyncio.sleep(worker_restart_delay)
+
+async def peek(sock : socket.socket, size : int, seen : int) -> bytes:
+  # peeked bytes keep the socket readable, so wait a little when nothing new has arrived
+  await wait_fd(sock.fileno())
+  data = sock.recv(size, socket.MSG_PEEK)
+  if data and len(data) == seen:
+    await asyncio.sleep(peek_retry_delay)
+  return data
+
+async def peek_first_frame(sock : socket.socket, protocol : ServerProtocol) -> Message:
+  # frame bytes are only peeked, so the worker reads the same frame again from the socket
+  fed = 0
+  while True:
+    data = await peek(sock, max_first_frame, fed)
+    if not data or fed >= max_first_frame:
+      return None
+    if len(data) == fed:
+      continue
+    
+    protocol.receive_data(data[fed:])
+    fed = len(data)
+    for frame in protocol.events_received():
+      if frame.opcode == Opcode.TEXT:
+        return Message.peek(bytes(frame.data).decode())
+      if frame.opcode == Opcode.BINARY:
+        return Message.peek(bytes(frame.data))
+      return None
+    
+async def accept_handshake(sock : socket.socket, protocol : ServerProtocol) -> bool:
+  loop = asyncio.get_running_loop()
+  
+  # peek first so bytes past the request stay in the socket for the worker
+  data = b""
+  while True:
+    data = await peek(sock, max_request_size, len(data))
+    end = data.find(b"\r\n\r\n")
+    if end >= 0:
+      break
+    if not data or len(data) >= max_request_size:
+      return False
+    
+  request = await loop.sock_recv(sock, end + 4)
+  protocol.receive_data(request)
+  events = protocol.events_received()
+  if not events:
+    return False
+  
+  response = protocol.accept(events[0])
+  protocol.send_response(response)
+  await loop.sock_sendall(sock, b"".join(protocol.data_to_send()))
+  return response.status_code == 101
+
+async def reject_connection(sock : socket.socket, protocol : ServerProtocol, msg : Message, status_code : int, message : str) -> None:
+  reply = Message()
+  reply.code = ""
+  reply.id = msg.id if msg and isinstance(msg.id, int) else -1
+  reply.msg_type = "status_response"
+  reply.has_data = True
+  reply.data = { 'status_code': status_code, 'message': message }
+  
+  protocol.send_text(reply.to_data().encode())
+  protocol.send_close(1008 if status_code == 400 else 1013, message)
+  await asyncio.get_running_loop().sock_sendall(sock, b"".join(protocol.data_to_send()))
+  
+  # drop the unread first frame so closing doesn't reset the connection before the reply arrives
+  try:
+    sock.recv(max_first_frame)
+  except BlockingIOError:
+    pass
+
+async def front_connection(sock : socket.socket, shards : typing.List[Shard]) -> None:
+  protocol = ServerProtocol()
+  try:
+    async with asyncio.timeout(handoff_timeout):
+      if not await accept_handshake(sock, protocol):
+        return
+      msg = await peek_first_frame(sock, protocol)
+      
+      if not msg or not isinstance(msg.code, str) or not msg.code:
+        await reject_connection(sock, protocol, msg, 400, "Improperly formatted message.")
+        return
+      
+      shard = shards[shard_for(msg.code, len(shards))]
+      try:
+        async with asyncio.timeout(worker_start_timeout):
+          await shard.ready.wait()
+      except TimeoutError:
+        pass
+      
+      if not await shard.send_socket(sock):
+        await reject_connection(sock, protocol, msg, 503, "Relay worker unavailable, try again later.")
+  except (TimeoutError, OSError):
+    pass
+  except Exception as e:
+    logging.error(f"Failed to route connection. {e}")
+  finally:
+    sock.close()
+    
+def run_worker(channel : socket.socket, ttl : float, size : int, policy : str) -> None:
+  global request_ttl, outbox_size, slow_consumer_policy
+  request_ttl = ttl
+  outbox_size = size
+  slow_consumer_policy = policy
+  
+  asyncio.run(worker_main(channel))
+  
+async def worker_main(channel : socket.socket) -> None:
+  loop = asyncio.get_running_loop()
+  ws_server = server.WebSocketServer()
+  factory = functools.partial(HandedOffProtocol, handler, ws_server)
+  
+  channel.setblocking(False)
+  channel.send(b"ready")
+  
+  while True:
+    await wait_fd(channel.fileno())
+    try:
+      data, fds, _, _ = socket.recv_fds(channel, 16, 64)
+    except BlockingIOError:
+      continue
+    if not data:
+      # the front listener is gone
+      return
+    
+    for fd in fds:
+      conn = socket.socket(fileno = fd)
+      conn.setblocking(False)
+      await loop.connect_accepted_socket(factory, conn)
+  
+async def accept_connections(listener : socket.socket, shards : typing.List[Shard]) -> None:
+  loop = asyncio.get_running_loop()
+  connections : typing.Set[asyncio.Task] = set()
+  while True:
+    sock, _ = await loop.sock_accept(listener)
+    task = asyncio.create_task(front_connection(sock, shards))
+    connections.add(task)
+    task.add_done_callback(connections.discard)
+
+async def front_main(host : str, port : str, workers : int):
+  shards = [Shard(i) for i in range(workers)]
+  supervisors = [asyncio.create_task(shard.supervise()) for shard in shards]
+  
+  listener = socket.create_server((host, port), backlog = 1024)
+  listener.setblocking(False)
+  accepting = asyncio.create_task(accept_connections(listener, shards))
+  
+  tasks = [accepting, *supervisors]
+  try:
+    # supervisors never return, one that raised would leave its shard dead, so the relay goes down with it
+    await asyncio.gather(*tasks)
+  finally:
+    for task in tasks:
+      task.cancel()
+    await asyncio.gather(*tasks, return_exceptions = True)
+    listener.close()
+
 async def secure_main(host : str, port : str):
   async with server.serve(handler, host, port, origins = None, ssl = ssl_context):
     await asyncio.Future()
@@ -132,19 +553,38 @@ async def main(host : str, port : str):
     await asyncio.Future()
     
 if __name__ == '__main__':
+  multiprocessing.freeze_support()
+  
   parser = argparse.ArgumentParser()
   parser.add_argument('--host', '-i', default="127.0.0.1", help="API Host IP")
   parser.add_argument('--port', '-p', type=int, default=8080, help="API Port")
   parser.add_argument('--ssl', '-s', action = "store_true", help = "Enable SSL.")
   parser.add_argument('--fullchain', '-f', help = "Path to fullchain.pem")
   parser.add_argument('--privkey', '-k', help = "Path to the privkey to match fullchain.")
+  parser.add_argument('--workers', '-w', type = int, default = 1, help = "Number of relay worker processes. Rooms are sharded across workers by code.")
+  parser.add_argument('--request-ttl', type = float, default = request_ttl, help = "Seconds to remember which client sent an awaited request.")
+  parser.add_argument('--outbox-size', type = int, default = outbox_size, help = "Max queued outbound messages per client.")
+  parser.add_argument('--slow-consumer', choices = ["drop", "disconnect"], default = slow_consumer_policy, help = "What to do when a client's outbound queue is full.")
   
   args = parser.parse_args()
   
+  if args.workers > 1 and args.ssl:
+    parser.error("--workers hands sockets to worker processes and can't be combined with --ssl, terminate TLS in a reverse proxy instead.")
+  if args.workers > 1 and not hasattr(socket, "send_fds"):
+    parser.error("--workers needs a platform that can pass sockets between processes.")
+  
+  request_ttl = args.request_ttl
+  outbox_size = args.outbox_size
+  slow_consumer_policy = args.slow_consumer
+  
   if args.ssl:
     fullchain = pathlib.Path(args.fullchain)
     privkey = pathlib.Path(args.privkey)
     ssl_context.load_cert_chain(fullchain, keyfile = privkey)
+    
+  if args.workers > 1:
+    asyncio.run(front_main(args.host, args.port, args.workers))
+  elif args.ssl:
     asyncio.run(secure_main(args.host, args.port))
   else:
     asyncio.run(main(args.host, args.port))
\ No newline at end of file
@@ -1,11 +1,14 @@
 from .conn import (
   RequestResponseHandler,
+  EventHandler,
   Connection
 )
 
 from .proxiedconn import (
   Message,
-  ProxiedConnection
+  ProxiedConnection,
+  choose_protocol,
+  PROTOCOL_VERSION
 )
 
 from .directconn import (
@@ -1,29 +1,140 @@
+import asyncio
+import logging
+import threading
 import typing
 import simpleobsws
 
 RequestResponseHandler = typing.Callable[[simpleobsws.RequestResponse], None]
+EventHandler = typing.Callable[[str, dict], typing.Awaitable[None]]
+FlushHandler = typing.Callable[[typing.List[simpleobsws.Request]], None]
+
+# request types where a newer request makes a pending one for the same target redundant,
+# mapped to the requestData fields identifying the target and the field whose contents get merged
+COALESCED_REQUESTS : typing.Dict[str, typing.Tuple[typing.Tuple[str, ...], str]] = {
+  'SetSceneItemTransform': (('sceneName', 'sceneItemId'), 'sceneItemTransform'),
+  'SetInputSettings': (('inputName',), 'inputSettings')
+}
 
 class Connection:
   url : str = ""
   
-  request_queue : typing.List[simpleobsws.Request] = []
+  request_queue : typing.List[simpleobsws.Request] = None
+  queued_by_key : typing.Dict[tuple, simpleobsws.Request] = None
+  last_touched_by : typing.Dict[tuple, simpleobsws.Request] = None # newest queued request naming each input or scene item
+  queue_lock : threading.Lock = None # requests are queued from the Tk thread and flushed from the network thread
+  requests_waiting : asyncio.Event = None # set on the network loop once the queue stops being empty
+  loop : asyncio.AbstractEventLoop = None # network loop, known after the first wait_for_requests
+  
+  coalesced_count : int = 0
+  last_flush_coalesced : int = 0
+  total_coalesced : int = 0
   
   error_handler : RequestResponseHandler = None
   unknown_handler : RequestResponseHandler = None
+  flush_handler : FlushHandler = None # sees every batch of requests as it leaves the queue
   
   connected : bool = False
   
   def __init__(self, error_handler : RequestResponseHandler):
     self.error_handler = error_handler
     
+    self.request_queue = []
+    self.queued_by_key = {}
+    self.last_touched_by = {}
+    self.queue_lock = threading.Lock()
+    self.requests_waiting = asyncio.Event()
+  
+  def request_key(self, request : simpleobsws.Request) -> tuple:
+    if request.requestType not in COALESCED_REQUESTS or not request.requestData:
+      return None
+    
+    fields, _ = COALESCED_REQUESTS[request.requestType]
+    return (request.requestType, *(request.requestData.get(field) for field in fields))
+  
+  def request_targets(self, request : simpleobsws.Request) -> typing.List[tuple]:
+    # any request naming an input or scene item, e.g. RemoveInput or SetSceneItemEnabled, counts as touching it
+    if not request.requestData:
+      return []
+    
+    return [(fields, *(request.requestData[field] for field in fields))
+            for fields, _ in COALESCED_REQUESTS.values() if all(field in request.requestData for field in fields)]
+  
   def queue_request(self, request : simpleobsws.Request) -> None:
-    self.request_queue.append(request)
+    key = self.request_key(request)
+    targets = self.request_targets(request)
+    
+    with self.queue_lock:
+      queued = self.queued_by_key.get(key) if key else None
+      
+      # merging into a request that was followed by another one for the same target would run the new values too early
+      if not queued or any(self.last_touched_by.get(target) is not queued for target in targets):
+        was_empty = not self.request_queue
+        self.request_queue.append(request)
+        if key:
+          self.queued_by_key[key] = request
+        for target in targets:
+          self.last_touched_by[target] = request
+        if was_empty:
+          self.wake_flusher()
+        return
+      
+      _, merged_field = COALESCED_REQUESTS[request.requestType]
+      merged = { **queued.requestData.get(merged_field, {}), **request.requestData.get(merged_field, {}) }
+      queued.requestData = { **queued.requestData, **request.requestData, merged_field: merged }
+      self.coalesced_count += 1
+  
+  def wake_flusher(self) -> None:
+    if not self.loop:
+      return
+    try:
+      self.loop.call_soon_threadsafe(self.requests_waiting.set)
+    except RuntimeError:
+      # the network loop already shut down
+      pass
+    
+  async def wait_for_requests(self, timeout : float) -> bool:
+    self.loop = asyncio.get_running_loop()
+    
+    # clear before checking, a request queued after the check sets the event again
+    self.requests_waiting.clear()
+    if self.request_queue:
+      return True
+    
+    try:
+      await asyncio.wait_for(self.requests_waiting.wait(), timeout)
+    except asyncio.TimeoutError:
+      pass
+    return bool(self.request_queue)
+  
+  def take_requests(self) -> typing.List[simpleobsws.Request]:
+    with self.queue_lock:
+      reqs = self.request_queue
+      coalesced = self.coalesced_count
+      
+      self.request_queue = []
+      self.queued_by_key = {}
+      self.last_touched_by = {}
+      self.coalesced_count = 0
+      
+    if coalesced:
+      logging.debug(f"Flushing {len(reqs)} requests, {coalesced} coalesced.")
+    self.last_flush_coalesced = coalesced
+    self.total_coalesced += coalesced
+    
+    if reqs and self.flush_handler:
+      self.flush_handler(reqs)
+    
+    return reqs
+  
+  def register_event_callback(self, callback : EventHandler) -> bool:
+    # connections that can't deliver OBS events return False so callers keep polling
+    return False
   
   async def request(self, req : simpleobsws.Request) -> simpleobsws.RequestResponse:
     None
-    
+  
   async def update(self) -> None:
     None
-    
+  
   async def connect(self) -> None:
     None
\ No newline at end of file
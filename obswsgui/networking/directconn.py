@@ -1,28 +1,55 @@
 import simpleobsws
 import logging
+from websockets import exceptions as wsexceptions
 
-from .conn import Connection, RequestResponseHandler
+from .conn import Connection, EventHandler, RequestResponseHandler
+
+# all non high-volume events plus SceneItemTransformChanged (1 << 19)
+EVENT_SUBSCRIPTIONS = 0x7FF | (1 << 19)
 
 class DirectConnection(Connection):
   obsws : simpleobsws.WebSocketClient = None
   
+  halt_on_failure : bool = False
+  execution_type : simpleobsws.RequestBatchExecutionType = simpleobsws.RequestBatchExecutionType.SerialRealtime
+  
   def __init__(self, url : str, password : str, error_handler : RequestResponseHandler):
     self.url = url
-    self.obsws = simpleobsws.WebSocketClient(url = self.url, password = password)
+    self.obsws = simpleobsws.WebSocketClient(url = self.url, password = password, identification_parameters = simpleobsws.IdentificationParameters(eventSubscriptions = EVENT_SUBSCRIPTIONS))
     
     super().__init__(error_handler)
     
   async def update(self) -> None:
-    for req in self.request_queue:
-      resp = await self.obsws.call(req)
-      
+    if not self.request_queue:
+      return
+    
+    reqs = self.take_requests()
+    
+    try:
+      resps = await self.obsws.call_batch(reqs, halt_on_failure = self.halt_on_failure, execution_type = self.execution_type)
+    except simpleobsws.MessageTimeout as e:
+      logging.error(f"Request batch of {len(reqs)} failed. {e}")
+      return
+    except (simpleobsws.NotIdentifiedError, wsexceptions.ConnectionClosed) as e:
+      logging.error(f"Lost connection to {self.url}, dropped a batch of {len(reqs)} requests. {e}")
+      self.connected = False
+      return
+    
+    for resp in resps:
       if not resp.ok():
         self.error_handler(resp)
         
-    self.request_queue.clear()
-        
+  def register_event_callback(self, callback : EventHandler) -> bool:
+    self.obsws.register_event_callback(callback)
+    return True
+    
   async def request(self, req : simpleobsws.Request) -> simpleobsws.RequestResponse:
-    resp = await self.obsws.call(req)
+    try:
+      resp = await self.obsws.call(req)
+    except (simpleobsws.NotIdentifiedError, wsexceptions.ConnectionClosed) as e:
+      logging.error(f"Lost connection to {self.url}. {e}")
+      self.connected = False
+      return None
     
     if not resp.ok():
       self.error_handler(resp)
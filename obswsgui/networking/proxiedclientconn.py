@@ -1,9 +1,9 @@
 import asyncio
 import logging
+import typing
 import uuid
 
 import simpleobsws
-from websockets import client
 from websockets import exceptions as wsexceptions
 
 from .conn import RequestResponseHandler
@@ -14,6 +14,8 @@ logging.getLogger("websockets.client").setLevel(logging.INFO)
 class ProxiedClientConnection(ProxiedConnection):
   roomcode : str = ""
   
+  max_batch_size : int = 200
+  
   def __init__(self, url : str, roomcode : str, error_handler : RequestResponseHandler):
     self.url = url
     self.roomcode = roomcode
@@ -33,19 +35,27 @@ class ProxiedClientConnection(ProxiedConnection):
     
     return msg
   
+  def batch_to_message(self, reqs : typing.List[simpleobsws.Request]) -> Message:
+    msg = Message()
+    msg.code = self.roomcode
+    msg.id = uuid.uuid4().int
+    msg.msg_type = 'emit_batch'
+    msg.has_data = True
+    msg.data = {
+      'requests': [{ 'requestType': req.requestType, 'requestData': req.requestData } for req in reqs]
+    }
+    
+    return msg
+  
   async def connect(self) -> bool:
     try:
-      self.proxyws = await client.connect(self.url)
+      await self.open_proxy(self.url)
       self.connected = True
       
-      msg = Message()
-      msg.code = self.roomcode
-      msg.id = uuid.uuid4().int
-      msg.msg_type = 'client_subscribe'
-      msg.has_data = False
-      msg.data = {}
+      msg = self.subscribe_message(self.roomcode, 'client_subscribe')
       
       resp = await self.send_message(msg, self.timeout)
+      self.negotiate(resp)
       
       if resp and resp.data['status_code'] >= 400:
         logging.error(f"Error {resp.data['status_code']}: {resp.data['message']}")
@@ -75,42 +85,39 @@ class ProxiedClientConnection(ProxiedConnection):
     
     
   async def update(self) -> None:
-    while True:
-      try: # assume messages in buffer are responses from emitted requests
-        await asyncio.wait_for(self.proxyws.recv(), 0.001)
-      except wsexceptions.ConnectionClosed:
-        self.connected = False
-        break
-      except:
-        break
-      
-    for req in self.request_queue:
-      msg = self.request_to_message('emit_request', req)
+    reqs = self.take_requests()
+    
+    if self.batching:
+      msgs = [self.batch_to_message(reqs[i:i + self.max_batch_size]) for i in range(0, len(reqs), self.max_batch_size)]
+    else:
+      msgs = [self.request_to_message('emit_request', req) for req in reqs]
       
+    for msg in msgs:
       resp = await self.send_message(msg, self.timeout)
       
       if resp and resp.data['status_code'] >= 400:
         logging.error(f"Error {resp.data['status_code']}: {resp.data['message']}")
-        
-    self.request_queue.clear()
       
   async def request(self, req : simpleobsws.Request) -> simpleobsws.RequestResponse:
     if not self.connected:
       return None
     
     msg = self.request_to_message('await_request', req)
+    response = self.waiter(self.response_waiters, msg.id)
     
     resp = await self.send_message(msg, self.timeout)
     
     if not resp:
+      self.drop_waiter(response)
       return None
     
     if resp.data['status_code'] >= 400:
       logging.error(f"Error {resp.data['status_code']}: {resp.data['message']}")
+      self.drop_waiter(response)
       return None
     else:
       try:
-        resp = await asyncio.wait_for(self.await_response(msg.id), 5.0)
+        resp = await asyncio.wait_for(response, self.timeout)
         statusobj = resp.data['requestStatus']
         status = simpleobsws.RequestStatus(statusobj['result'], statusobj['code'], statusobj['comment'])
         return simpleobsws.RequestResponse(resp.data['requestType'], status, resp.data['responseData'])
@@ -118,7 +125,7 @@ class ProxiedClientConnection(ProxiedConnection):
         logging.error("Never recieved awaited request response!")
         self.connected = False
         return None
-      except wsexceptions.ConnectionClosed:
+      except (wsexceptions.ConnectionClosed, ConnectionError):
         logging.error('Connection closed!')
         self.connected = False
         return None
@@ -1,7 +1,11 @@
 import asyncio
 import json
 import logging
+import re
+import struct
 import traceback
+import typing
+import uuid
 
 from websockets import client
 from websockets import exceptions as wsexceptions
@@ -9,12 +13,42 @@ from websockets import typing as wstypes
 
 from .conn import Connection
 
+PROTOCOL_VERSION = 1
+PROTOCOLS = ["binary", "json"]
+
+MSG_TYPES = [
+  "status_response",
+  "server_subscribe",
+  "client_subscribe",
+  "await_request",
+  "await_response",
+  "emit_request",
+  "emit_batch"
+]
+
+# version, msgType index, flags, room code length
+HEADER = struct.Struct("!BBBB")
+FLAG_HAS_DATA = 0x01
+FLAG_HAS_ID = 0x02
+ID_BYTES = 16
+MAX_CODE_BYTES = 255 # the code length is a single header byte
+
+# matches the envelope prefix written by Message.to_data so routing fields can be read without decoding the payload
+JSON_HEADER = re.compile(r'\{"code": ("(?:[^"\\]|\\.)*"), "msgId": (-?\d+), "msgType": "(\w+)"')
+
+def choose_protocol(offered : typing.List[str]) -> str:
+  for protocol in offered:
+    if protocol in PROTOCOLS:
+      return protocol
+  return "json"
+
 class Message:
   code : str = None
   id : int = None
   msg_type : str = None
   has_data : bool = False
   data : dict = None
+  raw : wstypes.Data = None
   
   def __init__(self, data : wstypes.Data = None):
     if not data:
@@ -23,6 +57,16 @@ class Message:
       self.msg_type = ""
       self.has_data = False
       self.data = {}
+    elif isinstance(data, (bytes, bytearray, memoryview)):
+      try:
+        self.from_bytes(data)
+      except Exception as e:
+        self.code = ""
+        self.id = -1
+        self.msg_type = ""
+        self.has_data = False
+        self.data = None
+        logging.error(f"Failed to parse binary message. {e}")
     else:
       try:
         datajson = json.loads(data)
@@ -52,17 +96,172 @@ class Message:
       
   def to_data(self) -> wstypes.Data:
     return json.dumps(self.to_dict())
+  
+  def fits_binary(self) -> bool:
+    return len(self.code.encode()) <= MAX_CODE_BYTES and (self.id is None or int(self.id) < 1 << (8 * ID_BYTES))
+  
+  def to_bytes(self) -> bytes:
+    if not self.fits_binary():
+      raise ValueError(f"Message can't use binary framing, room codes are limited to {MAX_CODE_BYTES} bytes and ids to {ID_BYTES} bytes.")
+    
+    code = self.code.encode()
+    flags = 0
+    if self.has_data:
+      flags |= FLAG_HAS_DATA
+    if self.id is not None and int(self.id) >= 0:
+      flags |= FLAG_HAS_ID
+      
+    parts = [HEADER.pack(PROTOCOL_VERSION, MSG_TYPES.index(self.msg_type), flags, len(code))]
+    if flags & FLAG_HAS_ID:
+      parts.append(int(self.id).to_bytes(ID_BYTES, "big"))
+    parts.append(code)
+    if self.has_data:
+      parts.append(json.dumps(self.data, separators = (",", ":")).encode())
+    
+    return b"".join(parts)
+  
+  def read_header(self, view : memoryview) -> typing.Tuple[int, int]:
+    version, type_index, flags, code_len = HEADER.unpack_from(view)
+    if version != PROTOCOL_VERSION:
+      raise ValueError(f"Unsupported protocol version {version}.")
+    
+    offset = HEADER.size
+    if flags & FLAG_HAS_ID:
+      self.id = int.from_bytes(view[offset:offset + ID_BYTES], "big")
+      offset += ID_BYTES
+    else:
+      self.id = -1
+      
+    self.code = bytes(view[offset:offset + code_len]).decode()
+    offset += code_len
+    
+    self.msg_type = MSG_TYPES[type_index]
+    return flags, offset
+  
+  def from_bytes(self, data : bytes) -> None:
+    view = memoryview(data)
+    flags, offset = self.read_header(view)
+    
+    self.has_data = bool(flags & FLAG_HAS_DATA)
+    self.data = json.loads(bytes(view[offset:])) if self.has_data else {}
+    
+  # reads only the routing fields and keeps the undecoded frame in raw, so the result is read-only
+  @classmethod
+  def peek(cls, data : wstypes.Data) -> 'Message':
+    try:
+      if isinstance(data, (bytes, bytearray, memoryview)):
+        msg = cls()
+        msg.read_header(memoryview(data))
+        msg.raw = data
+        return msg
+      
+      match = JSON_HEADER.match(data)
+      if match:
+        msg = cls()
+        msg.code = json.loads(match.group(1))
+        msg.id = int(match.group(2))
+        msg.msg_type = match.group(3)
+        msg.raw = data
+        return msg
+    except Exception as e:
+      logging.error(f"Failed to read message header. {e}")
+      
+    return cls(data)
+    
+  def encode(self, binary : bool) -> wstypes.Data:
+    if self.raw is not None:
+      if isinstance(self.raw, str) != binary:
+        return self.raw
+      return Message(self.raw).encode(binary)
+    
+    # JSON frames are accepted on binary connections too
+    return self.to_bytes() if binary and self.fits_binary() else self.to_data()
 
 class ProxiedConnection(Connection):
   proxyws : client.WebSocketClientProtocol = None
   timeout = 5.0
+  binary : bool = False
+  batching : bool = False
+  
+  # messages nobody is waiting on are queued in `incoming` when set, otherwise dropped
+  keep_unsolicited : bool = False
+  
+  reader_task : asyncio.Task = None
+  status_waiters : typing.Dict[int, asyncio.Future] = None
+  response_waiters : typing.Dict[int, asyncio.Future] = None
+  incoming : asyncio.Queue = None
+  
+  async def open_proxy(self, url : str) -> None:
+    self.proxyws = await client.connect(url)
+    
+    self.status_waiters = {}
+    self.response_waiters = {}
+    self.incoming = asyncio.Queue()
+    self.reader_task = asyncio.create_task(self.read_loop())
+    
+  async def read_loop(self) -> None:
+    try:
+      async for rawmsg in self.proxyws:
+        msg = Message(rawmsg)
+        
+        waiters = self.status_waiters if msg.msg_type == "status_response" else self.response_waiters
+        try:
+          waiter = waiters.pop(int(msg.id), None)
+        except (TypeError, ValueError, OverflowError):
+          logging.error(f"Ignoring message with invalid id {msg.id!r}.")
+          continue
+        
+        if waiter and not waiter.done():
+          waiter.set_result(msg)
+        elif self.keep_unsolicited:
+          self.incoming.put_nowait(msg)
+    except wsexceptions.ConnectionClosed:
+      pass
+    finally:
+      self.connected = False
+      for waiters in (self.status_waiters, self.response_waiters):
+        for waiter in waiters.values():
+          if not waiter.done():
+            waiter.set_exception(ConnectionError("Connection closed."))
+        waiters.clear()
+        
+  def waiter(self, waiters : typing.Dict[int, asyncio.Future], id : int) -> asyncio.Future:
+    id = int(id)
+    if id not in waiters:
+      future = asyncio.get_running_loop().create_future()
+      future.add_done_callback(lambda _: waiters.pop(id, None))
+      waiters[id] = future
+    return waiters[id]
+  
+  def drop_waiter(self, future : asyncio.Future) -> None:
+    # read_loop may already have failed the future, retrieve the exception so asyncio doesn't log it
+    if not future.done():
+      future.cancel()
+    elif not future.cancelled():
+      future.exception()
+  
+  def subscribe_message(self, code : str, msg_type : str) -> Message:
+    msg = Message()
+    msg.code = code
+    msg.id = uuid.uuid4().int
+    msg.msg_type = msg_type
+    msg.has_data = True
+    msg.data = { 'protocols': PROTOCOLS, 'version': PROTOCOL_VERSION }
+    return msg
+  
+  def negotiate(self, resp : Message) -> None:
+    data = resp.data if resp and resp.data else {}
+    self.binary = data.get('protocol') == "binary"
+    # only set when the room's host advertised it, older hosts drop emit_batch without an error
+    self.batching = bool(data.get('emit_batch'))
   
   async def send_message(self, msg : Message, timeout : float = 5.0) -> Message:
+    status = self.waiter(self.status_waiters, msg.id)
     try:
-      await self.proxyws.send(msg.to_data())
+      await self.proxyws.send(msg.encode(self.binary))
       
-      return await asyncio.wait_for(self.await_status_response(msg.id), timeout)
-    except wsexceptions.ConnectionClosed:
+      return await asyncio.wait_for(status, timeout)
+    except (wsexceptions.ConnectionClosed, ConnectionError):
       logging.error("Connection closed.")
       self.connected = False
       return None
@@ -74,27 +273,11 @@ class ProxiedConnection(Connection):
       logging.error(f"Error: {e}")
       logging.error(traceback.format_exc())
       return None
+    finally:
+      self.drop_waiter(status)
   
   async def await_status_response(self, id : int) -> Message:
-    while True:
-      rawmsg = await self.proxyws.recv()
-      
-      msg = Message(rawmsg)
-      
-      if msg.msg_type == "status_response":
-        if int(msg.id) == id:
-          return msg
+    return await self.waiter(self.status_waiters, id)
     
   async def await_response(self, id : int) -> Message:
-    while True:  
-      rawmsg = await self.proxyws.recv()
-      
-      msg = Message(rawmsg)
-      
-      if msg.id == id:
-        if int(msg.id) == id:
-          return msg
-        else:
-          continue
-      else:
-        continue
\ No newline at end of file
+    return await self.waiter(self.response_waiters, id)
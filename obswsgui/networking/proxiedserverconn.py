@@ -1,6 +1,5 @@
 import asyncio
 import logging
-import uuid
 
 import requests
 import simpleobsws
@@ -19,6 +18,8 @@ class ProxiedServerConnection(ProxiedConnection):
   proxy_url : str = ""
   roomcode : str = ""
   
+  keep_unsolicited : bool = True
+  
   def __init__(self, obs_url : str, password : str, proxy_url : str, roomcode : str, error_handler : RequestResponseHandler):
     self.url = obs_url
     self.proxy_url = proxy_url
@@ -28,6 +29,12 @@ class ProxiedServerConnection(ProxiedConnection):
     
     super().__init__(error_handler)
     
+  def subscribe_message(self, code : str, msg_type : str) -> Message:
+    msg = super().subscribe_message(code, msg_type)
+    # update() runs emit_batch, so the relay can pass batches through instead of splitting them
+    msg.data['emit_batch'] = True
+    return msg
+    
   def log_requests_response(self, resp : requests.Response, comment : str = None) -> None:
     if comment:
       logging.error(comment)
@@ -38,22 +45,13 @@ class ProxiedServerConnection(ProxiedConnection):
     identified = await self.obsws.wait_until_identified()
     
     try:
-      self.proxyws = await client.connect(self.proxy_url)
+      await self.open_proxy(self.proxy_url)
       self.connected = True
       
-      joincontent = {
-        'code': self.roomcode,
-        'msgType': 'server_subscribe',
-        'hasData': False
-      }
-      msg = Message()
-      msg.code = self.roomcode
-      msg.id = uuid.uuid4().int
-      msg.msg_type = "server_subscribe"
-      msg.has_data = False
-      msg.data = {}
+      msg = self.subscribe_message(self.roomcode, 'server_subscribe')
       
       resp = await self.send_message(msg, self.timeout)
+      self.negotiate(resp)
       if resp and resp.data['status_code'] >= 400:
         logging.error(f"Error {resp.data['status_code']}: {resp.data['message']}")
         self.connected = False
@@ -94,14 +92,9 @@ class ProxiedServerConnection(ProxiedConnection):
   async def update(self):
     while True:
       try:
-        rawmsg = await asyncio.wait_for(self.proxyws.recv(), 0.05)
-      except wsexceptions.ConnectionClosed:
-        self.connected = False
+        msg = await asyncio.wait_for(self.incoming.get(), 0.05)
+      except asyncio.TimeoutError:
         break
-      except:
-        break
-      
-      msg = Message(rawmsg)
       
       if msg.msg_type == 'await_request':
         req = simpleobsws.Request(msg.data['requestType'], msg.data['requestData'])
@@ -121,10 +114,13 @@ class ProxiedServerConnection(ProxiedConnection):
           },
           'responseData': obs_resp.responseData
         }
-        await self.proxyws.send(await_resp.to_data())
+        await self.proxyws.send(await_resp.encode(self.binary))
       if msg.msg_type == 'emit_request':
         req = simpleobsws.Request(msg.data['requestType'], msg.data['requestData'])
         await self.obsws.emit(req)
+      if msg.msg_type == 'emit_batch':
+        reqs = [simpleobsws.Request(r['requestType'], r['requestData']) for r in msg.data['requests']]
+        await self.obsws.emit_batch(reqs, halt_on_failure = False)
     
   async def request(self, req : simpleobsws.Request) -> simpleobsws.RequestResponse:
     None
\ No newline at end of file
@@ -29,6 +29,9 @@ class CountdownInput(TextInput):
   
   def update(self, gui : 'Default_GUI'):
     self.calc_time()
+    
+  def is_ticking(self) -> bool:
+    return self.end_time > dt.datetime.now()
       
   def calc_time(self):
     time_til = self.end_time - dt.datetime.now()
@@ -106,7 +109,7 @@ class CountdownInput(TextInput):
     enddt = dt.datetime.strptime(input_end, TIME_FORMAT)
     
     inp = CountdownInput(-1, -1, gui.canvas, gui.screen, 0, 0, 0, 0, 0, 0, 0, "", input_name, enddt)
-    gui.scenes[gui.current_scene].append(inp)
+    gui.add_scene_item(inp)
     
     if input_name != "":
       img_req  = simpleobsws.Request('CreateInput', { 'sceneName': gui.current_scene, 'inputName': input_name, 'inputKind': input_kind, 'inputSettings': { 'text': "" }, 'sceneItemEnabled': True })
@@ -118,7 +118,7 @@ class CounterInput(TextInput):
     input_kind = 'text_gdiplus_v2' if gui.platform == "windows" else 'text_ft2_source_v2'
     
     inp = CounterInput(-1, -1, gui.canvas, gui.screen, 0, 0, 0, 0, 0, 0, 0, "", input_name, counter_format)
-    gui.scenes[gui.current_scene].append(inp)
+    gui.add_scene_item(inp)
     
     if input_name != "":
       img_req  = simpleobsws.Request('CreateInput', { 'sceneName': gui.current_scene, 'inputName': input_name, 'inputKind': input_kind, 'inputSettings': { 'text': inp.get_formatted_counter() }, 'sceneItemEnabled': True })
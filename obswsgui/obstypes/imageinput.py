@@ -1,26 +1,108 @@
+import io
 import math
+import time
 import tkinter as tk
+from concurrent.futures import Future, ThreadPoolExecutor
 from tkinter import ttk
 
 import requests
 import simpleobsws
 from PIL import Image, ImageTk
 
-from typing import TYPE_CHECKING
+from pathlib import Path
+from typing import List, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
   from ..ui.defaultgui import Default_GUI
 
+from ..util.diskcache import DiskCache
+from ..util.lrucache import LRUCache
 from .obs_object import OBS_Object
 
+# rendered PhotoImages shared by every ImageInput, keyed by url and the exact render parameters
+render_cache = LRUCache(64 * 1024 * 1024, lambda img: img.width() * img.height() * 4)
+
+min_mip_size : int = 32 # pixels, smallest side of the last mip level
+rotation_step : float = 0.5 # degrees, rendered rotations are rounded to this so drags can hit the cache
+preview_rotation_step : float = 5.0 # degrees, coarser rounding for previews while the mouse is held
+
+# downloads and decodes run here so neither the Tk thread nor the network loop waits on a slow server
+loader_pool = ThreadPoolExecutor(max_workers = 4, thread_name_prefix = "image-loader")
+download_timeout : Tuple[float, float] = (5.0, 15.0) # connect, read in seconds
+load_poll_ms : int = 50
+
+placeholder_color : str = "#2e2e35"
+
+# downloaded bytes kept across launches, revalidated with the server's ETag / Last-Modified once they go stale
+download_cache = DiskCache(Path("./obswsguicache"), 256 * 1024 * 1024)
+default_max_age : float = 300.0 # seconds a download is used without asking the server, unless it sent its own max-age
+
+def build_mip_levels(img : Image.Image) -> List[Image.Image]:
+  level = img.convert('RGBA')
+  levels = [level]
+  while min(level.size) >= 2 * min_mip_size:
+    level = level.reduce(2)
+    levels.append(level)
+  return levels
+
+def max_age(resp : requests.Response) -> float:
+  cache_control = resp.headers.get('Cache-Control', '').lower()
+  if 'no-cache' in cache_control or 'no-store' in cache_control:
+    return 0.0
+  for directive in cache_control.split(','):
+    name, _, value = directive.strip().partition('=')
+    if name == 'max-age':
+      try:
+        return float(value)
+      except ValueError:
+        return 0.0
+  return default_max_age
+
+def download(url : str) -> bytes:
+  cached = download_cache.lookup(url)
+  if cached and time.time() - cached.get('fetched', 0.0) < cached.get('max_age', 0.0):
+    data = download_cache.read(url)
+    if data is not None:
+      return data
+    cached = None
+    
+  headers = {}
+  if cached and cached.get('etag'):
+    headers['If-None-Match'] = cached['etag']
+  if cached and cached.get('last_modified'):
+    headers['If-Modified-Since'] = cached['last_modified']
+  
+  try:
+    resp = requests.get(url, headers = headers, timeout = download_timeout)
+    if resp.status_code == 304:
+      data = download_cache.read(url, { 'fetched': time.time(), 'max_age': max_age(resp) })
+      if data is not None:
+        return data
+      resp = requests.get(url, timeout = download_timeout)
+    resp.raise_for_status()
+  except requests.RequestException as e:
+    data = download_cache.read(url) if cached else None
+    if data is None:
+      raise
+    print(f"Using cached copy of {url}. {e}")
+    return data
+  
+  download_cache.store(url, resp.content, { 'etag': resp.headers.get('ETag'), 'last_modified': resp.headers.get('Last-Modified'), 'fetched': time.time(), 'max_age': max_age(resp) })
+  return resp.content
+
+def fetch_image(url : str) -> List[Image.Image]:
+  img = Image.open(io.BytesIO(download(url)))
+  img.load()
+  return build_mip_levels(img)
+
 class ImageInput(OBS_Object):
   img_url = ""
   url_changed = False
   img_id = None
-  orig_img = None
-  resized_img = None
-  transformed_img = None
+  mip_levels : List[Image.Image] = None # the loaded image as RGBA, then copies each half the size of the one before
   tk_img = None
+  pending_load : Future = None
+  poll_after_id : str = None
   
   @staticmethod
   def description():
@@ -41,16 +123,20 @@ class ImageInput(OBS_Object):
     if self.img_id:
       self.canvas.delete(self.img_id)
       self.img_id = None
+    self.cancel_load()
       
   def add_to_canvas(self) -> None:
     super().add_to_canvas()
     if self.img_id is None:
-      self.img_id = self.canvas.create_image(0, 0, image = self.tk_img, anchor = tk.NW)
+      self.img_id = self.canvas.create_image(0, 0, image = self.tk_img, anchor = tk.NW, tags = self.canvas_tag)
+    # a load cancelled by remove_from_canvas starts over
+    if self.img_url and self.mip_levels is None and self.pending_load is None:
+      self.load_image()
   
-  def redraw(self) -> None:
-    super().redraw()
+  def draw_shape(self) -> None:
+    super().draw_shape()
     
-    if self.orig_img:
+    if self.mip_levels:
       imgx = self.polygon.minx()
       imgy = self.polygon.miny()
       imgw = int(self.wpx)
@@ -70,27 +156,97 @@ class ImageInput(OBS_Object):
         imgh = abs(imgh)
         flip_vert = True 
         
-      self.resized_img = self.orig_img.resize((imgw, imgh))
-      self.transformed_img = Image.new('RGBA', self.resized_img.size)
-      self.transformed_img.paste(self.resized_img, None)
-      if flip_hori:
-        self.transformed_img = self.transformed_img.transpose(Image.FLIP_LEFT_RIGHT)
-      if flip_vert:
-        self.transformed_img = self.transformed_img.transpose(Image.FLIP_TOP_BOTTOM)
-      self.tk_img = ImageTk.PhotoImage(self.transformed_img.rotate((-180.0 * self.rotation / math.pi), expand = True, fillcolor = '#00000000'))
+      # while an item is being dragged draw a cheap preview, the screen redraws it properly on release
+      preview = self.screen.interacting
+      if preview and self not in self.screen.previewed_items:
+        self.screen.previewed_items.append(self)
+        
+      step = preview_rotation_step if preview else rotation_step
+      angle = round((-180.0 * self.rotation / math.pi) / step) * step
+      self.tk_img = self.render(imgw, imgh, flip_hori, flip_vert, angle, preview)
       if not self.img_id:
-        self.img_id = self.canvas.create_image(imgx, imgy, image = self.tk_img, anchor = tk.NW)
+        self.img_id = self.canvas.create_image(imgx, imgy, image = self.tk_img, anchor = tk.NW, tags = self.canvas_tag)
       else:
         self.canvas.coords(self.img_id, imgx, imgy)
         self.canvas.itemconfigure(self.img_id, image = self.tk_img)
         
+  def render(self, width : int, height : int, flip_hori : bool, flip_vert : bool, angle : float, preview : bool = False) -> ImageTk.PhotoImage:
+    key = (self.img_url, width, height, flip_hori, flip_vert, angle, preview)
+    tk_img = render_cache.get(key)
+    if tk_img:
+      return tk_img
+    
+    if preview:
+      # half resolution source and nearest neighbour scaling, a few times cheaper than the full render
+      img = self.mip_for(width // 2, height // 2).resize((width, height), Image.NEAREST)
+    else:
+      img = self.mip_for(width, height).resize((width, height))
+    if flip_hori:
+      img = img.transpose(Image.FLIP_LEFT_RIGHT)
+    if flip_vert:
+      img = img.transpose(Image.FLIP_TOP_BOTTOM)
+    if angle % 360.0:
+      img = img.rotate(angle, expand = True, fillcolor = '#00000000')
+      
+    tk_img = ImageTk.PhotoImage(img)
+    render_cache.put(key, tk_img)
+    return tk_img
+  
+  def mip_for(self, width : int, height : int) -> Image.Image:
+    # smallest level that is still at least as big as the target, so we only ever scale down
+    for level in reversed(self.mip_levels):
+      if level.width >= width and level.height >= height:
+        return level
+    return self.mip_levels[0]
+  
+  def cancel_load(self) -> None:
+    if self.poll_after_id:
+      self.canvas.after_cancel(self.poll_after_id)
+      self.poll_after_id = None
+    if self.pending_load:
+      self.pending_load.cancel()
+      self.pending_load = None
+      
   def load_image(self):
+    self.cancel_load()
+    self.mip_levels = None
+    if self.img_id:
+      self.canvas.delete(self.img_id)
+      self.img_id = None
+    
+    self.pending_load = loader_pool.submit(fetch_image, self.img_url)
+    self.show_placeholder(True)
+    self.poll_after_id = self.canvas.after(load_poll_ms, self.poll_image)
+    
+  def poll_image(self) -> None:
+    self.poll_after_id = None
+    load = self.pending_load
+    if load is None or self.rect_id is None:
+      return
+    if not load.done():
+      self.poll_after_id = self.canvas.after(load_poll_ms, self.poll_image)
+      return
+    
+    self.pending_load = None
     try:
-      self.orig_img = Image.open(requests.get(self.img_url, stream = True).raw)
+      self.mip_levels = load.result()
+      
+      # the url may now point at different pixels than what we rendered before
+      for key in [key for key in render_cache.entries if key[0] == self.img_url]:
+        render_cache.discard(key)
       print(f"image loaded from {self.img_url}")
-    except:
-      print(f"failed to load image from {self.img_url}")
-      self.orig_img = None
+    except Exception as e:
+      print(f"failed to load image from {self.img_url}: {e}")
+      self.mip_levels = None
+      
+    self.show_placeholder(False)
+    if self.rect_id is not None:
+      self.invalidate_drawn()
+      self.redraw()
+      
+  def show_placeholder(self, show : bool) -> None:
+    if self.rect_id is not None:
+      self.canvas.itemconfigure(self.rect_id, fill = placeholder_color if show else '', stipple = 'gray50' if show else '')
     
   def set_url(self, url : str, local : bool = True) -> None:
     if self.url_changed and not local:
@@ -102,8 +258,6 @@ class ImageInput(OBS_Object):
       self.url_strvar.set(self.img_url)
       self.load_image()
       
-      self.redraw()
-      
       self.url_changed |= local
       
   def move_to_front(self, under : int = None) -> None:
@@ -176,7 +330,7 @@ class ImageInput(OBS_Object):
     img_url  = gui.string_param_1.get()
     
     inp = ImageInput(-1, -1, gui.canvas, gui.screen, 0, 0, 0, 0, 0, 0, 0, "", img_name)
-    gui.scenes[gui.current_scene].append(inp)
+    gui.add_scene_item(inp)
     
     if img_name != "" and img_url != "":
       img_req  = simpleobsws.Request('CreateInput', { 'sceneName': gui.current_scene, 'inputName': img_name, 'inputKind': 'image_source', 'inputSettings': { 'file': img_url }, 'sceneItemEnabled': True })
@@ -13,7 +13,7 @@ from ..util.geometryutil import (
   Coords,
   Polygon,
   distance,
-  distance_from_segment,
+  distance_sq_from_segment,
   point_in_polygon
 )
 
@@ -75,6 +75,7 @@ class OBS_Object:
   scene_item_id    : int = -1
   scene_item_index : int = -1
   bounds_type      : str = ""
+  stack_position   : int = 0 # index in the GUI's item list for its scene, 0 is drawn on top
   
   scale : float = 1.0
   
@@ -92,6 +93,7 @@ class OBS_Object:
   
   line_width : float = 4
   grabber_radius : float = 8
+  hit_zone : int = 10 # pixels around the outline that still count as grabbing it
   
   interactable : bool = True
   
@@ -100,10 +102,22 @@ class OBS_Object:
   
   trans_changed : bool = False
   
+  # what the canvas items currently show, so redraw can skip unchanged work
+  redraw_pending : bool = False
+  drawn_shape  : tuple = None
+  drawn_origin : Tuple[float, float] = None
+  drawn_lw     : int = None
+  drawn_label_angle : float = None
+  
   @staticmethod
   def description():
     return "OBS Object"
   
+  @property
+  def canvas_tag(self) -> str:
+    # every canvas item belonging to this object carries the tag, so a move is a single canvas call
+    return f"obs_object_{id(self)}"
+  
   def __init__(self, scene_item_id : int, scene_item_index : int, canvas : tk.Canvas, screen, x : float, y : float, width : float, height : float, rotation : float, source_width : float, source_height : float, bounds_type : str, label : str = "", interactable : bool = True):
     self.scene_item_id = scene_item_id
     self.scene_item_index = scene_item_index
@@ -122,20 +136,20 @@ class OBS_Object:
     
     self.polygon = Polygon([0, 0], [0, 0], [0, 0], [0, 0])
     
-    self.rect_id = self.canvas.create_polygon(self.polygon.to_array(), width = self.line_width, outline = self.default_color, fill = '')
+    self.rect_id = self.canvas.create_polygon(self.polygon.to_array(), width = self.line_width, outline = self.default_color, fill = '', tags = self.canvas_tag)
     
     if self.interactable:
-      tl = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
-      bl = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
-      tr = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
-      br = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
+      tl = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
+      bl = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
+      tr = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
+      br = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
       
       self.grabber_ids = [tl, bl, tr, br]
       
-      self.rotator_grabber_id = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
-      self.rotator_line_id    = self.canvas.create_line(0, 0, 0, 0, width = self.line_width, fill = self.default_color)
+      self.rotator_grabber_id = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
+      self.rotator_line_id    = self.canvas.create_line(0, 0, 0, 0, width = self.line_width, fill = self.default_color, tags = self.canvas_tag)
     
-    self.item_label_id = self.canvas.create_text(0, 0, anchor = tk.SW, text = f"{self.source_name} ({self.scene_item_id})", fill = self.default_color, angle = 0)
+    self.item_label_id = self.canvas.create_text(0, 0, anchor = tk.SW, text = f"{self.source_name} ({self.scene_item_id})", fill = self.default_color, angle = 0, tags = self.canvas_tag)
     
     self.name_strvar = tk.StringVar(self.canvas, self.source_name)
     
@@ -144,6 +158,10 @@ class OBS_Object:
   def update(self, qui : 'Default_GUI') -> None:
     None
     
+  def is_ticking(self) -> bool:
+    # True while update() changes what's shown without any input, e.g. a running timer
+    return False
+    
   def send_necessary_data(self, gui : 'Default_GUI') -> None:
     if self.source_name_changed:
       self.queue_set_input_name(gui)
@@ -169,27 +187,31 @@ class OBS_Object:
     if self.rotator_line_id:
       self.canvas.delete(self.rotator_line_id)
       self.rotator_line_id = None
+    self.invalidate_drawn()
+    self.update_hit_index()
       
   def add_to_canvas(self) -> None:
+    self.invalidate_drawn()
+    
     if self.rect_id is None:
-      self.rect_id = self.canvas.create_polygon(self.polygon.to_array(), width = self.line_width, outline = self.default_color, fill = '')
+      self.rect_id = self.canvas.create_polygon(self.polygon.to_array(), width = self.line_width, outline = self.default_color, fill = '', tags = self.canvas_tag)
     
     if self.interactable:
       if self.grabber_ids is None:
-        tl = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
-        bl = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
-        tr = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
-        br = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
+        tl = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
+        bl = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
+        tr = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
+        br = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
         
         self.grabber_ids = [tl, bl, tr, br]
         
       if self.rotator_grabber_id is None:
-        self.rotator_grabber_id = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color)
+        self.rotator_grabber_id = self.canvas.create_oval(0, 0, 0, 0, width = self.line_width, outline = "", fill = self.default_color, tags = self.canvas_tag)
       if self.rotator_line_id is None:
-        self.rotator_line_id    = self.canvas.create_line(0, 0, 0, 0, width = self.line_width, fill = self.default_color)
+        self.rotator_line_id    = self.canvas.create_line(0, 0, 0, 0, width = self.line_width, fill = self.default_color, tags = self.canvas_tag)
     
     if self.item_label_id is None:
-      self.item_label_id = self.canvas.create_text(0, 0, anchor = tk.SW, text = f"{self.source_name} ({self.scene_item_id})", fill = self.default_color, angle = 0)
+      self.item_label_id = self.canvas.create_text(0, 0, anchor = tk.SW, text = f"{self.source_name} ({self.scene_item_id})", fill = self.default_color, angle = 0, tags = self.canvas_tag)
       
   def calculate_canvas_pos(self) -> None:
     self.scale = self.screen.scale
@@ -202,17 +224,28 @@ class OBS_Object:
     self.wpx = self.width * self.scale
     self.hpx = self.height * self.scale
     
-    diag_length = math.sqrt(math.pow(self.wpx, 2) + math.pow(self.hpx, 2))
-    rect_angle = Coords(self.wpx, self.hpx).angle()
+    # the top edge runs along (cos, sin) and the left edge along (-sin, cos)
+    cos_r = math.cos(self.rotation)
+    sin_r = math.sin(self.rotation)
+    
+    topx = self.wpx * cos_r
+    topy = self.wpx * sin_r
+    leftx = -self.hpx * sin_r
+    lefty = self.hpx * cos_r
     
-    self.polygon.point(1).x = self.polygon.point(0).x + self.wpx * math.cos(self.rotation)
-    self.polygon.point(1).y = self.polygon.point(0).y + self.wpx * math.sin(self.rotation)
+    self.polygon.point(1).x = self.polygon.point(0).x + topx
+    self.polygon.point(1).y = self.polygon.point(0).y + topy
     
-    self.polygon.point(2).x = self.polygon.point(0).x + diag_length * math.cos(self.rotation + rect_angle)
-    self.polygon.point(2).y = self.polygon.point(0).y + diag_length * math.sin(self.rotation + rect_angle)
+    self.polygon.point(2).x = self.polygon.point(0).x + topx + leftx
+    self.polygon.point(2).y = self.polygon.point(0).y + topy + lefty
     
-    self.polygon.point(3).x = self.polygon.point(0).x - self.hpx * math.cos((math.pi / 2) - self.rotation)
-    self.polygon.point(3).y = self.polygon.point(0).y + self.hpx * math.sin((math.pi / 2) - self.rotation)
+    self.polygon.point(3).x = self.polygon.point(0).x + leftx
+    self.polygon.point(3).y = self.polygon.point(0).y + lefty
+    
+    top_middle = (self.polygon.point(0) + self.polygon.point(1)) / 2.0
+    inter_pos = Coords(0, math.copysign(self.get_rotatordist(), self.hpx))
+    inter_pos.rotate(self.rotation)
+    self.rotator_grabber_pos = top_middle - inter_pos
     
   def get_linewidth(self):
     return max(2, math.ceil(self.line_width * self.scale))
@@ -256,7 +289,7 @@ class OBS_Object:
       self.rotation = rot
       
       self.trans_changed |= local
-      self.redraw()
+      self.schedule_redraw()
       
   def set_selected(self, selected : bool) -> None:
     if self.selected != selected:
@@ -273,6 +306,7 @@ class OBS_Object:
   def set_interactable(self, interactable : bool) -> None:
     if self.interactable != interactable:
       self.interactable = interactable
+      self.invalidate_drawn()
       
       if self.interactable:
         self.calculate_canvas_pos()
@@ -281,7 +315,7 @@ class OBS_Object:
         gpx = self.get_grabberradius()
         self.grabber_ids = []
         for coords in self.polygon.points():
-          grabber = self.canvas.create_oval(coords.x - gpx, coords.y - gpx, coords.x + gpx, coords.y + gpx, width = lw, outline = "", fill = c)
+          grabber = self.canvas.create_oval(coords.x - gpx, coords.y - gpx, coords.x + gpx, coords.y + gpx, width = lw, outline = "", fill = c, tags = self.canvas_tag)
           self.grabber_ids.append(grabber)
         
         top_middle = (self.polygon.point(0) + self.polygon.point(1)) / 2.0
@@ -291,8 +325,8 @@ class OBS_Object:
         inter_pos.rotate(self.rotation)
         self.rotator_grabber_pos = top_middle - inter_pos
         
-        self.rotator_grabber_id = self.canvas.create_oval(self.rotator_grabber_pos.x - gpx, self.rotator_grabber_pos.y - gpx, self.rotator_grabber_pos.x + gpx, self.rotator_grabber_pos.y + gpx, width = lw, outline = "", fill = c)
-        self.rotator_line_id = self.canvas.create_line(top_middle.x, top_middle.y, self.rotator_grabber_pos.x, self.rotator_grabber_pos.y, width = lw, outline = "", fill = c)
+        self.rotator_grabber_id = self.canvas.create_oval(self.rotator_grabber_pos.x - gpx, self.rotator_grabber_pos.y - gpx, self.rotator_grabber_pos.x + gpx, self.rotator_grabber_pos.y + gpx, width = lw, outline = "", fill = c, tags = self.canvas_tag)
+        self.rotator_line_id = self.canvas.create_line(top_middle.x, top_middle.y, self.rotator_grabber_pos.x, self.rotator_grabber_pos.y, width = lw, outline = "", fill = c, tags = self.canvas_tag)
       else:
         for id in self.grabber_ids:
           self.canvas.delete(id)
@@ -303,6 +337,8 @@ class OBS_Object:
         self.rotator_grabber_id = None
         self.rotator_line_id = None
         
+      self.update_hit_index()
+        
   def set_scene_item_id(self, scene_item_id : int) -> None:
     if self.scene_item_id != scene_item_id:
       self.scene_item_id = scene_item_id
@@ -323,69 +359,117 @@ class OBS_Object:
       
   def canvas_configure(self, event : tk.Event = None) -> None:
     self.scale = self.screen.scale
-    self.redraw()
+    self.schedule_redraw()
+    
+  def schedule_redraw(self) -> None:
+    # geometry is updated right away so hit tests and drags see it, the canvas catches up once per idle pass
+    self.calculate_canvas_pos()
+    self.update_hit_index()
+    
+    if not self.redraw_pending:
+      self.redraw_pending = True
+      self.screen.queue_redraw(self)
+    
+  def invalidate_drawn(self) -> None:
+    self.drawn_shape = None
+    self.drawn_origin = None
+    self.drawn_lw = None
+    self.drawn_label_angle = None
       
   def redraw(self) -> None:
+    self.redraw_pending = False
     self.calculate_canvas_pos()
+    
+    origin = (self.polygon.point(0).x, self.polygon.point(0).y)
+    shape = (self.wpx, self.hpx, self.rotation)
+    
+    if shape == self.drawn_shape:
+      # only the position changed, so shift everything tagged with this object in one call
+      dx = origin[0] - self.drawn_origin[0]
+      dy = origin[1] - self.drawn_origin[1]
+      if dx or dy:
+        self.canvas.move(self.canvas_tag, dx, dy)
+    else:
+      self.draw_shape()
+      self.drawn_shape = shape
+    self.drawn_origin = origin
+    
+    self.update_hit_index()
+    
+  def draw_shape(self) -> None:
     gpx = self.get_grabberradius()
     lw = self.get_linewidth()
+    width_changed = lw != self.drawn_lw
+    self.drawn_lw = lw
     
     self.canvas.coords(self.rect_id, self.polygon.to_array())
-    self.canvas.itemconfigure(self.rect_id, width = lw)
+    if width_changed:
+      self.canvas.itemconfigure(self.rect_id, width = lw)
       
     if self.interactable:
-      for id in self.grabber_ids:
-        self.canvas.itemconfigure(id, width = lw)
+      if width_changed:
+        for id in self.grabber_ids:
+          self.canvas.itemconfigure(id, width = lw)
       
       for i in range(0, self.polygon.size()):
         self.canvas.coords(self.grabber_ids[i], self.polygon.point(i).x - gpx, self.polygon.point(i).y - gpx, self.polygon.point(i).x + gpx, self.polygon.point(i).y + gpx)
         
       top_middle = (self.polygon.point(0) + self.polygon.point(1)) / 2.0
-      rpx = self.get_rotatordist()
-      
-      inter_pos = Coords(0, math.copysign(rpx, self.hpx))
-      inter_pos.rotate(self.rotation)
-      self.rotator_grabber_pos = top_middle - inter_pos
       
       self.canvas.coords(self.rotator_grabber_id, self.rotator_grabber_pos.x - gpx, self.rotator_grabber_pos.y - gpx, self.rotator_grabber_pos.x + gpx, self.rotator_grabber_pos.y + gpx)
       self.canvas.coords(self.rotator_line_id, top_middle.x, top_middle.y, self.rotator_grabber_pos.x, self.rotator_grabber_pos.y)
       
-      self.canvas.itemconfigure(self.rotator_line_id, width = lw)
+      if width_changed:
+        self.canvas.itemconfigure(self.rotator_line_id, width = lw)
       
     self.canvas.coords(self.item_label_id, self.polygon.point(0).x, self.polygon.point(0).y - lw)
     
     textangle = (-180.0 * self.rotation / math.pi)
     
-    self.canvas.itemconfig(self.item_label_id, angle = textangle)
-    
-  def contains(self, coords : Coords) -> bool:
-    return point_in_polygon(self.polygon, coords)
-  
-  def move_or_resize(self, coords : Coords, zone : int = 10) -> int:
-    if not self.interactable:
-      return ModifyType.NONE
+    if textangle != self.drawn_label_angle:
+      self.canvas.itemconfig(self.item_label_id, angle = textangle)
+      self.drawn_label_angle = textangle
     
+  def hit_bounds(self, zone : int) -> Tuple[float, float, float, float]:
     xs = [p.x for p in self.polygon.points()]
     ys = [p.y for p in self.polygon.points()]
     
     xs.append(self.rotator_grabber_pos.x)
     ys.append(self.rotator_grabber_pos.y)
     
-    minx = min(xs)
-    maxx = max(xs)
-    miny = min(ys)
-    maxy = max(ys)
+    return min(xs) - zone, min(ys) - zone, max(xs) + zone, max(ys) + zone
+  
+  def update_hit_index(self) -> None:
+    grid = self.screen.hit_grid if self.screen else None
+    if grid is None:
+      return
+    
+    if self.interactable and self.rect_id is not None:
+      grid.insert(self, self.hit_bounds(self.hit_zone))
+    else:
+      grid.remove(self)
+    
+  def contains(self, coords : Coords) -> bool:
+    return point_in_polygon(self.polygon, coords)
+  
+  def move_or_resize(self, coords : Coords, zone : int = None) -> int:
+    if not self.interactable:
+      return ModifyType.NONE
+    
+    zone = self.hit_zone if zone is None else zone
+    minx, miny, maxx, maxy = self.hit_bounds(zone)
     
-    if coords.x < minx - zone \
-      or coords.x > maxx + zone \
-      or coords.y < miny - zone \
-      or coords.y > maxy + zone:
+    if coords.x < minx \
+      or coords.x > maxx \
+      or coords.y < miny \
+      or coords.y > maxy:
         return ModifyType.NONE
     
-    leftside   = distance_from_segment(self.polygon.point(0), self.polygon.point(3), coords) < zone
-    rightside  = distance_from_segment(self.polygon.point(1), self.polygon.point(2), coords) < zone
-    topside    = distance_from_segment(self.polygon.point(0), self.polygon.point(1), coords) < zone
-    bottomside = distance_from_segment(self.polygon.point(2), self.polygon.point(3), coords) < zone
+    zone_sq = zone * zone
+    leftside   = distance_sq_from_segment(self.polygon.point(0), self.polygon.point(3), coords) < zone_sq
+    rightside  = distance_sq_from_segment(self.polygon.point(1), self.polygon.point(2), coords) < zone_sq
+    topside    = distance_sq_from_segment(self.polygon.point(0), self.polygon.point(1), coords) < zone_sq
+    bottomside = distance_sq_from_segment(self.polygon.point(2), self.polygon.point(3), coords) < zone_sq
     
     ret = ModifyType.NONE
     if leftside:
@@ -1,13 +1,20 @@
 import tkinter as tk
+from typing import List
 
 from ..util.geometryutil import (
   Coords,
   Polygon
 )
+from ..util.spatialgrid import SpatialGrid
 from .obs_object import OBS_Object
 
 class OutputBounds(OBS_Object):
   anchor : str = 'center'
+  hit_grid : SpatialGrid = None # canvas bounds of the interactable items drawn on this output
+  dirty_items : List[OBS_Object] = None # items waiting for their canvas items to be updated
+  
+  interacting : bool = False # mouse button held on an item, items may draw cheap previews
+  previewed_items : List[OBS_Object] = None # items that drew a preview and need a full redraw afterwards
   
   def __init__(self, canvas : tk.Canvas, anchor, width : float, height : float, label : str = ""):
     self.canvas = canvas
@@ -19,12 +26,45 @@ class OutputBounds(OBS_Object):
     self.width = width
     self.height = height
     self.source_name = label
+    self.hit_grid = SpatialGrid()
+    self.dirty_items = []
+    self.previewed_items = []
     
     self.polygon = Polygon([0, 0], [0, 0], [0, 0], [0, 0])
     
     self.rect_id = self.canvas.create_polygon(self.polygon.to_array(), width = self.line_width, outline = self.default_color, fill = '')
     self.item_label_id = self.canvas.create_text(0, 0, anchor = tk.SW, text = self.source_name, fill = self.default_color)
     
+  def schedule_redraw(self) -> None:
+    # everything else is positioned relative to the output, so it is drawn right away
+    self.redraw()
+    
+  def queue_redraw(self, item : OBS_Object) -> None:
+    if not self.dirty_items:
+      self.canvas.after_idle(self.flush_redraws)
+    self.dirty_items.append(item)
+    
+  def flush_redraws(self) -> None:
+    items = self.dirty_items
+    self.dirty_items = []
+    
+    for item in items:
+      # skip anything that left the canvas after it was queued
+      if item.redraw_pending and item.rect_id is not None:
+        item.redraw()
+      item.redraw_pending = False
+    
+  def set_interacting(self, interacting : bool) -> None:
+    self.interacting = interacting
+    if interacting:
+      return
+    
+    items = self.previewed_items
+    self.previewed_items = []
+    for item in items:
+      item.invalidate_drawn()
+      item.schedule_redraw()
+    
   def canvas_configure(self, event : tk.Event = None) -> None:
     self.scale = 1.0 / max(self.height / (self.canvas.winfo_height() * 2.0 / 3.0), self.width / (self.canvas.winfo_width() * 2.0 / 3.0))
     self.redraw()
@@ -38,6 +38,9 @@ class StopwatchInput(TextInput):
   def update(self, gui : 'Default_GUI'):
     self.calc_time()
     
+  def is_ticking(self) -> bool:
+    return not self.paused
+    
   def calc_time(self):
     if self.paused and self.pause_time:
       time_paused = (dt.datetime.now() - self.pause_time)
@@ -120,7 +123,7 @@ class StopwatchInput(TextInput):
     start_paused : bool = (gui.int_param_1.get() == 1)
     
     inp = StopwatchInput(-1, -1, gui.canvas, gui.screen, 0, 0, 0, 0, 0, 0, 0, "", input_name, None, start_paused, None)
-    gui.scenes[gui.current_scene].append(inp)
+    gui.add_scene_item(inp)
     
     if input_name != "":
       img_req  = simpleobsws.Request('CreateInput', { 'sceneName': gui.current_scene, 'inputName': input_name, 'inputKind': input_kind, 'inputSettings': { 'text': "" }, 'sceneItemEnabled': True })
@@ -37,7 +37,7 @@ class TextInput(OBS_Object):
   def __init__(self, scene_item_id : int, scene_item_index : int, canvas : tk.Canvas, screen, x : float, y : float, width : float, height : float, rotation : float, source_width : float, source_height : float, bounds_type : str, label : str = "", interactable : bool = True):
     self.text_font = font.Font(family="Helvetica", size = 1)
     super().__init__(scene_item_id, scene_item_index, canvas, screen, x, y, width, height, rotation, source_width, source_height, bounds_type, label, interactable)
-    self.text_id = self.canvas.create_text((self.polygon.point(0).x + self.polygon.point(2).x) / 2.0, (self.polygon.point(0).y + self.polygon.point(2).y) / 2.0, fill = self.color, text = self.text, font = self.text_font, anchor = tk.CENTER)
+    self.text_id = self.canvas.create_text((self.polygon.point(0).x + self.polygon.point(2).x) / 2.0, (self.polygon.point(0).y + self.polygon.point(2).y) / 2.0, fill = self.color, text = self.text, font = self.text_font, anchor = tk.CENTER, tags = self.canvas_tag)
     
     self.text_strvar = tk.StringVar(self.canvas)
     
@@ -61,7 +61,7 @@ class TextInput(OBS_Object):
   def add_to_canvas(self) -> None:
     super().add_to_canvas()
     if self.text_id is None:
-      self.text_id = self.canvas.create_text((self.polygon.point(0).x + self.polygon.point(2).x) / 2.0, (self.polygon.point(0).y + self.polygon.point(2).y) / 2.0, fill = self.color, text = self.text, font = self.text_font, anchor = tk.CENTER)
+      self.text_id = self.canvas.create_text((self.polygon.point(0).x + self.polygon.point(2).x) / 2.0, (self.polygon.point(0).y + self.polygon.point(2).y) / 2.0, fill = self.color, text = self.text, font = self.text_font, anchor = tk.CENTER, tags = self.canvas_tag)
   
   def get_font_size(self) -> None:
     text_height = self.text_font.metrics('linespace')
@@ -153,8 +153,8 @@ class TextInput(OBS_Object):
     last_id = self.move_id_to_back(self.text_id, above)
     return super().move_to_back(last_id)
       
-  def redraw(self) -> None:
-    super().redraw()
+  def draw_shape(self) -> None:
+    super().draw_shape()
     
     self.get_font_size()
     
@@ -256,7 +256,7 @@ class TextInput(OBS_Object):
     input_kind = 'text_gdiplus_v2' if gui.platform == "windows" else 'text_ft2_source_v2'
     
     inp = TextInput(-1, -1, gui.canvas, gui.screen, 0, 0, 0, 0, 0, 0, 0, "", input_name)
-    gui.scenes[gui.current_scene].append(inp)
+    gui.add_scene_item(inp)
     
     if input_name != "":
       img_req  = simpleobsws.Request('CreateInput', { 'sceneName': gui.current_scene, 'inputName': input_name, 'inputKind': input_kind, 'inputSettings': { 'text': input_text }, 'sceneItemEnabled': True })
@@ -34,6 +34,9 @@ class TimerInput(StopwatchInput):
     
     self.last_update = dt.datetime.now()
   
+  def is_ticking(self) -> bool:
+    return not self.paused and self.time_left_ms > 0
+  
   def calc_time(self):
     if self.time_left_ms == 0:
       return
@@ -167,7 +170,7 @@ class TimerInput(StopwatchInput):
     input_kind = 'text_gdiplus_v2' if gui.platform == "windows" else 'text_ft2_source_v2'
     
     inp = TimerInput(-1, -1, gui.canvas, gui.screen, 0, 0, 0, 0, 0, 0, 0, "", input_name, input_hours, input_minutes, input_seconds)
-    gui.scenes[gui.current_scene].append(inp)
+    gui.add_scene_item(inp)
     
     if input_name != "":
       img_req  = simpleobsws.Request('CreateInput', { 'sceneName': gui.current_scene, 'inputName': input_name, 'inputKind': input_kind, 'inputSettings': { 'text': "" }, 'sceneItemEnabled': True })
@@ -3,6 +3,7 @@ import logging
 logging.basicConfig(level = logging.INFO)
 
 import asyncio
+import collections
 import datetime as dt
 import json
 import math
@@ -11,14 +12,14 @@ import time
 import tkinter as tk
 from pathlib import Path
 from tkinter import ttk
-from typing import Callable, Dict, List, Tuple
+from typing import Awaitable, Callable, Deque, Dict, Iterable, List, Tuple
 
 import simpleobsws
 
 from ..networking.directconn import DirectConnection
 from ..obstypes.countdowninput import TIME_FORMAT, CountdownInput
 from ..obstypes.counterinput import CounterInput
-from ..obstypes.imageinput import ImageInput
+from ..obstypes.imageinput import ImageInput, download_cache
 from ..obstypes.obs_object import ModifyType, OBS_Object
 from ..obstypes.outputbounds import OutputBounds
 from ..obstypes.textinput import TextInput
@@ -26,6 +27,7 @@ from ..obstypes.stopwatchinput import StopwatchInput
 from ..obstypes.timerinput import TimerInput
 from ..util.geometryutil import Coords
 from ..util.miscutil import obs_to_color
+from ..util.uiqueue import UIQueue
 
 user_types : List[OBS_Object] = [
   ImageInput,
@@ -38,13 +40,70 @@ user_types : List[OBS_Object] = [
 
 user_types_map : Dict[str, OBS_Object] = { v.description():v for v in user_types }
 
+text_kinds : List[str] = ['text_gdiplus_v2', 'text_ft2_source_v2']
+
+SHIFT_MASK : int = 0x0001 # tk.Event.state bit while shift is held
+
+# OBS events that mean our copy of the scene is stale
+sync_events : List[str] = [
+  'CurrentProgramSceneChanged',
+  'SceneItemCreated',
+  'SceneItemRemoved',
+  'SceneItemListReindexed',
+  'SceneItemTransformChanged',
+  'InputNameChanged',
+  'CurrentSceneCollectionChanged',
+  'CurrentProfileChanged'
+]
+
+# OBS events after which GetVideoSettings has to be asked again, obs-websocket has no event for the video settings themselves
+video_events : List[str] = [
+  'CurrentProfileChanged'
+]
+
 class Default_GUI:
   ready_to_connect : bool = False
   connected : bool = False
   
   connection : DirectConnection = None
   
-  framerate : float = 20.0
+  # canvas and widget changes from the network thread are posted here and run on the Tk thread
+  ui_queue : UIQueue = None
+  
+  framerate : float = 20.0 # current UI ticks per second, picked by choose_framerate every tick
+  idle_framerate    : float = 5.0
+  ticking_framerate : float = 20.0 # timers only change their text once a second
+  active_framerate  : float = 60.0
+  active_linger     : float = 1.0 # seconds to stay at the active rate after the last input
+  
+  dragging : bool = False
+  last_interaction : float = 0.0
+  frame_after_id : str = None
+  
+  flush_rate : float = 30.0 # max request queue flushes per second, the flusher sleeps while nothing is queued
+  flush_idle_timeout : float = 1.0 # seconds between checks that the connection the flusher waits on is still the current one
+  sync_rate  : float = 20.0 # scene sync checks per second
+  
+  last_frame_start : float = 0.0
+  last_histogram_log : float = 0.0
+  frame_bucket_ms : int = 10
+  frame_histogram : Dict[int, int] = {}
+  
+  events_enabled : bool = False
+  scene_dirty : bool = True
+  video_settings_dirty : bool = True # only read on syncs that follow a profile change or a reconcile while events are on
+  reconcile_interval : float = 10.0 # seconds between full syncs when OBS events are available
+  last_reconcile : float = 0.0
+  
+  # GetInputSettings results by inputName, only used while OBS events can invalidate them
+  input_settings_cache : Dict[str, dict] = {}
+  settings_cache_hits : int = 0
+  settings_cache_misses : int = 0
+  settings_fetch_limit : int = 8 # max GetInputSettings requests in flight during a sync
+  
+  # send times of our own transform and settings writes, which OBS reports back as events
+  written_echoes : Dict[tuple, Deque[float]] = {}
+  echo_window : float = 2.0 # seconds to wait for an echo before treating the next event as foreign
   
   output_width : float  = 1920.0
   output_height : float = 1080.0
@@ -55,7 +114,9 @@ class Default_GUI:
   
   current_scene : str = None
   scenes : Dict[str, List[OBS_Object]] = {}
+  items_by_id : Dict[int, OBS_Object] = {} # current scene only, rebuilt on every sync
   
+  selection : List[OBS_Object] = None # selected items in the current scene, the last one owns the modify panel
   prev_selected_item : OBS_Object = None
   
   lastpos : Coords = Coords()
@@ -94,6 +155,9 @@ class Default_GUI:
     self.root.columnconfigure(0, weight = 1)
     self.root.rowconfigure(0, weight = 1)
     
+    self.selection = []
+    self.written_echoes = {}
+    
     self.addr_strvar        = tk.StringVar(self.root, value = "ws://127.0.0.1:4455")
     self.pw_strvar          = tk.StringVar(self.root, "testpw")
     self.conn_submit_strvar = tk.StringVar(self.root, "Connect")
@@ -164,42 +228,224 @@ class Default_GUI:
     
     self.setup_connection_ui()
     
+    self.ui_queue = UIQueue(self.root)
+    self.frame_after_id = self.root.after(0, self.frame_tick)
+    
   def start_async_loop(self):
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     
+    loop.run_until_complete(self.run_async_tasks())
+    
+  async def run_async_tasks(self) -> None:
+    await asyncio.gather(
+      self.run_flushes(),
+      self.run_periodically(lambda: min(self.sync_rate, self.framerate), self.sync_update)
+    )
+    
+  async def run_periodically(self, get_rate : Callable[[], float], func : Callable[[], Awaitable[None]]) -> None:
     while True:
       start = time.time()
       
-      self.update_modify_ui()
-      self.update_items()
-      self.queue_item_modification_requests()
-      loop.run_until_complete(self.async_update())
+      try:
+        await func()
+      except Exception:
+        logging.exception(f"Error in {func.__name__}.")
+        
+      waittime = (1.0 / get_rate()) - (time.time() - start)
+      await asyncio.sleep(max(waittime, 0))
       
-      frametime = (time.time() - start)
-      waittime = (1.0 / self.framerate) - frametime
-      if waittime > 0:
-        time.sleep(waittime)
+  async def run_flushes(self) -> None:
+    while True:
+      if not self.connected:
+        await asyncio.sleep(1.0 / self.sync_rate)
+        continue
+      
+      if not await self.connection.wait_for_requests(self.flush_idle_timeout):
+        continue
+      
+      start = time.time()
+      try:
+        await self.flush_requests()
+      except Exception:
+        logging.exception("Error in flush_requests.")
         
-  def update_items(self) -> None:
-    for item in self.get_current_scene_items():
-      item.update(self)
+      # requests queued during this wait are coalesced into the next flush
+      waittime = (1.0 / self.flush_rate) - (time.time() - start)
+      await asyncio.sleep(max(waittime, 0))
+      
+  def frame_tick(self) -> None:
+    start = time.time()
     
-  async def async_update(self):
+    try:
+      self.frame_update()
+    except Exception:
+      logging.exception("Error in frame_update.")
+      
+    self.framerate = self.choose_framerate()
+    waittime = (1.0 / self.framerate) - (time.time() - start)
+    self.frame_after_id = self.root.after(max(int(waittime * 1000.0), 1), self.frame_tick)
+    
+  def choose_framerate(self) -> float:
+    if self.dragging or (time.time() - self.last_interaction) < self.active_linger:
+      return self.active_framerate
+    if any(item.is_ticking() for item in self.get_current_scene_items()):
+      return self.ticking_framerate
+    return self.idle_framerate
+  
+  def note_interaction(self) -> None:
+    self.last_interaction = time.time()
+    
+    # don't make the first frame of a drag wait out an idle-length sleep
+    if self.framerate < self.active_framerate and self.frame_after_id:
+      self.root.after_cancel(self.frame_after_id)
+      self.framerate = self.active_framerate
+      self.frame_after_id = self.root.after(0, self.frame_tick)
+    
+  def frame_update(self) -> None:
+    start = time.time()
+    if self.last_frame_start:
+      self.record_frame_time(start - self.last_frame_start)
+    self.last_frame_start = start
+    
+    self.update_modify_ui()
+    self.update_items()
+    self.queue_item_modification_requests()
+    
+  def record_frame_time(self, frametime : float) -> None:
+    bucket = min(int(frametime * 1000.0 / self.frame_bucket_ms) * self.frame_bucket_ms, 500)
+    self.frame_histogram[bucket] = self.frame_histogram.get(bucket, 0) + 1
+    
+    now = time.time()
+    if now - self.last_histogram_log > 10.0:
+      self.last_histogram_log = now
+      logging.debug("Frame interval histogram (ms: count): " + ", ".join(f"{b}: {self.frame_histogram[b]}" for b in sorted(self.frame_histogram)))
+      self.frame_histogram = {}
+      
+  async def flush_requests(self) -> None:
+    if self.connected:
+      self.invalidate_written_settings()
+      await self.connection.update()
+      
+  async def sync_update(self) -> None:
     if not self.connected and self.ready_to_connect:
       success = await self.attempt_connection()
       if success:
-        self.set_conn_ui_state(True, "Connected.")
-        self.clear_root()
-        self.setup_default_ui()
+        await self.ui_queue.run(self.show_default_ui)
+        self.events_enabled = self.connection.register_event_callback(self.on_obs_event)
+        self.connection.flush_handler = self.note_written_requests
+        self.scene_dirty = True
+        # attempt_connection just read the video settings
+        self.video_settings_dirty = False
       else:
-        self.set_conn_ui_state(False, "Failed to connect. Retry?")
+        self.ui_queue.call(self.set_conn_ui_state, False, "Failed to connect. Retry?")
     if self.connected:
-      await self.connection.update()
-      await self.get_scene_state()
+      if self.scene_needs_sync():
+        await self.get_scene_state()
       
       if not self.connection.connected:
-        self.reset_to_connection_ui()
+        await self.ui_queue.run(self.reset_to_connection_ui)
+        
+  def update_items(self) -> None:
+    for item in self.get_current_scene_items():
+      item.update(self)
+    
+  def scene_needs_sync(self) -> bool:
+    if not self.events_enabled:
+      return True
+    
+    now = time.time()
+    reconcile = (now - self.last_reconcile) > self.reconcile_interval
+    if self.scene_dirty or reconcile:
+      # resolution edits in OBS's settings dialog send no event, the periodic reconcile picks them up
+      self.video_settings_dirty = self.video_settings_dirty or reconcile
+      self.scene_dirty = False
+      self.last_reconcile = now
+      logging.debug(f"Input settings cache: {self.settings_cache_hits} hits, {self.settings_cache_misses} misses, {len(self.input_settings_cache)} entries.")
+      return True
+    return False
+  
+  async def on_obs_event(self, event_type : str, event_data : dict) -> None:
+    if event_type == 'SceneItemTransformChanged' and event_data['sceneName'] == self.current_scene:
+      item = self.find_scene_item(event_data['sceneItemId'])
+      if item:
+        # echoes of our writes can arrive after newer local changes went out, and a drag owns its items
+        own = self.is_own_echo(event_type, event_data)
+        if not own and not (self.dragging and item in self.selection):
+          self.ui_queue.call(self.apply_transform, item, event_data['sceneItemTransform'])
+        return
+      
+    if event_type == 'InputSettingsChanged':
+      await self.update_input_settings(event_data)
+      return
+    elif event_type == 'InputNameChanged':
+      self.input_settings_cache.pop(event_data['oldInputName'], None)
+      self.input_settings_cache.pop(event_data['inputName'], None)
+      
+    if event_type in video_events:
+      self.video_settings_dirty = True
+    if event_type in sync_events:
+      self.scene_dirty = True
+      
+  def echo_key(self, kind : str, data : dict) -> tuple:
+    if kind in ('SetSceneItemTransform', 'SceneItemTransformChanged'):
+      return ('transform', data.get('sceneName'), data.get('sceneItemId'))
+    if kind in ('SetInputSettings', 'InputSettingsChanged'):
+      return ('input', data.get('inputName'))
+    return None
+  
+  def note_written_requests(self, reqs : List[simpleobsws.Request]) -> None:
+    now = time.time()
+    for req in reqs:
+      key = self.echo_key(req.requestType, req.requestData or {})
+      if key:
+        self.written_echoes.setdefault(key, collections.deque()).append(now)
+        
+  def is_own_echo(self, event_type : str, event_data : dict) -> bool:
+    key = self.echo_key(event_type, event_data)
+    pending = self.written_echoes.get(key)
+    if not pending:
+      return False
+    
+    now = time.time()
+    while pending and now - pending[0] > self.echo_window:
+      pending.popleft()
+      
+    own = bool(pending)
+    if own:
+      pending.popleft()
+    if not pending:
+      del self.written_echoes[key]
+    return own
+  
+  async def update_input_settings(self, event_data : dict) -> None:
+    name = event_data['inputName']
+    own = self.is_own_echo('InputSettingsChanged', event_data)
+    
+    settings = event_data.get('inputSettings')
+    if settings is None:
+      self.input_settings_cache.pop(name, None)
+      settings = await self.get_input_settings(name)
+    elif self.events_enabled:
+      self.input_settings_cache[name] = settings
+      
+    if settings is not None and not own:
+      self.ui_queue.call(self.apply_input_settings, name, settings)
+      
+  def apply_input_settings(self, input_name : str, settings : dict) -> None:
+    for item in self.get_current_scene_items():
+      if item.source_name != input_name:
+        continue
+      if isinstance(item, ImageInput):
+        self.apply_image_settings(item, settings)
+      elif isinstance(item, TextInput):
+        self.apply_text_settings(item, settings)
+    
+  def invalidate_written_settings(self) -> None:
+    for req in list(self.connection.request_queue):
+      if req.requestType in ('SetInputSettings', 'SetInputName', 'CreateInput') and req.requestData:
+        self.input_settings_cache.pop(req.requestData.get('inputName'), None)
+        self.input_settings_cache.pop(req.requestData.get('newInputName'), None)
     
   def clear_root(self) -> None:
     for ele in self.root.winfo_children():
@@ -207,18 +453,29 @@ class Default_GUI:
       
   def on_close(self) -> None:
     self.save_scene_items()
+    download_cache.flush()
     self.root.destroy()
       
   def reset_to_connection_ui(self) -> None:
       self.connected = False
       self.ready_to_connect = False
+      
+      # stops pending image loads from polling a canvas that is about to be destroyed
+      for items in self.scenes.values():
+        for item in items:
+          item.remove_from_canvas()
       self.clear_root()
       self.setup_connection_ui()
       
       self.current_scene = ""
       self.scenes = {}
+      self.items_by_id = {}
+      self.selection = []
+      self.input_settings_cache = {}
+      self.written_echoes = {}
       self.screen = None
       self.modifyframe = None
+      self.events_enabled = False
     
     
   def setup_connection_ui(self) -> None:
@@ -260,7 +517,12 @@ class Default_GUI:
   def get_items_under_mouse(self, coords : Coords) -> List[Tuple[OBS_Object, ModifyType]]:
     items_under : List[Tuple[OBS_Object, ModifyType]] = []
     
-    for item in self.get_current_scene_items():
+    candidates = self.screen.hit_grid.query(coords.x, coords.y)
+    if not candidates:
+      return items_under
+    
+    # keep the scene's stacking order, which the double click cycling relies on
+    for item in sorted(candidates, key = lambda item: item.stack_position):
       manip_mode = item.move_or_resize(coords)
       if manip_mode != ModifyType.NONE:
         items_under.append((item, manip_mode))
@@ -268,6 +530,7 @@ class Default_GUI:
     return items_under
 
   def mouseDown(self, event : tk.Event) -> None:
+    self.note_interaction()
     self.update_lastpos(event.x, event.y)
     
     self.xpull = 0
@@ -275,165 +538,183 @@ class Default_GUI:
     
     items_under = self.get_items_under_mouse(self.lastpos)
     
-    for item in self.get_current_scene_items():
-      if item.selected:
-        in_under = False
-        for under_item in items_under:
-          if item.scene_item_id == under_item[0].scene_item_id:
-            in_under = True
-            break
-        item.set_selected(in_under)
+    if event.state & SHIFT_MASK:
+      # shift click adds the top item to the selection or takes it back out
+      self.manip_mode = ModifyType.NONE
+      if len(items_under) > 0:
+        item, mode = items_under[0]
+        self.select_item(item, not item.selected)
+        # mouseMove manipulates the last selected item, so the grabbed handle only applies if that is the clicked one
+        if item.selected:
+          self.manip_mode = mode
+      self.dragging = self.manip_mode != ModifyType.NONE
+      self.screen.set_interacting(self.dragging)
+      return
     
-    already_focused = False
-    for item in items_under:
-      if item[0].selected:
-        already_focused = True
-        self.manip_mode = item[1]
-    if not already_focused and len(items_under) > 0:
-      self.manip_mode = items_under[0][1]
-      items_under[0][0].set_selected(True)
-      items_under[0][0].setup_modify_ui(self)
+    # grabbing any selected item keeps the whole selection so it can be dragged as a group
+    focused = next(((item, mode) for item, mode in items_under if item.selected), None)
+    if focused:
+      item, self.manip_mode = focused
+      self.select_item(item)
+    else:
+      self.clear_selection()
+      if len(items_under) > 0:
+        self.manip_mode = items_under[0][1]
+        self.select_item(items_under[0][0])
+        items_under[0][0].setup_modify_ui(self)
+      
+    self.dragging = len(items_under) > 0
+    self.screen.set_interacting(self.dragging)
           
   def doubleClick(self, event : tk.Event) -> None:
+    self.note_interaction()
     self.update_lastpos(event.x, event.y)
     
     scene_coords = self.canvas_to_scene(self.lastpos)
     
     items_under = self.get_items_under_mouse(scene_coords)
     
-    for item in self.get_current_scene_items():
-      if item.selected:
-        in_under = False
-        for under_item in items_under:
-          if item.scene_item_id == under_item[0].scene_item_id:
-            in_under = True
-            break
-        item.set_selected(in_under)
+    under = [item for item, _ in items_under]
+    for item in list(self.selection):
+      if item not in under:
+        self.select_item(item, False)
     
     already_focused = False
     for i in range(0, len(items_under)):
       if items_under[i][0].selected:
         already_focused = True
         if len(items_under) > (i + 1):
-          items_under[i][0].set_selected(False)
-          items_under[i + 1][0].set_selected(True)
+          self.select_item(items_under[i][0], False)
+          self.select_item(items_under[i + 1][0])
           self.manip_mode = items_under[i+1][1]
           items_under[i + 1][0].setup_modify_ui(self)
         if i > 0 and i == len(items_under) - 1:
-          items_under[i][0].set_selected(False)
-          items_under[0][0].set_selected(True)
+          self.select_item(items_under[i][0], False)
+          self.select_item(items_under[0][0])
           self.manip_mode = items_under[0][1]
           items_under[0][0].setup_modify_ui(self)
         break
     if not already_focused and len(items_under) > 0:
       self.manip_mode = items_under[0][1]
-      items_under[0][0].set_selected(True)
+      self.select_item(items_under[0][0])
       items_under[0][0].setup_modify_ui(self)
 
   def mouseMove(self, event : tk.Event) -> None:
+    self.note_interaction()
     diffX = round((event.x - self.lastpos.x) / self.screen.scale)
     diffY = round((event.y - self.lastpos.y) / self.screen.scale)
-    for item in self.get_current_scene_items():
-      if item.selected:
-        x = item.x
-        y = item.y
-        w = item.width
-        h = item.height
-        r = item.rotation
+    
+    item = self.get_selected_item()
+    if item and self.dragging and self.manip_mode != ModifyType.NONE:
+      # only the grabbed item is resized or rotated, the rest of the selection follows its moves
+      x = item.x
+      y = item.y
+      w = item.width
+      h = item.height
+      r = item.rotation
+      
+      if self.manip_mode == ModifyType.MOVE:
+        x += diffX
+        y += diffY
         
-        if self.manip_mode == ModifyType.MOVE:
-          x += diffX
-          y += diffY
-          
-          dist_from_right_edge = self.screen.width - (x + w)
-          dist_from_bottom_edge = self.screen.height - (y + h)
-              
-          if abs(x) < self.edge_groove:
-            if abs(self.xpull) < (2.0 * self.edge_groove):
-              self.xpull += x
-              x = 0
-            else:
-              x = self.xpull
-              self.xpull = 0
-          elif abs(dist_from_right_edge) < self.edge_groove:
-            if abs(self.xpull) < (2.0 * self.edge_groove):
-              self.xpull += dist_from_right_edge
-              x = self.screen.width - w
-            else:
-              x = self.screen.width - w - self.xpull
-              self.xpull = 0
-              
-          if abs(y) < self.edge_groove:
-            if abs(self.ypull) < (2.0 * self.edge_groove):
-              self.ypull += y
-              y = 0
-            else:
-              y = self.ypull
-              self.ypull = 0
-          elif abs(dist_from_bottom_edge) < self.edge_groove:
-            if abs(self.ypull) < (2.0 * self.edge_groove):
-              self.ypull += dist_from_bottom_edge
-              y = self.screen.height - h
-            else:
-              y = self.screen.height - h - self.ypull
-              self.ypull = 0
-          
-        elif self.manip_mode == ModifyType.ROTATE:
-          center = item.polygon.centroid()
-          v2 = Coords(event.x, event.y) - center
-          
-          new_angle = v2.angle() + (math.pi / 2)
-                 
-          for i in range(8):
-            if abs((i * math.pi / 4) - new_angle) < (0.5 * self.rotation_groove * math.pi / 180.0):
-              new_angle = i * math.pi / 4
-          
-          adelta = new_angle - r
-          
-          normalized_center = (center - item.polygon.point(0)) / self.screen.scale
-          
-          rotated_center = normalized_center.__copy__()
-          rotated_center.rotate(adelta)
-          
-          displacement = rotated_center - normalized_center
-          
-          x -= displacement.x
-          y -= displacement.y
-          r  = new_angle
-        else:
-          moveangle = Coords(diffX, diffY).angle()
-          aprime = moveangle - item.rotation
-          movedist = math.sqrt(math.pow(diffX, 2) + math.pow(diffY, 2))
-          rotatedX = movedist * math.cos(aprime)
-          rotatedY = movedist * math.sin(aprime)
-          
-          if (self.manip_mode & ModifyType.LEFT != 0):
-            corrX = rotatedX * math.cos(item.rotation)
-            corrY = rotatedX * math.sin(item.rotation)
-            x += corrX
-            y += corrY
-          
-          if (self.manip_mode & ModifyType.TOP != 0):
-            corrX = rotatedY * math.cos((math.pi / 2) - item.rotation)
-            corrY = rotatedY * math.sin((math.pi / 2) - item.rotation)
-            x -= corrX
-            y += corrY
-          
-          if self.manip_mode & ModifyType.LEFT != 0:
-            w -= rotatedX
-          if self.manip_mode & ModifyType.RIGHT != 0:
-            w += rotatedX
-          if self.manip_mode & ModifyType.TOP != 0:
-            h -= rotatedY
-          if self.manip_mode & ModifyType.BOTTOM != 0:
-            h += rotatedY
+        dist_from_right_edge = self.screen.width - (x + w)
+        dist_from_bottom_edge = self.screen.height - (y + h)
             
-        item.set_transform(x, y, w, h, r)
+        if abs(x) < self.edge_groove:
+          if abs(self.xpull) < (2.0 * self.edge_groove):
+            self.xpull += x
+            x = 0
+          else:
+            x = self.xpull
+            self.xpull = 0
+        elif abs(dist_from_right_edge) < self.edge_groove:
+          if abs(self.xpull) < (2.0 * self.edge_groove):
+            self.xpull += dist_from_right_edge
+            x = self.screen.width - w
+          else:
+            x = self.screen.width - w - self.xpull
+            self.xpull = 0
+            
+        if abs(y) < self.edge_groove:
+          if abs(self.ypull) < (2.0 * self.edge_groove):
+            self.ypull += y
+            y = 0
+          else:
+            y = self.ypull
+            self.ypull = 0
+        elif abs(dist_from_bottom_edge) < self.edge_groove:
+          if abs(self.ypull) < (2.0 * self.edge_groove):
+            self.ypull += dist_from_bottom_edge
+            y = self.screen.height - h
+          else:
+            y = self.screen.height - h - self.ypull
+            self.ypull = 0
+        
+      elif self.manip_mode == ModifyType.ROTATE:
+        center = item.polygon.centroid()
+        v2 = Coords(event.x, event.y) - center
+        
+        new_angle = v2.angle() + (math.pi / 2)
+               
+        for i in range(8):
+          if abs((i * math.pi / 4) - new_angle) < (0.5 * self.rotation_groove * math.pi / 180.0):
+            new_angle = i * math.pi / 4
         
+        adelta = new_angle - r
+        
+        normalized_center = (center - item.polygon.point(0)) / self.screen.scale
+        
+        rotated_center = normalized_center.__copy__()
+        rotated_center.rotate(adelta)
+        
+        displacement = rotated_center - normalized_center
+        
+        x -= displacement.x
+        y -= displacement.y
+        r  = new_angle
+      else:
+        moveangle = Coords(diffX, diffY).angle()
+        aprime = moveangle - item.rotation
+        movedist = math.sqrt(math.pow(diffX, 2) + math.pow(diffY, 2))
+        rotatedX = movedist * math.cos(aprime)
+        rotatedY = movedist * math.sin(aprime)
+        
+        if (self.manip_mode & ModifyType.LEFT != 0):
+          corrX = rotatedX * math.cos(item.rotation)
+          corrY = rotatedX * math.sin(item.rotation)
+          x += corrX
+          y += corrY
+        
+        if (self.manip_mode & ModifyType.TOP != 0):
+          corrX = rotatedY * math.cos((math.pi / 2) - item.rotation)
+          corrY = rotatedY * math.sin((math.pi / 2) - item.rotation)
+          x -= corrX
+          y += corrY
+        
+        if self.manip_mode & ModifyType.LEFT != 0:
+          w -= rotatedX
+        if self.manip_mode & ModifyType.RIGHT != 0:
+          w += rotatedX
+        if self.manip_mode & ModifyType.TOP != 0:
+          h -= rotatedY
+        if self.manip_mode & ModifyType.BOTTOM != 0:
+          h += rotatedY
+          
+      moveX = x - item.x
+      moveY = y - item.y
+      item.set_transform(x, y, w, h, r)
+      
+      if self.manip_mode == ModifyType.MOVE:
+        for other in self.selection:
+          if other is not item:
+            other.set_transform(other.x + moveX, other.y + moveY)
+      
     self.update_lastpos(event.x, event.y)
     
   def mouseUp(self, event : tk.Event) -> None:
-    return
+    self.dragging = False
+    self.screen.set_interacting(False)
+    self.note_interaction()
   
   def get_current_scene_items(self) -> List[OBS_Object]:
     if self.current_scene and self.current_scene not in self.scenes:
@@ -444,11 +725,29 @@ class Default_GUI:
     else:
       return []
   
+  def add_scene_item(self, item : OBS_Object) -> None:
+    items = self.get_current_scene_items()
+    item.stack_position = len(items)
+    items.append(item)
+    
+  def number_scene_items(self, items : List[OBS_Object]) -> None:
+    for position, item in enumerate(items):
+      item.stack_position = position
+  
   def get_selected_item(self) -> OBS_Object:
-    for item in self.get_current_scene_items():
-      if item.selected:
-        return item
-    return None
+    return self.selection[-1] if self.selection else None
+  
+  def select_item(self, item : OBS_Object, selected : bool = True) -> None:
+    item.set_selected(selected)
+    if item in self.selection:
+      self.selection.remove(item)
+    if selected:
+      self.selection.append(item)
+      
+  def clear_selection(self) -> None:
+    for item in self.selection:
+      item.set_selected(False)
+    self.selection = []
       
   def clear_canvas(self) -> None:
     self.canvas.delete("all")
@@ -461,6 +760,11 @@ class Default_GUI:
       for item in self.get_current_scene_items():
         item.canvas_configure(event)
     
+  def show_default_ui(self) -> None:
+    self.set_conn_ui_state(True, "Connected.")
+    self.clear_root()
+    self.setup_default_ui()
+    
   def setup_default_ui(self) -> None:
     self.defaultframe = ttk.Frame(self.root, padding = "5 5 5 5")
     self.defaultframe.pack(anchor = tk.CENTER, fill = tk.BOTH, expand = True)
@@ -559,10 +863,9 @@ class Default_GUI:
   async def attempt_connection(self):
     self.ready_to_connect = False
       
-    address = self.addr_strvar.get()
-    password = self.pw_strvar.get()
+    address, password = await self.ui_queue.run(lambda: (self.addr_strvar.get(), self.pw_strvar.get()))
     
-    self.conn_submit_strvar.set("Attempting to connect...")
+    self.ui_queue.call(self.conn_submit_strvar.set, "Attempting to connect...")
     
     self.connection = DirectConnection(address, password, self.log_request_error)
     
@@ -599,10 +902,7 @@ class Default_GUI:
     return ret.responseData["baseWidth"], ret.responseData["baseHeight"]
   
   def find_scene_item(self, item_id : int) -> OBS_Object:
-    for item in self.get_current_scene_items():
-      if (item.scene_item_id == item_id):
-        return item
-    return None
+    return self.items_by_id.get(item_id)
   
   def find_uninit_item(self, sourceName : str) -> OBS_Object:
     for item in self.get_current_scene_items():
@@ -612,20 +912,39 @@ class Default_GUI:
            return item
     return None
   
-  async def get_image_for_item(self, item : ImageInput) -> None:
-    req = simpleobsws.Request('GetInputSettings', { 'inputName': item.source_name })
+  async def get_input_settings(self, input_name : str) -> dict:
+    if self.events_enabled and input_name in self.input_settings_cache:
+      self.settings_cache_hits += 1
+      return self.input_settings_cache[input_name]
+    
+    self.settings_cache_misses += 1
+    req = simpleobsws.Request('GetInputSettings', { 'inputName': input_name })
     ret = await self.connection.request(req)
     
-    if ret and 'file' in ret.responseData['inputSettings']:
-      url = ret.responseData['inputSettings']['file']
-      item.set_url(url, False)
+    if not ret:
+      return None
+    
+    settings = ret.responseData['inputSettings']
+    if self.events_enabled:
+      self.input_settings_cache[input_name] = settings
+    return settings
   
-  async def get_text_settings(self, item : TextInput) -> None:
-    req = simpleobsws.Request('GetInputSettings', { 'inputName': item.source_name })
-    ret = await self.connection.request(req)
+  async def fetch_input_settings(self, input_names : Iterable[str]) -> Dict[str, dict]:
+    limit = asyncio.Semaphore(self.settings_fetch_limit)
     
-    if ret:
-      settings = ret.responseData['inputSettings']
+    async def fetch(name : str) -> Tuple[str, dict]:
+      async with limit:
+        return name, await self.get_input_settings(name)
+      
+    return dict(await asyncio.gather(*(fetch(name) for name in input_names)))
+  
+  def apply_image_settings(self, item : ImageInput, settings : dict) -> None:
+    if settings and 'file' in settings:
+      url = settings['file']
+      item.set_url(url, False)
+      
+  def apply_text_settings(self, item : TextInput, settings : dict) -> None:
+    if settings:
       if 'text' in settings:
         text = settings['text']
         item.set_text(text, False)
@@ -642,6 +961,55 @@ class Default_GUI:
         bk_opacity = settings['bk_opacity']
         item.toggle_background((bk_opacity == 100), False)
   
+  async def get_image_for_item(self, item : ImageInput) -> None:
+    self.apply_image_settings(item, await self.get_input_settings(item.source_name))
+  
+  async def get_text_settings(self, item : TextInput) -> None:
+    self.apply_text_settings(item, await self.get_input_settings(item.source_name))
+  
+  def parse_transform(self, tf : dict) -> Tuple[float, float, float, float, float, float, float, str]:
+    # print(tf)
+    # print(f"X: {tf['positionX']} Y: {tf['positionY']} W: {tf['width']} H: {tf['height']} BW: {tf['boundsWidth']} BH: {tf['boundsHeight']} SX: {tf['scaleX']} SY: {tf['scaleY']} CL: {tf['cropLeft']} CR: {tf['cropRight']}")
+    
+    x = tf['positionX']
+    y = tf['positionY']
+    
+    w = tf['width']
+    h = tf['height']
+    
+    a = tf['rotation']
+    
+    sw = tf['sourceWidth']
+    sh = tf['sourceHeight']
+    
+    boundstype = tf['boundsType']
+    
+    if boundstype == 'OBS_BOUNDS_SCALE_INNER':
+      w = tf['boundsWidth']
+      h = tf['boundsHeight']
+      
+    return x, y, w, h, a, sw, sh, boundstype
+  
+  def apply_transform(self, item : OBS_Object, tf : dict) -> None:
+    x, y, w, h, a, _, _, _ = self.parse_transform(tf)
+    item.set_transform(x, y, w, h, (math.pi * a / 180.0), local = False)
+    
+  def switch_scene(self, scene_name : str) -> None:
+    for item in self.get_current_scene_items():
+      item.remove_from_canvas()
+    self.current_scene = scene_name
+    self.items_by_id = {}
+    for item in self.get_current_scene_items():
+      item.add_to_canvas()
+    self.selection = [item for item in self.get_current_scene_items() if item.selected]
+    self.canvas_configure()
+    
+  def set_output_size(self, width : float, height : float) -> None:
+    self.output_width = width
+    self.output_height = height
+    self.screen.set_transform(w = self.output_width, h = self.output_height)
+    self.canvas_configure()
+  
   async def get_scene_state(self) -> None:
     req = simpleobsws.Request('GetCurrentProgramScene')
     ret = await self.connection.request(req)
@@ -652,20 +1020,14 @@ class Default_GUI:
     
     active_scene = ret.responseData["currentProgramSceneName"]
     if self.current_scene != active_scene:
-      for item in self.get_current_scene_items():
-        item.remove_from_canvas()
-      self.current_scene = active_scene
-      for item in self.get_current_scene_items():
-        item.add_to_canvas()
-      self.canvas_configure()
+      await self.ui_queue.run(self.switch_scene, active_scene)
     
-    screenw, screenh = await self.get_video_settings()
-    if screenw and screenh:
-      if self.output_height != screenh or self.output_width != screenw:
-        self.output_width = screenw
-        self.output_height = screenh
-        self.screen.set_transform(w = self.output_width, h = self.output_height)
-        self.canvas_configure()
+    if self.video_settings_dirty or not self.events_enabled:
+      screenw, screenh = await self.get_video_settings()
+      if screenw and screenh:
+        self.video_settings_dirty = False
+        if self.output_height != screenh or self.output_width != screenw:
+          await self.ui_queue.run(self.set_output_size, screenw, screenh)
     
     req = simpleobsws.Request('GetSceneItemList', { 'sceneName' : self.current_scene })
     ret = await self.connection.request(req)
@@ -676,52 +1038,42 @@ class Default_GUI:
     
     item_list = ret.responseData['sceneItems']
     
-    for saved in self.get_current_scene_items()[:]:
-      found = False
+    fetch_start = time.perf_counter()
+    settings = await self.fetch_input_settings({ i['sourceName'] for i in item_list if i['inputKind'] == 'image_source' or i['inputKind'] in text_kinds })
+    logging.debug(f"Fetched settings for {len(settings)} inputs ({len(item_list)} items) in {1000.0 * (time.perf_counter() - fetch_start):.1f}ms.")
+    
+    # everything that touches the canvas runs as one batch on the Tk thread
+    await self.ui_queue.run(self.apply_scene_items, item_list, settings)
+    
+  def apply_scene_items(self, item_list : List[dict], settings : Dict[str, dict]) -> None:
+    items = self.get_current_scene_items()
+    active_ids = { i['sceneItemId'] for i in item_list }
+    
+    by_id : Dict[int, OBS_Object] = {}
+    uninit : Dict[str, List[OBS_Object]] = {}
+    kept : List[OBS_Object] = []
+    for saved in items:
       if saved.scene_item_id == -1 and saved.scene_item_index == -1:
-        found = True
-        continue
-      
-      for active in item_list:
-        if saved.scene_item_id == active['sceneItemId']:
-          found = True
-          break
-      if not found:
+        uninit.setdefault(saved.source_name, []).append(saved)
+      elif saved.scene_item_id in active_ids:
+        by_id[saved.scene_item_id] = saved
+      else:
         saved.remove_from_canvas()
-        self.scenes[self.current_scene].remove(saved)
+        continue
+      kept.append(saved)
         
     for i in item_list:
+      item = by_id.get(i['sceneItemId'])
+      
+      if not item and uninit.get(i['sourceName']):
+        item = uninit[i['sourceName']].pop(0)
+        
       name = i['sourceName']
       itemId = i['sceneItemId']
       itemIndex = i['sceneItemIndex']
       kind = i['inputKind']
       
-      item = self.find_scene_item(itemId)
-      
-      if not item:
-        item = self.find_uninit_item(name)
-      
-      tf = i['sceneItemTransform']
-      
-      # print(tf)
-      # print(f"X: {tf['positionX']} Y: {tf['positionY']} W: {tf['width']} H: {tf['height']} BW: {tf['boundsWidth']} BH: {tf['boundsHeight']} SX: {tf['scaleX']} SY: {tf['scaleY']} CL: {tf['cropLeft']} CR: {tf['cropRight']}")
-      
-      x = tf['positionX']
-      y = tf['positionY']
-      
-      w = tf['width']
-      h = tf['height']
-      
-      a = tf['rotation']
-      
-      sw = tf['sourceWidth']
-      sh = tf['sourceHeight']
-      
-      boundstype = tf['boundsType']
-      
-      if boundstype == 'OBS_BOUNDS_SCALE_INNER':
-        w = tf['boundsWidth']
-        h = tf['boundsHeight']
+      x, y, w, h, a, sw, sh, boundstype = self.parse_transform(i['sceneItemTransform'])
       
       if item:
         item.set_transform(x, y, w, h, (math.pi * a / 180.0), local = False)
@@ -733,29 +1085,40 @@ class Default_GUI:
         item.bounds_type = boundstype
         
         if kind == 'image_source':
-          await self.get_image_for_item(item)
-        if kind == 'text_gdiplus_v2' or kind == 'text_ft2_source_v2':
-          await self.get_text_settings(item)
+          self.apply_image_settings(item, settings.get(name))
+        if kind in text_kinds:
+          self.apply_text_settings(item, settings.get(name))
         
       else:
         if kind == 'image_source':
           item = ImageInput(itemId, itemIndex, self.canvas, self.screen, x, y, w, h, a, sw, sh, boundstype, name)
-          await self.get_image_for_item(item)
-        elif kind == 'text_gdiplus_v2' or kind == 'text_ft2_source_v2':
+          self.apply_image_settings(item, settings.get(name))
+        elif kind in text_kinds:
           item = TextInput(itemId, itemIndex, self.canvas, self.screen, x, y, w, h, a, sw, sh, boundstype, name)
-          await self.get_text_settings(item)
+          self.apply_text_settings(item, settings.get(name))
         else:
           item = OBS_Object(itemId, itemIndex, self.canvas, self.screen, x, y, w, h, a, sw, sh, boundstype, name)
           item.set_interactable(False)
           
-        self.scenes[self.current_scene].append(item)
-            
-    # sort the scene items to match the OBS source list
-    og_scenes = self.scenes[self.current_scene][:]
-    self.scenes[self.current_scene] = sorted(self.scenes[self.current_scene], key = lambda item: item.scene_item_index if item.scene_item_index != -1 else 999, reverse = True)
+        kept.append(item)
+      by_id[itemId] = item
+      
+    # sort the scene items to match the OBS source list, only restacking the canvas when the order changed
+    sort_key = lambda item: item.scene_item_index if item.scene_item_index != -1 else 999
+    in_order = all(sort_key(kept[n]) >= sort_key(kept[n + 1]) for n in range(len(kept) - 1))
+    if not in_order:
+      kept.sort(key = sort_key, reverse = True)
+      
+    self.scenes[self.current_scene] = kept
+    self.number_scene_items(kept)
+    self.items_by_id = by_id
+    
+    if self.selection:
+      kept_set = set(kept)
+      self.selection = [item for item in self.selection if item in kept_set]
     
-    if og_scenes != self.scenes[self.current_scene]:
-      for item in self.scenes[self.current_scene]:
+    if not in_order:
+      for item in kept:
         item.move_to_back()
       
   def queue_item_modification_requests(self) -> None:
@@ -801,4 +1164,5 @@ class Default_GUI:
 
           if item:
             item.remove_from_canvas()
-            self.scenes[scene].append(item)
\ No newline at end of file
+            self.scenes[scene].append(item)
+        self.number_scene_items(self.scenes[scene])
\ No newline at end of file
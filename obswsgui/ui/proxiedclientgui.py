@@ -19,10 +19,9 @@ class ProxiedClient_GUI(Default_GUI):
   async def attempt_connection(self):
     self.ready_to_connect = False
       
-    address = self.addr_strvar.get()
-    roomcode = self.pw_strvar.get()
+    address, roomcode = await self.ui_queue.run(lambda: (self.addr_strvar.get(), self.pw_strvar.get()))
     
-    self.conn_submit_strvar.set("Attempting to connect...")
+    self.ui_queue.call(self.conn_submit_strvar.set, "Attempting to connect...")
     
     self.connection = ProxiedClientConnection(url = address, roomcode = roomcode, error_handler = self.log_request_error)
     
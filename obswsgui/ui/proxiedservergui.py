@@ -11,6 +11,7 @@ import uuid
 logging.getLogger("simpleobsws").setLevel(level = logging.INFO)
 
 from ..networking.proxiedserverconn import ProxiedServerConnection
+from ..util.uiqueue import UIQueue
 
 class ProxiedServer_GUI:
   ready_to_connect : bool = False
@@ -18,6 +19,8 @@ class ProxiedServer_GUI:
   
   connection : ProxiedServerConnection = None
   
+  ui_queue : UIQueue = None
+  
   framerate : float = 60.0
   
   defaultfontopt : dict = { 'font': ("Helvetica",  9) }
@@ -101,27 +104,32 @@ class ProxiedServer_GUI:
     
     self.setup_connection_ui()
     
+    self.ui_queue = UIQueue(self.root)
+    
   def start_async_loop(self):
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     
+    loop.run_until_complete(self.run_async_tasks())
+    
+  async def run_async_tasks(self) -> None:
     while True:
-      loop.run_until_complete(self.async_update())
+      await self.async_update()
+      if not self.connected:
+        await asyncio.sleep(1.0 / self.framerate)
     
   async def async_update(self):
     if not self.connected and self.ready_to_connect:
       success = await self.attempt_connection()
       if success:
-        self.set_conn_ui_state(True, "Connected.")
-        self.clear_root()
-        self.setup_default_ui()
+        await self.ui_queue.run(self.show_default_ui)
       else:
-        self.set_conn_ui_state(False, "Failed to connect. Retry?")
+        self.ui_queue.call(self.set_conn_ui_state, False, "Failed to connect. Retry?")
     if self.connected:      
       await self.connection.update()
       
       if not self.connection.connected:
-        self.reset_to_connection_ui()
+        await self.ui_queue.run(self.reset_to_connection_ui)
     
   def clear_root(self) -> None:
     for ele in self.root.winfo_children():
@@ -194,13 +202,14 @@ class ProxiedServer_GUI:
   async def attempt_connection(self):
     self.ready_to_connect = False
       
-    ws_addr = self.ws_addr_strvar.get()
-    ws_password = self.ws_pw_strvar.get()
+    ws_addr, ws_password, proxy_addr, proxy_code = await self.ui_queue.run(lambda: (
+      self.ws_addr_strvar.get(),
+      self.ws_pw_strvar.get(),
+      self.proxy_addr_strvar.get(),
+      self.proxy_code_strvar.get()
+    ))
     
-    proxy_addr = self.proxy_addr_strvar.get()
-    proxy_code = self.proxy_code_strvar.get()
-    
-    self.conn_submit_strvar.set("Attempting to connect...")
+    self.ui_queue.call(self.conn_submit_strvar.set, "Attempting to connect...")
     
     self.connection = ProxiedServerConnection(ws_addr, ws_password, proxy_addr, proxy_code, lambda a: None)
     
@@ -218,6 +227,11 @@ class ProxiedServer_GUI:
     self.root.clipboard_clear()
     self.root.clipboard_append(self.connection.roomcode)
     
+  def show_default_ui(self) -> None:
+    self.set_conn_ui_state(True, "Connected.")
+    self.clear_root()
+    self.setup_default_ui()
+    
   def setup_default_ui(self) -> None:
     self.defaultframe = ttk.Frame(self.root, padding = "5 5 5 5")
     self.defaultframe.place(relx = 0.5, rely = 0.5, anchor = tk.CENTER)
@@ -3,6 +3,7 @@ from .geometryutil import (
   Polygon,
   distance_from_line,
   distance_from_segment,
+  distance_sq_from_segment,
   distance,
   on_segment,
   quadrant,
@@ -18,4 +19,20 @@ from .miscutil import (
 from .dtutil import (
   strfdelta,
   TIME_FORMAT
+)
+
+from .diskcache import (
+  DiskCache
+)
+
+from .lrucache import (
+  LRUCache
+)
+
+from .spatialgrid import (
+  SpatialGrid
+)
+
+from .uiqueue import (
+  UIQueue
 )
\ No newline at end of file
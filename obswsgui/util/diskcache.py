@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import typing
+from pathlib import Path
+
+# blobs are named by the sha256 of their contents, index.json maps keys to them plus the caller's metadata
+class DiskCache:
+  directory : Path = None
+  max_bytes : int = 0 # least recently read keys are evicted past this
+  
+  index : typing.Dict[str, dict] = None
+  index_dirty : bool = False # reads only bump atimes, those are written with the next store or flush
+  lock : threading.Lock = None
+  
+  def __init__(self, directory : Path, max_bytes : int):
+    self.directory = Path(directory)
+    self.max_bytes = max_bytes
+    self.lock = threading.Lock()
+    
+  def load_index(self) -> None:
+    if self.index is not None:
+      return
+    
+    self.index = {}
+    try:
+      with open(self.directory / "index.json", 'r') as f:
+        self.index = json.load(f)
+    except FileNotFoundError:
+      pass
+    except Exception as e:
+      logging.error(f"Ignoring unreadable cache index in {self.directory}. {e}")
+      
+  def save_index(self) -> None:
+    self.directory.mkdir(parents = True, exist_ok = True)
+    tmp = self.directory / "index.json.tmp"
+    with open(tmp, 'w') as f:
+      json.dump(self.index, f)
+    os.replace(tmp, self.directory / "index.json")
+    self.index_dirty = False
+    
+  def flush(self) -> None:
+    with self.lock:
+      if self.index_dirty:
+        self.save_index()
+    
+  def lookup(self, key : str) -> dict:
+    with self.lock:
+      self.load_index()
+      entry = self.index.get(key)
+      if entry and (self.directory / entry['hash']).is_file():
+        return dict(entry)
+      return None
+    
+  def read(self, key : str, meta : dict = None) -> bytes:
+    with self.lock:
+      self.load_index()
+      entry = self.index.get(key)
+      if not entry:
+        return None
+      
+      try:
+        data = (self.directory / entry['hash']).read_bytes()
+      except OSError:
+        del self.index[key]
+        self.index_dirty = True
+        return None
+      
+      entry.update(meta or {})
+      entry['atime'] = time.time()
+      self.index_dirty = True
+      return data
+    
+  def store(self, key : str, data : bytes, meta : dict = None) -> None:
+    digest = hashlib.sha256(data).hexdigest()
+    
+    with self.lock:
+      self.load_index()
+      self.directory.mkdir(parents = True, exist_ok = True)
+      
+      blob = self.directory / digest
+      if not blob.is_file():
+        tmp = self.directory / f"{digest}.tmp"
+        tmp.write_bytes(data)
+        os.replace(tmp, blob)
+        
+      old = self.index.get(key)
+      self.index[key] = { **(meta or {}), 'hash': digest, 'size': len(data), 'atime': time.time() }
+      if old and old['hash'] != digest:
+        self.remove_unused_blob(old['hash'])
+        
+      self.evict()
+      self.save_index()
+      
+  def evict(self) -> None:
+    sizes = { entry['hash']: entry['size'] for entry in self.index.values() }
+    total = sum(sizes.values())
+    
+    for key, entry in sorted(self.index.items(), key = lambda kv: kv[1]['atime']):
+      if total <= self.max_bytes:
+        break
+      
+      del self.index[key]
+      if self.remove_unused_blob(entry['hash']):
+        total -= entry['size']
+        
+  def remove_unused_blob(self, digest : str) -> bool:
+    if any(entry['hash'] == digest for entry in self.index.values()):
+      return False
+    
+    try:
+      (self.directory / digest).unlink()
+    except FileNotFoundError:
+      pass
+    return True
@@ -32,16 +32,13 @@ class Coords:
     return angle
     
   def rotate(self, a : float) -> None:
-    r = math.sqrt(math.pow(self.x, 2) + math.pow(self.y, 2))
-    currangle = self.angle()
+    c = math.cos(a)
+    s = math.sin(a)
     
-    newangle = currangle + a
-    
-    self.x = r * math.cos(newangle)
-    self.y = r * math.sin(newangle)
+    self.x, self.y = self.x * c - self.y * s, self.x * s + self.y * c
     
   def magnitude(self) -> float:
-    return math.sqrt(math.pow(self.x, 2) + math.pow(self.y, 2))
+    return math.hypot(self.x, self.y)
     
   def __repr__(self) -> str:
     return f"({self.x:.2f}, {self.y:.2f})"
@@ -131,20 +128,32 @@ def distance_from_line(l0 : Coords, l1 : Coords, p : Coords) -> float:
   dist = numerator / denominator
   return dist
 
-def distance_from_segment(l0 : Coords, l1 : Coords, p : Coords) -> float:
-  seglen = distance(l0, l1)
-  if seglen == 0:
-    return distance(l0, p)
-  
-  t = ((p.x - l0.x) * (l1.x - l0.x) + (p.y - l0.y) * (l1.y - l0.y)) / math.pow(seglen, 2)
+def distance_sq_from_segment(l0 : Coords, l1 : Coords, p : Coords) -> float:
+  # squared so threshold checks can compare against zone * zone without a sqrt
+  dx = l1.x - l0.x
+  dy = l1.y - l0.y
+  seglen_sq = dx * dx + dy * dy
+  
+  px = p.x - l0.x
+  py = p.y - l0.y
+  if seglen_sq == 0:
+    return px * px + py * py
+  
+  t = (px * dx + py * dy) / seglen_sq
   t = max(0, min(1, t))
-  return distance(p, Coords(l0.x + t * (l1.x - l0.x), l0.y + t * (l1.y - l0.y)))
+  
+  ex = px - t * dx
+  ey = py - t * dy
+  return ex * ex + ey * ey
+
+def distance_from_segment(l0 : Coords, l1 : Coords, p : Coords) -> float:
+  return math.sqrt(distance_sq_from_segment(l0, l1, p))
 
 def distance(a : Coords, b : Coords) -> float:
-  return math.sqrt(math.pow(a.x - b.x, 2) + math.pow(a.y - b.y, 2))
+  return math.hypot(a.x - b.x, a.y - b.y)
 
 def on_segment(l0 : Coords, l1 : Coords, p : Coords, epsilon : float = 0.01) -> bool:
-  return abs(distance(l0, p) + distance(p, l1) - distance(l0, l1)) < epsilon
+  return abs(math.hypot(l0.x - p.x, l0.y - p.y) + math.hypot(p.x - l1.x, p.y - l1.y) - math.hypot(l0.x - l1.x, l0.y - l1.y)) < epsilon
 
 def quadrant(p : Coords) -> int:
   if p.x >= 0 and p.y >= 0:
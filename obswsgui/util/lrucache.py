@@ -0,0 +1,48 @@
+import collections
+import typing
+
+class LRUCache:
+  max_size : int = 0
+  sizeof : typing.Callable[[typing.Any], int] = None
+  
+  entries : typing.OrderedDict[typing.Hashable, typing.Tuple[typing.Any, int]] = None
+  size : int = 0
+  
+  hits : int = 0
+  misses : int = 0
+  
+  def __init__(self, max_size : int, sizeof : typing.Callable[[typing.Any], int] = lambda _: 1):
+    self.max_size = max_size
+    self.sizeof = sizeof
+    self.entries = collections.OrderedDict()
+    
+  def get(self, key : typing.Hashable) -> typing.Any:
+    entry = self.entries.get(key)
+    if entry is None:
+      self.misses += 1
+      return None
+    
+    self.hits += 1
+    self.entries.move_to_end(key)
+    return entry[0]
+  
+  def put(self, key : typing.Hashable, value : typing.Any) -> None:
+    self.discard(key)
+    
+    size = self.sizeof(value)
+    self.entries[key] = (value, size)
+    self.size += size
+    
+    # always keep the newest entry, even if it is bigger than the cap on its own
+    while self.size > self.max_size and len(self.entries) > 1:
+      _, (_, evicted_size) = self.entries.popitem(last = False)
+      self.size -= evicted_size
+      
+  def discard(self, key : typing.Hashable) -> None:
+    entry = self.entries.pop(key, None)
+    if entry is not None:
+      self.size -= entry[1]
+      
+  def clear(self) -> None:
+    self.entries.clear()
+    self.size = 0
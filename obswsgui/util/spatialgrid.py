@@ -0,0 +1,55 @@
+import math
+import typing
+
+Bounds = typing.Tuple[float, float, float, float] # minx, miny, maxx, maxy
+Cell = typing.Tuple[int, int]
+
+class SpatialGrid:
+  cell_size : float = 64.0
+  cells : typing.Dict[Cell, typing.Set[typing.Any]] = None
+  spans : typing.Dict[typing.Any, typing.Tuple[int, int, int, int]] = None
+  
+  def __init__(self, cell_size : float = 64.0):
+    self.cell_size = cell_size
+    self.cells = {}
+    self.spans = {}
+    
+  def cell(self, x : float, y : float) -> Cell:
+    return math.floor(x / self.cell_size), math.floor(y / self.cell_size)
+    
+  def insert(self, obj : typing.Any, bounds : Bounds) -> None:
+    minx, miny, maxx, maxy = bounds
+    x0, y0 = self.cell(minx, miny)
+    x1, y1 = self.cell(maxx, maxy)
+    span = (x0, y0, x1, y1)
+    
+    # most redraws don't move an item across a cell boundary
+    if self.spans.get(obj) == span:
+      return
+    
+    self.remove(obj)
+    self.spans[obj] = span
+    for cx in range(x0, x1 + 1):
+      for cy in range(y0, y1 + 1):
+        self.cells.setdefault((cx, cy), set()).add(obj)
+        
+  def remove(self, obj : typing.Any) -> None:
+    span = self.spans.pop(obj, None)
+    if not span:
+      return
+    
+    x0, y0, x1, y1 = span
+    for cx in range(x0, x1 + 1):
+      for cy in range(y0, y1 + 1):
+        members = self.cells.get((cx, cy))
+        if members:
+          members.discard(obj)
+          if not members:
+            del self.cells[(cx, cy)]
+            
+  def query(self, x : float, y : float) -> typing.Set[typing.Any]:
+    return self.cells.get(self.cell(x, y), set())
+  
+  def clear(self) -> None:
+    self.cells = {}
+    self.spans = {}
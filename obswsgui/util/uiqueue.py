@@ -0,0 +1,69 @@
+import asyncio
+import collections
+import logging
+import time
+import tkinter as tk
+import typing
+
+class UIQueue:
+  root : tk.Tk = None
+  commands : typing.Deque[typing.Callable[[], None]] = None
+
+  interval_ms : int = 5 # pump delay while commands keep arriving
+  idle_interval_ms : int = 50 # longest delay once the queue has stayed empty, bounds the latency of the first command after a lull
+  next_interval_ms : int = 5
+  budget : float = 0.008 # seconds of work per pump before yielding back to Tk
+
+  def __init__(self, root : tk.Tk, interval_ms : int = 5, budget : float = 0.008, idle_interval_ms : int = 50):
+    self.root = root
+    self.commands = collections.deque()
+    self.interval_ms = interval_ms
+    self.idle_interval_ms = idle_interval_ms
+    self.next_interval_ms = interval_ms
+    self.budget = budget
+
+    self.root.after(self.interval_ms, self.pump)
+
+  def call(self, func : typing.Callable, *args, **kwargs) -> None:
+    # deque.append is atomic, so any thread can queue work for the Tk thread without a lock
+    self.commands.append(lambda: func(*args, **kwargs))
+
+  async def run(self, func : typing.Callable, *args, **kwargs) -> typing.Any:
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result : typing.Any, error : Exception) -> None:
+      if future.done():
+        return
+      if error:
+        future.set_exception(error)
+      else:
+        future.set_result(result)
+
+    def wrapper() -> None:
+      try:
+        loop.call_soon_threadsafe(resolve, func(*args, **kwargs), None)
+      except Exception as e:
+        loop.call_soon_threadsafe(resolve, None, e)
+
+    self.commands.append(wrapper)
+    return await future
+
+  def pump(self) -> None:
+    start = time.perf_counter()
+    ran = 0
+
+    while self.commands and (time.perf_counter() - start) < self.budget:
+      command = self.commands.popleft()
+      ran += 1
+      try:
+        command()
+      except Exception:
+        logging.exception("Error while running queued UI command.")
+
+    # only another thread can refill the queue and it can't touch Tk, so poll, backing off while nothing arrives
+    if ran or self.commands:
+      self.next_interval_ms = self.interval_ms
+    else:
+      self.next_interval_ms = min(self.next_interval_ms * 2, self.idle_interval_ms)
+    self.root.after(self.next_interval_ms, self.pump)
\ No newline at end of file
@@ -0,0 +1,13 @@
+import gc
+import os.path
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.realpath(os.path.abspath(__file__)))))
+
+@pytest.fixture(autouse = True)
+def collect_tk_variables():
+  yield
+  # StringVars of fake canvases must be freed here, collected on a loader thread they wait for a Tk mainloop that never runs
+  gc.collect()
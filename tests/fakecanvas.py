@@ -0,0 +1,79 @@
+import itertools
+import tkinter as tk
+
+# one interpreter for every fake canvas, Tcl aborts if the last reference to one drops on another thread
+interpreter : tk.Tk = None
+
+class FakeCanvas:
+  # stands in for tk.Canvas without a display, a bare Tcl interpreter keeps StringVar working
+  def __init__(self, width : int = 1280, height : int = 720):
+    global interpreter
+    if interpreter is None:
+      interpreter = tk.Tcl()
+    self.tcl = interpreter
+    self.tk = self.tcl.tk
+    self.width = width
+    self.height = height
+    self.ids = itertools.count(1)
+    self.items = set()
+    self.after_ids = itertools.count(1)
+    self.scheduled = {}
+    self.calls = 0 # canvas commands issued, each one is a round trip into Tcl on a real canvas
+    
+  def _root(self):
+    return self.tcl
+  
+  def create(self, *args, **kwargs) -> int:
+    self.calls += 1
+    item_id = next(self.ids)
+    self.items.add(item_id)
+    return item_id
+  
+  create_line = create_oval = create_polygon = create_rectangle = create_text = create_image = create
+  
+  def delete(self, *ids) -> None:
+    self.calls += 1
+    for item_id in ids:
+      self.items.discard(item_id)
+      
+  def after(self, ms : int, func = None, *args) -> str:
+    after_id = f"after#{next(self.after_ids)}"
+    self.scheduled[after_id] = (func, args)
+    return after_id
+  
+  def after_idle(self, func, *args) -> str:
+    return self.after(0, func, *args)
+  
+  def after_cancel(self, after_id : str) -> None:
+    self.scheduled.pop(after_id, None)
+    
+  def run_scheduled(self) -> int:
+    # runs everything scheduled so far, callbacks may schedule more for the next call
+    pending = self.scheduled
+    self.scheduled = {}
+    for func, args in pending.values():
+      func(*args)
+    return len(pending)
+  
+  def winfo_width(self) -> int:
+    return self.width
+  
+  def winfo_height(self) -> int:
+    return self.height
+  
+  def __getattr__(self, name):
+    # coords, itemconfigure, tag_raise and friends only change how things look
+    def command(*args, **kwargs) -> None:
+      self.calls += 1
+    return command
+  
+class FakePhotoImage:
+  # ImageTk.PhotoImage needs a Tk root, this keeps the rendered PIL image instead
+  def __init__(self, img):
+    self.img = img
+    
+  def width(self) -> int:
+    return self.img.width
+  
+  def height(self) -> int:
+    return self.img.height
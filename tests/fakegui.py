@@ -0,0 +1,43 @@
+from obswsgui import Default_GUI
+from obswsgui.obstypes.obs_object import OBS_Object
+from obswsgui.obstypes.outputbounds import OutputBounds
+from obswsgui.util.geometryutil import Coords
+
+from fakecanvas import FakeCanvas
+
+def make_gui(width : float = 1920.0, height : float = 1080.0) -> Default_GUI:
+  # everything but __init__, which would open a Tk root window
+  gui = Default_GUI.__new__(Default_GUI)
+  gui.canvas = FakeCanvas()
+  gui.screen = OutputBounds(gui.canvas, 'center', width, height)
+  gui.screen.set_transform(w = width, h = height)
+  gui.current_scene = "Scene"
+  gui.scenes = { "Scene": [] }
+  gui.items_by_id = {}
+  gui.selection = []
+  gui.lastpos = Coords()
+  gui.dragging = False
+  gui.events_enabled = True
+  gui.scene_dirty = False
+  gui.input_settings_cache = {}
+  gui.written_echoes = {}
+  return gui
+
+def scene_item(item_id : int, index : int, x : float, y : float = 100.0, width : float = 400.0, height : float = 400.0, kind : str = 'image_source') -> dict:
+  # one entry of a GetSceneItemList response
+  return {
+    'sceneItemId': item_id,
+    'sceneItemIndex': index,
+    'sourceName': f"source{item_id}",
+    'inputKind': kind,
+    'sceneItemTransform': {
+      'positionX': x, 'positionY': y, 'width': width, 'height': height, 'rotation': 0.0,
+      'sourceWidth': width, 'sourceHeight': height,
+      'boundsType': 'OBS_BOUNDS_NONE', 'boundsWidth': 0.0, 'boundsHeight': 0.0
+    }
+  }
+
+def center(item : OBS_Object) -> Coords:
+  # canvas coordinates of the middle of an item
+  points = [item.polygon.point(n) for n in range(4)]
+  return Coords(sum(p.x for p in points) / 4, sum(p.y for p in points) / 4)
@@ -0,0 +1,53 @@
+import math
+
+from obswsgui.util.geometryutil import Coords
+
+# the formulas geometryutil and OBS_Object.calculate_canvas_pos used before the trig and sqrt trims, kept to check the new ones against
+
+def distance(a : Coords, b : Coords) -> float:
+  return math.sqrt(math.pow(a.x - b.x, 2) + math.pow(a.y - b.y, 2))
+
+def distance_from_segment(l0 : Coords, l1 : Coords, p : Coords) -> float:
+  seglen = distance(l0, l1)
+  if seglen == 0:
+    return distance(l0, p)
+  
+  t = ((p.x - l0.x) * (l1.x - l0.x) + (p.y - l0.y) * (l1.y - l0.y)) / math.pow(seglen, 2)
+  t = max(0, min(1, t))
+  return distance(p, Coords(l0.x + t * (l1.x - l0.x), l0.y + t * (l1.y - l0.y)))
+
+def rotate(c : Coords, a : float) -> None:
+  r = math.sqrt(math.pow(c.x, 2) + math.pow(c.y, 2))
+  newangle = c.angle() + a
+  
+  c.x = r * math.cos(newangle)
+  c.y = r * math.sin(newangle)
+  
+def calculate_canvas_pos(item) -> None:
+  item.scale = item.screen.scale
+  
+  screenx = item.screen.polygon.point(0).x
+  screeny = item.screen.polygon.point(0).y
+  item.polygon.point(0).x = screenx + (item.x * item.scale)
+  item.polygon.point(0).y = screeny + (item.y * item.scale)
+  
+  item.wpx = item.width * item.scale
+  item.hpx = item.height * item.scale
+  
+  diag_length = math.sqrt(math.pow(item.wpx, 2) + math.pow(item.hpx, 2))
+  rect_angle = Coords(item.wpx, item.hpx).angle()
+  
+  item.polygon.point(1).x = item.polygon.point(0).x + item.wpx * math.cos(item.rotation)
+  item.polygon.point(1).y = item.polygon.point(0).y + item.wpx * math.sin(item.rotation)
+  
+  item.polygon.point(2).x = item.polygon.point(0).x + diag_length * math.cos(item.rotation + rect_angle)
+  item.polygon.point(2).y = item.polygon.point(0).y + diag_length * math.sin(item.rotation + rect_angle)
+  
+  item.polygon.point(3).x = item.polygon.point(0).x - item.hpx * math.cos((math.pi / 2) - item.rotation)
+  item.polygon.point(3).y = item.polygon.point(0).y + item.hpx * math.sin((math.pi / 2) - item.rotation)
+  
+  # the rotator handle position was added to the method later, here with the old rotate
+  top_middle = (item.polygon.point(0) + item.polygon.point(1)) / 2.0
+  inter_pos = Coords(0, math.copysign(item.get_rotatordist(), item.hpx))
+  rotate(inter_pos, item.rotation)
+  item.rotator_grabber_pos = top_middle - inter_pos
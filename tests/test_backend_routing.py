@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+from obswsgui import Message, backend
+
+class FakeSocket:
+  def __init__(self, name : str):
+    self.remote_address = (name, 0)
+    self.sent = []
+    
+  async def send(self, data) -> None:
+    self.sent.append(Message(data))
+    
+  def received(self, msg_type : str) -> list:
+    return [msg.id for msg in self.sent if msg.msg_type == msg_type]
+  
+@pytest.fixture(autouse = True)
+def fresh_relay():
+  for state in (backend.rooms, backend.memberships, backend.outboxes, backend.binary_conns, backend.pending_requests):
+    state.clear()
+  yield
+  for outbox in backend.outboxes.values():
+    outbox.close()
+    
+def message(msg_type : str, id : int, data : dict = None) -> str:
+  msg = Message()
+  msg.code = "room"
+  msg.id = id
+  msg.msg_type = msg_type
+  msg.has_data = True
+  msg.data = data or {}
+  return msg.encode(False)
+
+async def setup_room() -> tuple:
+  host, alice, bob = FakeSocket("host"), FakeSocket("alice"), FakeSocket("bob")
+  await backend.process_message(host, message("server_subscribe", 1))
+  await backend.process_message(alice, message("client_subscribe", 2))
+  await backend.process_message(bob, message("client_subscribe", 3))
+  return host, alice, bob
+
+async def drain() -> None:
+  # let the outbox tasks hand their frames to the sockets
+  for _ in range(3):
+    await asyncio.sleep(0)
+
+def test_response_goes_only_to_the_requester():
+  async def run():
+    host, alice, bob = await setup_room()
+    await backend.process_message(alice, message("await_request", 10, { 'requestType': "GetVersion" }))
+    assert host.received("await_request") == [10]
+    
+    await backend.process_message(host, message("await_response", 10))
+    await drain()
+    
+    assert alice.received("await_response") == [10]
+    assert bob.received("await_response") == []
+    room = backend.rooms["room"]
+    assert (room.routed_responses, room.broadcast_responses, room.frames_out) == (1, 0, 1)
+    assert not backend.pending_requests
+  asyncio.run(run())
+  
+def test_unknown_id_is_broadcast():
+  async def run():
+    host, alice, bob = await setup_room()
+    await backend.process_message(host, message("await_response", 99))
+    await drain()
+    
+    assert alice.received("await_response") == [99]
+    assert bob.received("await_response") == [99]
+    room = backend.rooms["room"]
+    assert (room.routed_responses, room.broadcast_responses, room.frames_out) == (0, 1, 2)
+  asyncio.run(run())
+  
+def test_expired_request_falls_back_to_broadcast(monkeypatch):
+  async def run():
+    host, alice, bob = await setup_room()
+    monkeypatch.setattr(backend, 'request_ttl', -1.0)
+    await backend.process_message(alice, message("await_request", 10))
+    
+    await backend.process_message(host, message("await_response", 10))
+    await drain()
+    
+    assert alice.received("await_response") == [10]
+    assert bob.received("await_response") == [10]
+    room = backend.rooms["room"]
+    assert (room.routed_responses, room.broadcast_responses, room.frames_out) == (0, 1, 2)
+  asyncio.run(run())
+  
+def test_expired_entries_are_pruned_on_the_next_request(monkeypatch):
+  async def run():
+    host, alice, bob = await setup_room()
+    monkeypatch.setattr(backend, 'request_ttl', -1.0)
+    await backend.process_message(alice, message("await_request", 10))
+    monkeypatch.setattr(backend, 'request_ttl', 30.0)
+    await backend.process_message(bob, message("await_request", 11))
+    
+    assert list(backend.pending_requests) == [("room", 11)]
+  asyncio.run(run())
+  
+def test_other_protocol_version_is_answered_in_json():
+  async def run():
+    current, future = FakeSocket("current"), FakeSocket("future")
+    await backend.process_message(current, message("server_subscribe", 1, { 'protocols': ["binary"], 'version': backend.PROTOCOL_VERSION }))
+    await backend.process_message(future, message("client_subscribe", 2, { 'protocols': ["binary"], 'version': backend.PROTOCOL_VERSION + 1 }))
+    
+    assert current.sent[-1].data['protocol'] == "binary"
+    assert future.sent[-1].data['protocol'] == "json"
+    assert current in backend.binary_conns and future not in backend.binary_conns
+  asyncio.run(run())
+  
+def batch(id : int, count : int) -> str:
+  return message("emit_batch", id, { 'requests': [{ 'requestType': "SetSceneItemTransform", 'requestData': { 'sceneItemId': n } } for n in range(count)] })
+
+def test_batching_host_receives_batches_whole():
+  async def run():
+    host, client = FakeSocket("host"), FakeSocket("client")
+    await backend.process_message(host, message("server_subscribe", 1, { 'emit_batch': True }))
+    await backend.process_message(client, message("client_subscribe", 2))
+    assert client.sent[-1].data['emit_batch'] is True
+    
+    await backend.process_message(client, batch(10, 3))
+    assert [msg.msg_type for msg in host.sent[1:]] == ["emit_batch"]
+  asyncio.run(run())
+  
+def test_older_host_gets_batches_as_single_requests():
+  async def run():
+    host, client, _ = await setup_room()
+    assert 'emit_batch' not in client.sent[-1].data
+    
+    await backend.process_message(client, batch(10, 3))
+    forwarded = host.sent[1:]
+    assert [msg.msg_type for msg in forwarded] == ["emit_request"] * 3
+    assert [msg.data['requestData']['sceneItemId'] for msg in forwarded] == [0, 1, 2]
+    assert client.received("status_response")[-1] == 10
+  asyncio.run(run())
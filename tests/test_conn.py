@@ -0,0 +1,106 @@
+import asyncio
+import threading
+import time
+
+import simpleobsws
+
+from obswsgui.networking.conn import Connection
+
+def test_wait_for_requests_times_out_when_idle():
+  conn = Connection(None)
+  
+  async def wait() -> bool:
+    return await conn.wait_for_requests(0.05)
+  assert asyncio.run(wait()) is False
+  
+def test_request_from_another_thread_wakes_waiter():
+  conn = Connection(None)
+  
+  async def wait() -> float:
+    start = time.perf_counter()
+    # queued from a Tk-like thread while the network loop is already waiting
+    timer = threading.Timer(0.05, conn.queue_request, (simpleobsws.Request('GetVersion'),))
+    timer.start()
+    assert await conn.wait_for_requests(5.0)
+    return time.perf_counter() - start
+  
+  assert asyncio.run(wait()) < 1.0
+  assert [req.requestType for req in conn.take_requests()] == ['GetVersion']
+  
+def test_request_queued_before_waiting_is_not_missed():
+  conn = Connection(None)
+  conn.queue_request(simpleobsws.Request('GetVersion'))
+  
+  async def wait() -> bool:
+    return await conn.wait_for_requests(5.0)
+  assert asyncio.run(wait()) is True
+  
+def transform(item_id : int, **fields) -> simpleobsws.Request:
+  return simpleobsws.Request('SetSceneItemTransform', { 'sceneName': "Scene", 'sceneItemId': item_id, 'sceneItemTransform': fields })
+  
+def input_settings(name : str, **fields) -> simpleobsws.Request:
+  return simpleobsws.Request('SetInputSettings', { 'inputName': name, 'inputSettings': fields })
+  
+def test_request_key_uses_the_target_fields():
+  conn = Connection(None)
+  
+  assert conn.request_key(transform(3)) == ('SetSceneItemTransform', "Scene", 3)
+  assert conn.request_key(input_settings("Text")) == ('SetInputSettings', "Text")
+  assert conn.request_key(simpleobsws.Request('RemoveInput', { 'inputName': "Text" })) is None
+  assert conn.request_key(simpleobsws.Request('SetInputSettings')) is None
+  
+def test_same_target_is_merged():
+  conn = Connection(None)
+  conn.queue_request(transform(1, positionX = 1.0, positionY = 2.0))
+  conn.queue_request(transform(1, positionX = 5.0, rotation = 90.0))
+  
+  reqs = conn.take_requests()
+  assert len(reqs) == 1
+  assert reqs[0].requestData == { 'sceneName': "Scene", 'sceneItemId': 1, 'sceneItemTransform': { 'positionX': 5.0, 'positionY': 2.0, 'rotation': 90.0 } }
+  
+def test_different_targets_are_kept():
+  conn = Connection(None)
+  conn.queue_request(transform(1, positionX = 1.0))
+  conn.queue_request(transform(2, positionX = 2.0))
+  conn.queue_request(input_settings("Text", text = "a"))
+  conn.queue_request(input_settings("Other", text = "b"))
+  
+  reqs = conn.take_requests()
+  assert [req.requestData.get('sceneItemId', req.requestData.get('inputName')) for req in reqs] == [1, 2, "Text", "Other"]
+  assert conn.last_flush_coalesced == 0
+  
+def test_interleaved_request_for_the_target_keeps_order():
+  conn = Connection(None)
+  conn.queue_request(input_settings("Text", text = "a"))
+  conn.queue_request(simpleobsws.Request('SetInputName', { 'inputName': "Text", 'newInputName': "Title" }))
+  conn.queue_request(input_settings("Text", text = "b"))
+  conn.queue_request(input_settings("Text", color = 1))
+  
+  reqs = conn.take_requests()
+  assert [req.requestType for req in reqs] == ['SetInputSettings', 'SetInputName', 'SetInputSettings']
+  assert reqs[0].requestData['inputSettings'] == { 'text': "a" }
+  assert reqs[2].requestData['inputSettings'] == { 'text': "b", 'color': 1 }
+  
+def test_unrelated_request_in_between_still_merges():
+  conn = Connection(None)
+  conn.queue_request(transform(1, positionX = 1.0))
+  conn.queue_request(simpleobsws.Request('SetSceneItemEnabled', { 'sceneName': "Scene", 'sceneItemId': 2, 'sceneItemEnabled': False }))
+  conn.queue_request(transform(1, positionX = 2.0))
+  
+  reqs = conn.take_requests()
+  assert [req.requestType for req in reqs] == ['SetSceneItemTransform', 'SetSceneItemEnabled']
+  assert reqs[0].requestData['sceneItemTransform'] == { 'positionX': 2.0 }
+  
+def test_coalesced_counters():
+  conn = Connection(None)
+  for x in range(4):
+    conn.queue_request(transform(1, positionX = float(x)))
+  assert conn.coalesced_count == 3
+  
+  conn.take_requests()
+  assert (conn.coalesced_count, conn.last_flush_coalesced, conn.total_coalesced) == (0, 3, 3)
+  
+  conn.queue_request(transform(1))
+  conn.queue_request(transform(1))
+  conn.take_requests()
+  assert (conn.last_flush_coalesced, conn.total_coalesced) == (1, 4)
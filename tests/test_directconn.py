@@ -0,0 +1,64 @@
+import asyncio
+
+import simpleobsws
+from websockets import exceptions as wsexceptions
+
+from obswsgui import DirectConnection
+
+class FakeOBS:
+  def __init__(self, error : Exception = None, results : list = None):
+    self.error = error
+    self.results = results or []
+    self.batches = []
+    
+  async def call_batch(self, reqs, halt_on_failure = None, execution_type = None):
+    self.batches.append(reqs)
+    if self.error:
+      raise self.error
+    return [simpleobsws.RequestResponse(req.requestType, simpleobsws.RequestStatus(ok, 100 if ok else 600)) for req, ok in zip(reqs, self.results)]
+  
+  async def call(self, req):
+    if self.error:
+      raise self.error
+    return simpleobsws.RequestResponse(req.requestType, simpleobsws.RequestStatus(True, 100))
+
+def make_conn(obs : FakeOBS, errors : list) -> DirectConnection:
+  conn = DirectConnection("ws://obs", "", errors.append)
+  conn.obsws = obs
+  conn.connected = True
+  return conn
+
+def queue(conn : DirectConnection, count : int) -> None:
+  for i in range(count):
+    conn.queue_request(simpleobsws.Request("SetSceneItemTransform", { 'sceneName': "Scene", 'sceneItemId': i, 'sceneItemTransform': {} }))
+
+def test_queue_is_flushed_as_one_batch_and_failures_reported():
+  errors = []
+  obs = FakeOBS(results = [True, False, True])
+  conn = make_conn(obs, errors)
+  queue(conn, 3)
+  
+  asyncio.run(conn.update())
+  
+  assert [len(batch) for batch in obs.batches] == [3]
+  assert [resp.requestStatus.code for resp in errors] == [600]
+  assert conn.connected
+
+def test_lost_connection_during_flush_reports_disconnect():
+  for error in (simpleobsws.NotIdentifiedError("not identified"), wsexceptions.ConnectionClosed(None, None)):
+    conn = make_conn(FakeOBS(error = error), [])
+    queue(conn, 2)
+    
+    asyncio.run(conn.update())
+    assert not conn.connected
+    
+    conn.connected = True
+    assert asyncio.run(conn.request(simpleobsws.Request("GetVersion"))) is None
+    assert not conn.connected
+
+def test_timeout_keeps_the_connection():
+  conn = make_conn(FakeOBS(error = simpleobsws.MessageTimeout("slow")), [])
+  queue(conn, 2)
+  
+  asyncio.run(conn.update())
+  assert conn.connected
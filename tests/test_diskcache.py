@@ -0,0 +1,86 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from obswsgui.obstypes import imageinput
+from obswsgui.util.diskcache import DiskCache
+
+class CountingHandler(BaseHTTPRequestHandler):
+  body = b"image bytes"
+  etag = '"v1"'
+  cache_control = None
+  requests = []
+  
+  def do_GET(self) -> None:
+    CountingHandler.requests.append(self.headers.get('If-None-Match'))
+    if self.headers.get('If-None-Match') == self.etag:
+      self.send_response(304)
+    else:
+      self.send_response(200)
+      self.send_header('Content-Length', str(len(self.body)))
+    self.send_header('ETag', self.etag)
+    if self.cache_control:
+      self.send_header('Cache-Control', self.cache_control)
+    self.end_headers()
+    if self.headers.get('If-None-Match') != self.etag:
+      self.wfile.write(self.body)
+      
+  def log_message(self, *args) -> None:
+    pass
+
+@pytest.fixture
+def server():
+  CountingHandler.requests = []
+  CountingHandler.cache_control = None
+  httpd = ThreadingHTTPServer(('127.0.0.1', 0), CountingHandler)
+  thread = threading.Thread(target = httpd.serve_forever, daemon = True)
+  thread.start()
+  yield f"http://127.0.0.1:{httpd.server_address[1]}/img.png"
+  httpd.shutdown()
+  httpd.server_close()
+  
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+  cache = DiskCache(tmp_path / "cache", 1024 * 1024)
+  monkeypatch.setattr(imageinput, 'download_cache', cache)
+  return cache
+
+def test_reads_batch_index_writes(cache, monkeypatch):
+  cache.store("a", b"abc", { 'etag': "x" })
+  
+  saves = []
+  save_index = cache.save_index
+  monkeypatch.setattr(cache, 'save_index', lambda: (saves.append(1), save_index()))
+  for _ in range(100):
+    assert cache.read("a") == b"abc"
+  assert saves == []
+  
+  cache.flush()
+  cache.flush()
+  assert len(saves) == 1
+  
+  reopened = DiskCache(cache.directory, cache.max_bytes)
+  assert reopened.lookup("a")['atime'] == cache.index["a"]['atime']
+  
+def test_fresh_download_skips_the_server(cache, server):
+  assert imageinput.download(server) == b"image bytes"
+  assert imageinput.download(server) == b"image bytes"
+  assert CountingHandler.requests == [None]
+  
+def test_max_age_from_server_is_honored(cache, server):
+  CountingHandler.cache_control = "public, max-age=0"
+  assert imageinput.download(server) == b"image bytes"
+  assert imageinput.download(server) == b"image bytes"
+  # stale straight away, so the second load revalidates and gets a 304
+  assert CountingHandler.requests == [None, '"v1"']
+  
+def test_stale_entry_is_revalidated(cache, server, monkeypatch):
+  imageinput.download(server)
+  monkeypatch.setattr(imageinput, 'default_max_age', 0.0)
+  cache.index[server]['fetched'] -= 301.0
+  
+  assert imageinput.download(server) == b"image bytes"
+  assert CountingHandler.requests == [None, '"v1"']
+  # the 304 started a new freshness window with the current default
+  assert cache.index[server]['max_age'] == 0.0
@@ -0,0 +1,46 @@
+import time
+import types
+
+from fakegui import make_gui
+
+def make_ticking_gui():
+  gui = make_gui()
+  gui.root = gui.canvas
+  gui.last_interaction = 0.0
+  gui.framerate = gui.idle_framerate
+  gui.frame_after_id = gui.root.after(200, gui.frame_tick)
+  return gui
+  
+def test_idle_gui_backs_off():
+  gui = make_ticking_gui()
+  assert gui.choose_framerate() == gui.idle_framerate
+  
+  gui.last_interaction = time.time() - gui.active_linger - 1.0
+  assert gui.choose_framerate() == gui.idle_framerate
+  
+  # a running timer only needs its once a second text change
+  gui.scenes["Scene"] = [types.SimpleNamespace(is_ticking = lambda: True)]
+  assert gui.choose_framerate() == gui.ticking_framerate
+  
+  gui.dragging = True
+  assert gui.choose_framerate() == gui.active_framerate
+  
+def test_interaction_raises_the_rate_at_once():
+  gui = make_ticking_gui()
+  idle_tick = gui.frame_after_id
+  
+  gui.note_interaction()
+  
+  assert gui.choose_framerate() == gui.active_framerate
+  assert gui.framerate == gui.active_framerate
+  # the idle-length wait is replaced by an immediate tick
+  assert idle_tick not in gui.root.scheduled
+  assert gui.frame_after_id in gui.root.scheduled
+  
+def test_interaction_while_active_keeps_the_pending_tick():
+  gui = make_ticking_gui()
+  gui.framerate = gui.active_framerate
+  tick = gui.frame_after_id
+  
+  gui.note_interaction()
+  assert gui.frame_after_id == tick
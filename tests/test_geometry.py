@@ -0,0 +1,58 @@
+import math
+import random
+
+import pytest
+
+from obswsgui.obstypes.obs_object import OBS_Object
+from obswsgui.util.geometryutil import Coords, distance_from_segment, distance_sq_from_segment
+
+import geometryref
+from fakegui import make_gui
+
+def random_coords(rng : random.Random) -> Coords:
+  return Coords(rng.uniform(-500, 500), rng.uniform(-500, 500))
+  
+def test_segment_distance_matches_the_old_formula():
+  rng = random.Random(1)
+  for _ in range(5000):
+    l0, l1, p = random_coords(rng), random_coords(rng), random_coords(rng)
+    old = geometryref.distance_from_segment(l0, l1, p)
+    
+    assert distance_from_segment(l0, l1, p) == pytest.approx(old, rel = 1e-9, abs = 1e-9)
+    assert distance_sq_from_segment(l0, l1, p) == pytest.approx(old * old, rel = 1e-9, abs = 1e-9)
+    
+def test_segment_distance_edge_cases():
+  l0, l1 = Coords(0, 0), Coords(10, 0)
+  # past either end the distance is to the endpoint
+  for p in (Coords(-3, 4), Coords(13, 4), Coords(5, 4), Coords(5, 0)):
+    assert distance_sq_from_segment(l0, l1, p) == pytest.approx(geometryref.distance_from_segment(l0, l1, p) ** 2)
+    
+  # a zero length segment is a point
+  assert distance_sq_from_segment(Coords(2, 2), Coords(2, 2), Coords(5, 6)) == 25.0
+  assert geometryref.distance_from_segment(Coords(2, 2), Coords(2, 2), Coords(5, 6)) == 5.0
+  
+def test_rotate_matches_the_old_formula():
+  rng = random.Random(2)
+  for _ in range(1000):
+    c = random_coords(rng)
+    a = rng.uniform(-2 * math.pi, 2 * math.pi)
+    old = Coords(c.x, c.y)
+    geometryref.rotate(old, a)
+    c.rotate(a)
+    
+    assert (c.x, c.y) == pytest.approx((old.x, old.y), abs = 1e-9)
+    
+def test_item_corners_match_the_old_formula():
+  gui = make_gui()
+  rng = random.Random(3)
+  for _ in range(200):
+    x, y, w, h = rng.uniform(0, 1800), rng.uniform(0, 1000), rng.uniform(1, 600), rng.uniform(1, 600)
+    rotation = rng.uniform(0, 2 * math.pi)
+    item = OBS_Object(1, 0, gui.canvas, gui.screen, x, y, w, h, rotation, w, h, 'OBS_BOUNDS_NONE', "item")
+    
+    new = [(point.x, point.y) for point in item.polygon.points() + [item.rotator_grabber_pos]]
+    
+    geometryref.calculate_canvas_pos(item)
+    old = [(point.x, point.y) for point in item.polygon.points() + [item.rotator_grabber_pos]]
+    for n in range(5):
+      assert new[n] == pytest.approx(old[n], abs = 1e-9)
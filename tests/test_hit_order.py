@@ -0,0 +1,28 @@
+from obswsgui import Default_GUI
+from obswsgui.obstypes.obs_object import ModifyType, OBS_Object
+from obswsgui.util.geometryutil import Coords
+
+from fakegui import center, make_gui, scene_item
+
+def hit_ids(gui : Default_GUI, coords : Coords) -> list:
+  return [item.scene_item_id for item, mode in gui.get_items_under_mouse(coords) if mode != ModifyType.NONE]
+
+def test_hits_follow_obs_stacking_order():
+  gui = make_gui()
+  # three overlapping items, OBS lists the bottom one first
+  gui.apply_scene_items([scene_item(1, 0, 100.0), scene_item(2, 1, 150.0), scene_item(3, 2, 200.0)], {})
+  coords = center(gui.items_by_id[2])
+  assert hit_ids(gui, coords) == [3, 2, 1]
+  
+  # OBS moved the bottom item to the top
+  gui.apply_scene_items([scene_item(2, 0, 150.0), scene_item(3, 1, 200.0), scene_item(1, 2, 100.0)], {})
+  assert hit_ids(gui, coords) == [1, 3, 2]
+
+def test_locally_added_item_is_hit_last():
+  gui = make_gui()
+  gui.apply_scene_items([scene_item(1, 0, 100.0), scene_item(2, 1, 150.0)], {})
+  coords = center(gui.items_by_id[2])
+  
+  item = OBS_Object(-1, -1, gui.canvas, gui.screen, 120.0, 100.0, 400.0, 400.0, 0.0, 400.0, 400.0, 'OBS_BOUNDS_NONE', "new")
+  gui.add_scene_item(item)
+  assert [i.scene_item_id for i, _ in gui.get_items_under_mouse(coords)] == [2, 1, -1]
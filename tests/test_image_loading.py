@@ -0,0 +1,103 @@
+import io
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+from obswsgui.obstypes import imageinput
+from obswsgui.obstypes.imageinput import ImageInput
+from obswsgui.obstypes.outputbounds import OutputBounds
+from obswsgui.util.diskcache import DiskCache
+
+from fakecanvas import FakeCanvas
+
+delay : float = 0.3 # seconds the server stalls before answering
+
+def png_bytes(width : int, height : int) -> bytes:
+  buf = io.BytesIO()
+  Image.new('RGB', (width, height), (200, 40, 40)).save(buf, 'PNG')
+  return buf.getvalue()
+
+class SlowHandler(BaseHTTPRequestHandler):
+  body = png_bytes(256, 128)
+  
+  def do_GET(self) -> None:
+    time.sleep(delay)
+    self.send_response(200)
+    self.send_header('Content-Type', 'image/png')
+    self.send_header('Content-Length', str(len(self.body)))
+    self.end_headers()
+    self.wfile.write(self.body)
+    
+  def log_message(self, *args) -> None:
+    pass
+
+@pytest.fixture
+def server():
+  httpd = ThreadingHTTPServer(('127.0.0.1', 0), SlowHandler)
+  thread = threading.Thread(target = httpd.serve_forever, daemon = True)
+  thread.start()
+  yield f"http://127.0.0.1:{httpd.server_address[1]}"
+  httpd.shutdown()
+  httpd.server_close()
+  
+@pytest.fixture(autouse = True)
+def isolated_cache(tmp_path, monkeypatch):
+  monkeypatch.setattr(imageinput, 'download_cache', DiskCache(tmp_path / "cache", 1024 * 1024))
+  # PhotoImages need a Tk root, the load path only has to reach the render call
+  monkeypatch.setattr(ImageInput, 'render', lambda self, *args, **kwargs: "rendered")
+  
+def make_item() -> ImageInput:
+  canvas = FakeCanvas()
+  screen = OutputBounds(canvas, 'center', 1920.0, 1080.0)
+  screen.set_transform(w = 1920.0, h = 1080.0)
+  return ImageInput(1, 0, canvas, screen, 100.0, 100.0, 256.0, 128.0, 0.0, 256.0, 128.0, 'OBS_BOUNDS_NONE', "image")
+
+def pump_until(canvas : FakeCanvas, done, timeout : float = 5.0) -> None:
+  end = time.perf_counter() + timeout
+  while not done() and time.perf_counter() < end:
+    canvas.run_scheduled()
+    time.sleep(imageinput.load_poll_ms / 1000.0)
+
+def test_fetch_image_from_slow_server(server):
+  levels = imageinput.fetch_image(f"{server}/a.png")
+  assert levels[0].size == (256, 128) and levels[0].mode == 'RGBA'
+  assert levels[-1].size == (64, 32)
+
+def test_slow_load_polls_until_done(server):
+  item = make_item()
+  item.set_url(f"{server}/a.png", False)
+  assert item.pending_load and item.poll_after_id
+  
+  pump_until(item.canvas, lambda: item.mip_levels is not None)
+  assert item.mip_levels[0].size == (256, 128)
+  assert item.pending_load is None and item.poll_after_id is None
+  assert item.tk_img == "rendered"
+  assert not item.canvas.scheduled
+  
+def test_removing_item_cancels_the_poll(server):
+  item = make_item()
+  item.set_url(f"{server}/a.png", False)
+  load = item.pending_load
+  
+  item.remove_from_canvas()
+  assert item.pending_load is None and item.poll_after_id is None
+  assert not item.canvas.scheduled
+  
+  # the download finishing afterwards must not touch the canvas again
+  time.sleep(delay + 0.2)
+  assert load.done() or load.cancelled()
+  assert item.canvas.run_scheduled() == 0
+  assert item.mip_levels is None
+  
+def test_readding_item_restarts_the_load(server):
+  item = make_item()
+  item.set_url(f"{server}/a.png", False)
+  item.remove_from_canvas()
+  
+  item.add_to_canvas()
+  assert item.pending_load is not None
+  pump_until(item.canvas, lambda: item.mip_levels is not None)
+  assert item.mip_levels[0].size == (256, 128)
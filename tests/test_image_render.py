@@ -0,0 +1,91 @@
+import types
+
+import pytest
+from PIL import Image
+
+from obswsgui.obstypes import imageinput
+from obswsgui.obstypes.imageinput import ImageInput, build_mip_levels
+from obswsgui.obstypes.outputbounds import OutputBounds
+from obswsgui.util.lrucache import LRUCache
+
+from fakecanvas import FakeCanvas, FakePhotoImage
+
+@pytest.fixture(autouse = True)
+def fake_tk_images(monkeypatch):
+  monkeypatch.setattr(imageinput, 'ImageTk', types.SimpleNamespace(PhotoImage = FakePhotoImage))
+  monkeypatch.setattr(imageinput, 'render_cache', LRUCache(64 * 1024 * 1024, lambda img: img.width() * img.height() * 4))
+  
+def make_item(width : int = 512, height : int = 256) -> ImageInput:
+  canvas = FakeCanvas()
+  screen = OutputBounds(canvas, 'center', 1920.0, 1080.0)
+  screen.set_transform(w = 1920.0, h = 1080.0)
+  item = ImageInput(1, 0, canvas, screen, 100.0, 100.0, float(width), float(height), 0.0, float(width), float(height), 'OBS_BOUNDS_NONE', "image")
+  item.img_url = "http://example/image.png"
+  item.mip_levels = build_mip_levels(Image.new('RGB', (width, height), (200, 40, 40)))
+  return item
+
+def test_mip_levels_halve_down_to_the_minimum():
+  item = make_item(512, 256)
+  assert [level.size for level in item.mip_levels] == [(512, 256), (256, 128), (128, 64), (64, 32)]
+  assert all(level.mode == 'RGBA' for level in item.mip_levels)
+  
+def test_mip_for_picks_the_smallest_level_covering_the_target():
+  item = make_item(512, 256)
+  
+  assert item.mip_for(128, 64).size == (128, 64)
+  assert item.mip_for(129, 64).size == (256, 128)
+  assert item.mip_for(100, 100).size == (256, 128)
+  assert item.mip_for(10, 10).size == (64, 32)
+  # bigger than the source, the source is upscaled
+  assert item.mip_for(1000, 500).size == (512, 256)
+  
+def test_render_cache_keys_on_every_parameter():
+  item = make_item()
+  
+  first = item.render(200, 100, False, False, 0.0)
+  assert item.render(200, 100, False, False, 0.0) is first
+  
+  variants = [
+    item.render(200, 100, True, False, 0.0),
+    item.render(200, 100, False, True, 0.0),
+    item.render(200, 100, False, False, 90.0),
+    item.render(200, 100, False, False, 0.0, preview = True),
+    item.render(201, 100, False, False, 0.0)
+  ]
+  assert len({id(img) for img in [first] + variants}) == 6
+  assert len(imageinput.render_cache.entries) == 6
+  
+  # rotations expand the canvas, everything else renders at the target size
+  assert (variants[2].width(), variants[2].height()) == (100, 200)
+  assert (variants[3].width(), variants[3].height()) == (200, 100)
+  
+def test_flips_mirror_the_pixels():
+  item = make_item(64, 64)
+  item.mip_levels = build_mip_levels(Image.new('RGB', (64, 64), (0, 0, 0)))
+  item.mip_levels[0].putpixel((0, 0), (255, 255, 255, 255))
+  
+  assert item.render(64, 64, True, False, 0.0).img.getpixel((63, 0)) == (255, 255, 255, 255)
+  assert item.render(64, 64, False, True, 0.0).img.getpixel((0, 63)) == (255, 255, 255, 255)
+  
+def test_release_rerenders_previews_at_full_quality():
+  item = make_item()
+  screen = item.screen
+  item.canvas.run_scheduled()
+  
+  # a resize and rotation while the mouse is held draws a preview with the coarse angle step
+  screen.set_interacting(True)
+  item.set_transform(100.0, 100.0, 300.0, 150.0, 0.3)
+  item.canvas.run_scheduled()
+  assert screen.previewed_items == [item]
+  preview_key = (item.img_url, 300, 150, False, False, -15.0, True)
+  assert item.tk_img is imageinput.render_cache.entries[preview_key][0]
+  
+  screen.set_interacting(False)
+  assert screen.previewed_items == []
+  assert item.drawn_shape is None
+  
+  # the queued redraw renders the same shape again, this time in full
+  item.canvas.run_scheduled()
+  full_key = (item.img_url, 300, 150, False, False, -17.0, False)
+  assert item.tk_img is imageinput.render_cache.entries[full_key][0]
+  assert screen.previewed_items == []
@@ -0,0 +1,54 @@
+from obswsgui.util.lrucache import LRUCache
+
+def test_byte_cap_evicts_least_recently_used():
+  cache = LRUCache(100, len)
+  cache.put("a", b"x" * 40)
+  cache.put("b", b"x" * 40)
+  assert cache.get("a") is not None
+  
+  # "b" is now the oldest use, adding 40 more bytes goes over the cap
+  cache.put("c", b"x" * 40)
+  assert list(cache.entries) == ["a", "c"]
+  assert cache.size == 80
+  
+def test_eviction_frees_as_many_entries_as_needed():
+  cache = LRUCache(100, len)
+  for key in "abcd":
+    cache.put(key, b"x" * 25)
+    
+  cache.put("e", b"x" * 60)
+  assert list(cache.entries) == ["d", "e"]
+  assert cache.size == 85
+  
+def test_replacing_a_key_updates_its_size():
+  cache = LRUCache(100, len)
+  cache.put("a", b"x" * 30)
+  cache.put("b", b"x" * 30)
+  cache.put("a", b"x" * 60)
+  
+  assert list(cache.entries) == ["b", "a"]
+  assert cache.size == 90
+  
+def test_oversized_entry_is_kept_alone():
+  cache = LRUCache(100, len)
+  cache.put("a", b"x" * 10)
+  cache.put("big", b"x" * 150)
+  
+  assert list(cache.entries) == ["big"]
+  assert cache.size == 150
+  
+def test_counters_discard_and_clear():
+  cache = LRUCache(100, len)
+  cache.put("a", b"x" * 10)
+  
+  assert cache.get("a") == b"x" * 10
+  assert cache.get("missing") is None
+  assert (cache.hits, cache.misses) == (1, 1)
+  
+  cache.discard("a")
+  cache.discard("missing")
+  assert cache.size == 0 and not cache.entries
+  
+  cache.put("b", b"x" * 10)
+  cache.clear()
+  assert cache.size == 0 and not cache.entries
@@ -0,0 +1,41 @@
+import pytest
+
+from obswsgui import Message
+
+def make(code : str, id : int = 12345, data : dict = None) -> Message:
+  msg = Message()
+  msg.code = code
+  msg.id = id
+  msg.msg_type = "await_request"
+  msg.has_data = data is not None
+  msg.data = data if data is not None else {}
+  return msg
+
+def test_binary_round_trip():
+  msg = make("room", 2 ** 127 + 5, { 'requestType': "GetSceneItemList" })
+  decoded = Message(msg.encode(True))
+  
+  assert isinstance(msg.encode(True), bytes)
+  assert (decoded.code, decoded.id, decoded.msg_type, decoded.data) == ("room", 2 ** 127 + 5, "await_request", { 'requestType': "GetSceneItemList" })
+
+def test_long_room_code_falls_back_to_json():
+  msg = make("x" * 300)
+  
+  with pytest.raises(ValueError):
+    msg.to_bytes()
+    
+  encoded = msg.encode(True)
+  assert isinstance(encoded, str)
+  assert Message(encoded).code == "x" * 300
+  
+def test_oversized_id_falls_back_to_json():
+  msg = make("room", 2 ** 130)
+  assert Message(msg.encode(True)).id == 2 ** 130
+  
+def test_peek_reads_routing_fields_without_payload():
+  msg = make("room", 77, { 'sceneItems': list(range(100)) })
+  
+  for binary in (True, False):
+    peeked = Message.peek(msg.encode(binary))
+    assert (peeked.code, peeked.id, peeked.msg_type) == ("room", 77, "await_request")
+    assert peeked.encode(binary) is peeked.raw
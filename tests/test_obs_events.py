@@ -0,0 +1,125 @@
+import asyncio
+
+import simpleobsws
+
+from obswsgui import Default_GUI
+
+import fakegui
+
+class RecordingQueue:
+  def __init__(self):
+    self.calls = []
+    
+  def call(self, func, *args) -> None:
+    self.calls.append((func.__name__, args))
+    
+  async def run(self, func, *args) -> None:
+    self.call(func, *args)
+
+class SceneConnection:
+  # answers the requests get_scene_state makes for an empty scene
+  responses = {
+    'GetCurrentProgramScene': { 'currentProgramSceneName': "Scene" },
+    'GetVideoSettings': { 'baseWidth': 1280, 'baseHeight': 720 },
+    'GetSceneItemList': { 'sceneItems': [] }
+  }
+  
+  def __init__(self):
+    self.requests = []
+    
+  async def request(self, req : simpleobsws.Request) -> simpleobsws.RequestResponse:
+    self.requests.append(req.requestType)
+    return simpleobsws.RequestResponse(req.requestType, simpleobsws.RequestStatus(True, 100), self.responses[req.requestType])
+
+class FakeItem:
+  def __init__(self, item_id : int, name : str):
+    self.scene_item_id = item_id
+    self.source_name = name
+
+def make_gui() -> Default_GUI:
+  gui = fakegui.make_gui()
+  gui.ui_queue = RecordingQueue()
+  gui.item = FakeItem(5, "Logo")
+  gui.scenes = { "Scene": [gui.item] }
+  gui.items_by_id = { 5: gui.item }
+  return gui
+
+def transform_event(x : float) -> dict:
+  return { 'sceneName': "Scene", 'sceneItemId': 5, 'sceneItemTransform': { 'positionX': x } }
+
+def write_transform(gui : Default_GUI, x : float) -> None:
+  gui.note_written_requests([simpleobsws.Request('SetSceneItemTransform', { 'sceneName': "Scene", 'sceneItemId': 5, 'sceneItemTransform': { 'positionX': x } })])
+
+def test_echo_of_our_own_transform_is_dropped():
+  gui = make_gui()
+  write_transform(gui, 10.0)
+  write_transform(gui, 20.0)
+  
+  # both echoes arrive after the local state moved on, neither may snap the item back
+  asyncio.run(gui.on_obs_event('SceneItemTransformChanged', transform_event(10.0)))
+  asyncio.run(gui.on_obs_event('SceneItemTransformChanged', transform_event(20.0)))
+  assert gui.ui_queue.calls == []
+  
+  asyncio.run(gui.on_obs_event('SceneItemTransformChanged', transform_event(30.0)))
+  assert [name for name, _ in gui.ui_queue.calls] == ['apply_transform']
+  
+def test_stale_echo_entries_expire():
+  gui = make_gui()
+  write_transform(gui, 10.0)
+  gui.written_echoes[('transform', "Scene", 5)][0] -= gui.echo_window + 1.0
+  
+  asyncio.run(gui.on_obs_event('SceneItemTransformChanged', transform_event(30.0)))
+  assert len(gui.ui_queue.calls) == 1
+  assert not gui.written_echoes
+  
+def test_remote_transforms_skip_the_item_being_dragged():
+  gui = make_gui()
+  gui.selection = [gui.item]
+  gui.dragging = True
+  
+  asyncio.run(gui.on_obs_event('SceneItemTransformChanged', transform_event(30.0)))
+  assert gui.ui_queue.calls == []
+
+def test_input_settings_event_updates_only_that_input():
+  gui = make_gui()
+  
+  asyncio.run(gui.on_obs_event('InputSettingsChanged', { 'inputName': "Logo", 'inputSettings': { 'file': "http://example/a.png" } }))
+  
+  assert gui.input_settings_cache == { "Logo": { 'file': "http://example/a.png" } }
+  assert gui.ui_queue.calls == [('apply_input_settings', ("Logo", { 'file': "http://example/a.png" }))]
+  assert not gui.scene_dirty
+  
+def test_input_settings_echo_refreshes_cache_without_reapplying():
+  gui = make_gui()
+  gui.note_written_requests([simpleobsws.Request('SetInputSettings', { 'inputName': "Clock", 'inputSettings': { 'text': "00:59" } })])
+  
+  asyncio.run(gui.on_obs_event('InputSettingsChanged', { 'inputName': "Clock", 'inputSettings': { 'text': "00:59" } }))
+  
+  assert gui.input_settings_cache["Clock"] == { 'text': "00:59" }
+  assert gui.ui_queue.calls == []
+  assert not gui.scene_dirty
+  
+def test_profile_change_rereads_video_settings():
+  gui = make_gui()
+  gui.connection = SceneConnection()
+  gui.video_settings_dirty = False
+  
+  asyncio.run(gui.on_obs_event('CurrentSceneCollectionChanged', { 'sceneCollectionName': "Other" }))
+  assert gui.scene_dirty and not gui.video_settings_dirty
+  asyncio.run(gui.get_scene_state())
+  assert 'GetVideoSettings' not in gui.connection.requests
+  
+  asyncio.run(gui.on_obs_event('CurrentProfileChanged', { 'profileName': "Other" }))
+  assert gui.scene_dirty and gui.video_settings_dirty
+  asyncio.run(gui.get_scene_state())
+  assert gui.connection.requests.count('GetVideoSettings') == 1
+  assert ('set_output_size', (1280, 720)) in gui.ui_queue.calls
+  assert not gui.video_settings_dirty
+  
+def test_reconcile_rereads_video_settings():
+  gui = make_gui()
+  gui.video_settings_dirty = False
+  gui.last_reconcile = 0.0
+  
+  assert gui.scene_needs_sync()
+  assert gui.video_settings_dirty
@@ -0,0 +1,175 @@
+import asyncio
+import gc
+import types
+
+import simpleobsws
+
+from obswsgui import Message, ProxiedClientConnection, ProxiedServerConnection
+from obswsgui.networking import proxiedconn
+
+class FakeRelay:
+  # answers every frame with a status response, awaited requests are answered once release() is called
+  def __init__(self, status : bool = True):
+    self.status = status
+    self.incoming = asyncio.Queue()
+    self.awaited = []
+    self.broken = False
+    
+  async def send(self, data) -> None:
+    if self.broken:
+      raise ConnectionError("Connection lost.")
+    
+    msg = Message(data)
+    if self.status:
+      self.reply(msg, "status_response", { 'status_code': 200, 'message': "ok" })
+    if msg.msg_type == "await_request":
+      self.awaited.append(msg)
+      
+  def reply(self, msg : Message, msg_type : str, data : dict) -> None:
+    reply = Message()
+    reply.code = msg.code
+    reply.id = msg.id
+    reply.msg_type = msg_type
+    reply.has_data = True
+    reply.data = data
+    self.incoming.put_nowait(reply.to_data())
+    
+  def release(self, msg : Message) -> None:
+    self.reply(msg, "await_response", {
+      'requestType': msg.data['requestType'],
+      'requestStatus': { 'result': True, 'code': 100, 'comment': None },
+      'responseData': { 'echo': msg.data['requestData']['n'] }
+    })
+    
+  def close(self) -> None:
+    self.incoming.put_nowait(None)
+    
+  def __aiter__(self):
+    return self
+  
+  async def __anext__(self):
+    data = await self.incoming.get()
+    if data is None:
+      raise StopAsyncIteration
+    return data
+
+async def open_conn(monkeypatch, relay : FakeRelay, timeout : float = 1.0) -> ProxiedClientConnection:
+  async def connect(url):
+    return relay
+  monkeypatch.setattr(proxiedconn, "client", types.SimpleNamespace(connect = connect))
+  
+  conn = ProxiedClientConnection("ws://relay", "room", lambda resp: None)
+  conn.timeout = timeout
+  await conn.open_proxy(conn.url)
+  conn.connected = True
+  return conn
+
+def request(n : int) -> simpleobsws.Request:
+  return simpleobsws.Request("GetInputSettings", { 'n': n })
+
+def collect_loop_errors(loop : asyncio.AbstractEventLoop) -> list:
+  errors = []
+  loop.set_exception_handler(lambda loop, context: errors.append(context))
+  return errors
+
+def test_out_of_order_responses_reach_their_callers(monkeypatch):
+  async def run():
+    relay = FakeRelay()
+    conn = await open_conn(monkeypatch, relay)
+    
+    calls = [asyncio.create_task(conn.request(request(n))) for n in range(10)]
+    while len(relay.awaited) < 10:
+      await asyncio.sleep(0)
+    for msg in reversed(relay.awaited):
+      relay.release(msg)
+      
+    responses = await asyncio.gather(*calls)
+    await asyncio.sleep(0)
+    assert [resp.responseData['echo'] for resp in responses] == list(range(10))
+    assert not conn.status_waiters and not conn.response_waiters
+  asyncio.run(run())
+  
+def test_missing_status_response_times_out(monkeypatch):
+  async def run():
+    conn = await open_conn(monkeypatch, FakeRelay(status = False), timeout = 0.05)
+    
+    assert await conn.request(request(1)) is None
+    await asyncio.sleep(0)
+    assert not conn.connected
+    assert not conn.status_waiters and not conn.response_waiters
+  asyncio.run(run())
+  
+def test_missing_response_times_out(monkeypatch):
+  async def run():
+    conn = await open_conn(monkeypatch, FakeRelay(), timeout = 0.05)
+    
+    assert await conn.request(request(1)) is None
+    await asyncio.sleep(0)
+    assert not conn.response_waiters
+  asyncio.run(run())
+
+def test_closed_connection_fails_pending_requests(monkeypatch):
+  async def run():
+    relay = FakeRelay(status = False)
+    conn = await open_conn(monkeypatch, relay)
+    
+    calls = [asyncio.create_task(conn.request(request(n))) for n in range(3)]
+    await asyncio.sleep(0.01)
+    relay.close()
+    
+    assert await asyncio.gather(*calls) == [None, None, None]
+    assert not conn.connected
+  asyncio.run(run())
+
+def test_failed_send_leaves_no_unretrieved_exceptions(monkeypatch):
+  async def run():
+    errors = collect_loop_errors(asyncio.get_running_loop())
+    relay = FakeRelay()
+    conn = await open_conn(monkeypatch, relay)
+    
+    relay.broken = True
+    assert await conn.request(request(1)) is None
+    relay.close()
+    await conn.reader_task
+    
+    gc.collect()
+    assert not errors
+    assert not conn.status_waiters and not conn.response_waiters
+  asyncio.run(run())
+  
+def test_frame_with_invalid_id_does_not_stop_the_reader(monkeypatch):
+  async def run():
+    relay = FakeRelay()
+    conn = await open_conn(monkeypatch, relay)
+    
+    for bad_id in ('"abc"', 'null', '1.5e400'):
+      relay.incoming.put_nowait('{"code": "room", "msgId": ' + bad_id + ', "msgType": "await_response", "hasData": false}')
+    
+    call = asyncio.create_task(conn.request(request(1)))
+    for _ in range(100):
+      if relay.awaited:
+        break
+      await asyncio.sleep(0.01)
+    relay.release(relay.awaited[0])
+    
+    resp = await call
+    assert resp.responseData == { 'echo': 1 }
+    assert not conn.reader_task.done()
+    relay.close()
+  asyncio.run(asyncio.wait_for(run(), 5.0))
+  
+def test_batching_needs_the_host_flag():
+  conn = ProxiedClientConnection("ws://relay", "room", lambda resp: None)
+  
+  conn.negotiate(Message('{"code": "room", "msgId": 1, "msgType": "status_response", "hasData": true, "data": {"status_code": 200, "protocol": "binary"}}'))
+  assert conn.binary and not conn.batching
+  
+  conn.negotiate(Message('{"code": "room", "msgId": 1, "msgType": "status_response", "hasData": true, "data": {"status_code": 200, "protocol": "json", "emit_batch": true}}'))
+  assert conn.batching and not conn.binary
+  
+def test_host_advertises_batching():
+  host = ProxiedServerConnection("ws://obs", "", "ws://relay", "room", lambda resp: None)
+  assert host.subscribe_message("room", "server_subscribe").data['emit_batch'] is True
+  
+  client = ProxiedClientConnection("ws://relay", "room", lambda resp: None)
+  assert 'emit_batch' not in client.subscribe_message("room", "client_subscribe").data
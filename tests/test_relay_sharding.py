@@ -0,0 +1,112 @@
+import asyncio
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+from websockets.asyncio.client import connect
+
+from obswsgui import Message
+
+BACKEND = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "obswsgui", "backend.py")
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "send_fds"), reason = "sharded relay needs fd passing")
+
+def free_port() -> int:
+  with socket.socket() as sock:
+    sock.bind(("127.0.0.1", 0))
+    return sock.getsockname()[1]
+
+def message(code, id : int, msg_type : str, data : dict = None) -> str:
+  msg = Message()
+  msg.code = code
+  msg.id = id
+  msg.msg_type = msg_type
+  msg.has_data = data is not None
+  msg.data = data
+  return msg.to_data()
+
+@pytest.fixture
+def relay():
+  port = free_port()
+  proc = subprocess.Popen([sys.executable, BACKEND, "--port", str(port), "--workers", "2"], stderr = subprocess.PIPE, text = True)
+  
+  pids = {}
+  deadline = time.monotonic() + 20
+  while len(pids) < 2 and time.monotonic() < deadline:
+    line = proc.stderr.readline()
+    match = re.search(r"Worker (\d+) ready \(pid (\d+)\)", line)
+    if match:
+      pids[int(match.group(1))] = int(match.group(2))
+  assert len(pids) == 2, "workers never became ready"
+  
+  yield port, pids, proc
+  
+  proc.terminate()
+  proc.wait(5)
+
+async def join(port : int, code : str, msg_type : str):
+  ws = await connect(f"ws://127.0.0.1:{port}")
+  await ws.send(message(code, 1, msg_type, { 'protocols': ["json"], 'version': 1 }))
+  status = json.loads(await asyncio.wait_for(ws.recv(), 5))
+  return ws, status
+
+async def round_trip(port : int, code : str) -> dict:
+  host, host_status = await join(port, code, "server_subscribe")
+  client, client_status = await join(port, code, "client_subscribe")
+  assert host_status['data']['status_code'] == 200
+  assert client_status['data']['status_code'] == 200
+  
+  await client.send(message(code, 7, "emit_request", { 'requestType': "GetVersion" }))
+  forwarded = json.loads(await asyncio.wait_for(host.recv(), 5))
+  
+  await host.close()
+  await client.close()
+  return forwarded
+
+def test_rooms_on_every_shard_reach_their_host(relay):
+  port, _, _ = relay
+  
+  async def run():
+    # enough codes that both shards get rooms
+    for i in range(8):
+      forwarded = await round_trip(port, f"room-{i}")
+      assert forwarded['msgType'] == "emit_request"
+      assert forwarded['code'] == f"room-{i}"
+  asyncio.run(run())
+
+def test_malformed_first_frame_gets_an_error(relay):
+  port, _, _ = relay
+  
+  async def run():
+    ws = await connect(f"ws://127.0.0.1:{port}")
+    await ws.send(json.dumps({ 'msgId': 3, 'msgType': "client_subscribe" }))
+    status = json.loads(await asyncio.wait_for(ws.recv(), 5))
+    assert status['data']['status_code'] == 400
+    
+    ws = await connect(f"ws://127.0.0.1:{port}")
+    await ws.send(message(12, 4, "client_subscribe", {}))
+    status = json.loads(await asyncio.wait_for(ws.recv(), 5))
+    assert status['msgId'] == 4
+    assert status['data']['status_code'] == 400
+  asyncio.run(run())
+
+def test_crashed_worker_is_restarted(relay):
+  port, pids, proc = relay
+  os.kill(pids[0], signal.SIGKILL)
+  
+  deadline = time.monotonic() + 20
+  restarted = False
+  while not restarted and time.monotonic() < deadline:
+    restarted = bool(re.search(r"Worker 0 ready", proc.stderr.readline()))
+  assert restarted
+  
+  async def run():
+    for i in range(8):
+      assert (await round_trip(port, f"after-{i}"))['code'] == f"after-{i}"
+  asyncio.run(run())
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+from obswsgui import Default_GUI
+from obswsgui.obstypes.obs_object import ModifyType, OBS_Object
+from obswsgui.ui.defaultgui import SHIFT_MASK
+from obswsgui.util.geometryutil import Coords
+
+from fakegui import center, make_gui
+
+def two_item_gui() -> Default_GUI:
+  gui = make_gui()
+  gui.left = OBS_Object(1, 1, gui.canvas, gui.screen, 100.0, 100.0, 300.0, 300.0, 0.0, 300.0, 300.0, 'OBS_BOUNDS_NONE', "left")
+  gui.right = OBS_Object(2, 0, gui.canvas, gui.screen, 1000.0, 100.0, 300.0, 300.0, 0.0, 300.0, 300.0, 'OBS_BOUNDS_NONE', "right")
+  gui.add_scene_item(gui.left)
+  gui.add_scene_item(gui.right)
+  return gui
+
+def event(coords : Coords, shift : bool = False) -> SimpleNamespace:
+  return SimpleNamespace(x = coords.x, y = coords.y, state = SHIFT_MASK if shift else 0)
+
+def drag(gui : Default_GUI, start : Coords, dx : float, shift : bool = False) -> None:
+  gui.mouseDown(event(start, shift))
+  gui.mouseMove(event(Coords(start.x + dx, start.y)))
+  gui.mouseUp(event(Coords(start.x + dx, start.y)))
+
+def test_shift_click_adds_item_and_drags_the_group():
+  gui = two_item_gui()
+  gui.select_item(gui.left)
+  
+  drag(gui, center(gui.right), 40.0, shift = True)
+  assert gui.selection == [gui.left, gui.right]
+  assert gui.left.x > 100.0 and gui.right.x > 1000.0
+  assert gui.left.x - 100.0 == gui.right.x - 1000.0
+  
+def test_shift_click_deselect_does_not_drag():
+  gui = two_item_gui()
+  gui.select_item(gui.left)
+  gui.select_item(gui.right)
+  
+  drag(gui, center(gui.left), 40.0, shift = True)
+  assert gui.selection == [gui.right]
+  assert not gui.dragging
+  assert gui.manip_mode == ModifyType.NONE
+  assert (gui.left.x, gui.right.x) == (100.0, 1000.0)
+  assert (gui.right.width, gui.right.height) == (300.0, 300.0)
+  
+def test_shift_click_on_empty_canvas_does_not_drag():
+  gui = two_item_gui()
+  gui.select_item(gui.right)
+  gui.manip_mode = ModifyType.RIGHT
+  
+  drag(gui, Coords(5.0, 5.0), 40.0, shift = True)
+  assert gui.selection == [gui.right]
+  assert (gui.right.x, gui.right.width) == (1000.0, 300.0)
@@ -0,0 +1,77 @@
+import threading
+import time
+
+from obswsgui.util.uiqueue import UIQueue
+
+class FakeRoot:
+  # a one-callback stand in for the Tk event loop, good enough for the pump which only ever schedules itself
+  def __init__(self):
+    self.pending = None
+    self.delays = []
+    
+  def after(self, ms : int, func) -> None:
+    self.delays.append(ms)
+    self.pending = (time.perf_counter() + ms / 1000.0, func)
+    
+  def run(self, duration : float) -> int:
+    end = time.perf_counter() + duration
+    wakeups = 0
+    while self.pending and self.pending[0] < end:
+      due, func = self.pending
+      self.pending = None
+      time.sleep(max(due - time.perf_counter(), 0))
+      func()
+      wakeups += 1
+    return wakeups
+
+def test_idle_pump_backs_off():
+  root = FakeRoot()
+  queue = UIQueue(root)
+  root.run(0.5)
+  
+  assert root.delays[-1] == queue.idle_interval_ms
+  # a fixed 5ms pump would have woken up about 100 times
+  assert len(root.delays) < 20
+  
+def test_pump_speeds_up_when_work_arrives():
+  root = FakeRoot()
+  queue = UIQueue(root)
+  root.run(0.3)
+  
+  ran = []
+  queue.call(ran.append, 1)
+  root.run(queue.idle_interval_ms / 1000.0 + 0.02)
+  assert ran == [1]
+  assert queue.interval_ms in root.delays[-3:]
+
+def test_transform_update_stress():
+  root = FakeRoot()
+  queue = UIQueue(root)
+  
+  rate = 1000
+  count = 1000
+  latencies = []
+  applied = []
+  
+  def apply_transform(n : int, sent : float) -> None:
+    latencies.append(time.perf_counter() - sent)
+    applied.append(n)
+    
+  def producer() -> None:
+    start = time.perf_counter()
+    for n in range(count):
+      time.sleep(max(start + n / rate - time.perf_counter(), 0))
+      queue.call(apply_transform, n, time.perf_counter())
+      
+  thread = threading.Thread(target = producer)
+  thread.start()
+  root.run(count / rate + 0.5)
+  thread.join()
+  
+  assert applied == list(range(count))
+  latencies.sort()
+  # apart from the first update after the idle start, commands wait at most a few busy pump intervals
+  assert latencies[len(latencies) // 2] < 0.02
+  assert latencies[int(len(latencies) * 0.99)] < queue.idle_interval_ms / 1000.0 + 0.02
+  # the queue drained, so the pump went back to idling
+  assert root.delays[-1] > queue.interval_ms